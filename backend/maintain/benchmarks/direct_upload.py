@@ -0,0 +1,116 @@
+"""Проверка прямой загрузки: upload-intent → PUT по ссылке → finalize.
+
+Запуск из backend/src: PYTHONPATH=. python ../maintain/benchmarks/direct_upload.py
+Работает и с локальным хранилищем, и с S3 (STORAGE_BACKEND=s3).
+"""
+
+import asyncio
+import io
+import sys
+
+import httpx
+from PIL import Image
+
+from main import app
+from utils.images import derivative_renderer
+from utils.storage import LocalStorageBackend, storage_backend
+
+
+def make_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 800), (120, 60, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def check(name: str, passed: bool) -> bool:
+    print(f"{'OK  ' if passed else 'FAIL'} {name}")
+    return passed
+
+
+async def main():
+    content = make_png()
+    ok = True
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        httpx.AsyncClient(transport=transport, base_url="http://test") as client,
+        httpx.AsyncClient() as storage_client,
+    ):
+        # Ссылки локального хранилища ведут на само приложение.
+        uploader = (
+            client
+            if isinstance(storage_backend, LocalStorageBackend)
+            else storage_client
+        )
+
+        async def upload(filename: str, body: bytes) -> dict:
+            intent = (
+                await client.post(
+                    "/api/photos/upload-intent",
+                    json={"filename": filename, "size": len(body)},
+                )
+            ).json()
+            response = await uploader.request(
+                intent["method"], intent["upload_url"], content=body
+            )
+            intent["upload_status"] = response.status_code
+            return intent
+
+        intent = await upload("direct.png", content)
+        ok &= check("PUT по подписанной ссылке", intent["upload_status"] in (200, 204))
+
+        response = await client.post(
+            f"/api/photos/{intent['id']}/finalize",
+            json={"filename": "direct.png", "name": "Прямая загрузка"},
+        )
+        photo = response.json()
+        ok &= check(
+            "finalize создаёт фотографию с выданным id",
+            response.status_code == 200 and photo["id"] == intent["id"],
+        )
+        ok &= check(
+            "файл перенесён под имя по хэшу",
+            await storage_backend.exists(photo["path"])
+            and not await storage_backend.exists(f"uploads/{intent['id']}"),
+        )
+        repeated = await client.post(
+            f"/api/photos/{intent['id']}/finalize",
+            json={"filename": "direct.png"},
+        )
+        ok &= check(
+            "повторный finalize возвращает ту же фотографию",
+            repeated.json().get("path") == photo["path"],
+        )
+
+        forged = intent["upload_url"].replace("signature=", "signature=0")
+        if uploader is client:
+            response = await client.put(forged, content=content)
+            ok &= check("подделанная подпись отклоняется", response.status_code == 403)
+
+        intent = await upload("fake.png", b"not an image" * 100)
+        response = await client.post(
+            f"/api/photos/{intent['id']}/finalize", json={"filename": "fake.png"}
+        )
+        ok &= check(
+            "содержимое не того формата отклоняется",
+            response.status_code == 400
+            and not await storage_backend.exists(f"uploads/{intent['id']}"),
+        )
+
+        response = await client.post(
+            f"/api/photos/{intent['id']}/finalize", json={"filename": "fake.png"}
+        )
+        ok &= check("finalize без файла отклоняется", response.status_code == 400)
+
+        await asyncio.gather(*derivative_renderer._background)
+        await client.delete(f"/api/photos/{photo['id']}")
+        ok &= check(
+            "удаление убирает файл",
+            not await storage_backend.list_keys(photo["path"]),
+        )
+    derivative_renderer.shutdown()
+    await storage_backend.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+import asyncio
+import sys
+from typing import Any, Iterator
+from uuid import uuid4
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Executable
+
+from models.horse import horse_children, horse_photos
+from models.horse_service import horse_service_relations
+from models.prices import price_groups_relations, price_photos
+from repositories.horse_pedigree import _pedigree_edges_stmt
+from utils.database import get_db
+
+
+async def sample_ids(session, column, size: int = 20) -> list:
+    result = await session.execute(select(column).distinct().limit(size))
+    # На пустой таблице IN () сворачивается в false, и план не трогает индексы.
+    return [row[0] for row in result.all()] or [uuid4()]
+
+
+def index_names(plan: dict[str, Any]) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from index_names(child)
+
+
+async def explain(session, stmt: Executable) -> set[str]:
+    compiled = stmt.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    return set(index_names(result.scalar()[0]["Plan"]))
+
+
+async def check_link_indexes(session) -> bool:
+    # На маленькой базе планировщик предпочтёт seq scan, поэтому проверяем,
+    # что индекс вообще применим к запросу.
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    horse_ids = await sample_ids(session, horse_children.c.child_id)
+    price_ids = await sample_ids(session, price_photos.c.price_id)
+
+    checks: list[tuple[str, Executable, str]] = [
+        (
+            "pedigree ancestors",
+            _pedigree_edges_stmt(horse_ids=horse_ids, generations=3),
+            "ix_horse_children_child_id",
+        ),
+        (
+            "pedigree foals",
+            select(horse_children.c.child_id).where(
+                horse_children.c.horse_id.in_(horse_ids)
+            ),
+            "uq_horse_children_horse_id_child_id",
+        ),
+        (
+            "horse photos",
+            select(
+                horse_photos.c.horse_id,
+                horse_photos.c.photo_id,
+                horse_photos.c.is_main,
+            ).where(horse_photos.c.horse_id.in_(horse_ids)),
+            "ix_horse_photos_horse_id",
+        ),
+        (
+            "horse services",
+            select(horse_service_relations.c.service_id).where(
+                horse_service_relations.c.horse_id.in_(horse_ids)
+            ),
+            "ix_horse_service_relations_horse_id",
+        ),
+        (
+            "price photos",
+            select(price_photos.c.photo_id, price_photos.c.is_main).where(
+                price_photos.c.price_id.in_(price_ids)
+            ),
+            "ix_price_photos_price_id",
+        ),
+        (
+            "price groups",
+            select(price_groups_relations.c.group_id).where(
+                price_groups_relations.c.price_id.in_(price_ids)
+            ),
+            "ix_price_groups_relations_price_id",
+        ),
+    ]
+
+    ok = True
+    for name, stmt, expected_index in checks:
+        used = await explain(session, stmt)
+        passed = expected_index in used
+        ok = ok and passed
+        print(
+            f"{'OK  ' if passed else 'FAIL'} {name}: "
+            f"expected {expected_index}, used {sorted(used) or 'no index'}"
+        )
+    return ok
+
+
+async def main():
+    async with get_db() as session:
+        ok = await check_link_indexes(session)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+import asyncio
+import sys
+from uuid import UUID
+
+from sqlalchemy import event, func, select
+
+from models.horse import horse, horse_photos
+from models.horse_service import horse_service_relations
+from repositories import HorseRepository
+from utils.database import async_engine, get_db
+
+SAMPLE_SIZE = 20
+
+query_count = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_queries(*args, **kwargs):
+    global query_count
+    query_count += 1
+
+
+async def sample_horses(session) -> list[tuple[UUID, str]]:
+    # Сначала лошади с фотографиями и услугами, чтобы проверить агрегаты.
+    links = (
+        select(horse_photos.c.horse_id.label("horse_id"))
+        .union_all(select(horse_service_relations.c.horse_id))
+        .subquery()
+    )
+    link_count = (
+        select(func.count())
+        .select_from(links)
+        .where(links.c.horse_id == horse.c.id)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        select(horse.c.id, horse.c.slug)
+        .order_by(link_count.desc(), horse.c.id)
+        .limit(SAMPLE_SIZE)
+    )
+    return [(UUID(str(horse_id)), slug) for horse_id, slug in result.all()]
+
+
+async def check_horse_detail(horse_repository: HorseRepository) -> bool:
+    global query_count
+    horses = await sample_horses(horse_repository.session)
+    if not horses:
+        print("SKIP no horses")
+        return True
+
+    expected, _, _ = await horse_repository.get_horse_list_full_info(
+        include_ids=[h for h, _ in horses], with_total=False
+    )
+
+    ok = True
+    for horse_id, slug in horses:
+        lookups = {
+            "id": horse_repository.get_horse_full_info_by_id(horse_id=horse_id),
+            "slug": horse_repository.get_horse_full_info_by_slug(horse_slug=slug),
+        }
+        for lookup, load in lookups.items():
+            query_count = 0
+            dto = await load
+            queries = query_count
+            passed = queries == 1 and dto == expected[horse_id]
+            ok = ok and passed
+            if not passed:
+                print(
+                    f"FAIL by {lookup} {horse_id}: {queries} queries, "
+                    f"matches list loader: {dto == expected[horse_id]}"
+                )
+    if ok:
+        print(f"OK   {len(horses)} horses: 1 query per lookup by id and by slug")
+    return ok
+
+
+async def main():
+    async with get_db() as session:
+        ok = await check_horse_detail(HorseRepository(session))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+import asyncio
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from api.horses import _HORSE_LIST_ADAPTER
+from core.entities import PaginatedEntities
+from core.schemas import HorseOutDto, HorseWithPedigreeOutDto
+from repositories import HorseRepository
+from utils.database import get_db
+from utils.responses import PreSerializedJSONResponse
+
+PEDIGREES = (None, 3)
+LIMIT = 100
+ROUNDS = 20
+
+response_field = create_model_field(
+    name="Response",
+    type_=PaginatedEntities[HorseOutDto | HorseWithPedigreeOutDto],
+    mode="serialization",
+)
+
+
+async def render_response_model(content: PaginatedEntities) -> bytes:
+    """Текущий путь FastAPI: валидация по response_model, затем JSONResponse."""
+    serialized = await serialize_response(
+        field=response_field, response_content=content
+    )
+    return JSONResponse(jsonable_encoder(serialized)).body
+
+
+async def render_pre_serialized(content: PaginatedEntities) -> bytes:
+    return PreSerializedJSONResponse.from_adapter(_HORSE_LIST_ADAPTER, content).body
+
+
+async def measure(render, content: PaginatedEntities) -> tuple[float, bytes]:
+    timings: list[float] = []
+    body = b""
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        body = await render(content)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), body
+
+
+async def benchmark_serialization(horse_repository: HorseRepository):
+    for pedigree in PEDIGREES:
+        horses, total, _ = await horse_repository.get_horse_list_full_info(
+            limit=LIMIT, pedigree=pedigree, sort=["name"]
+        )
+        content = PaginatedEntities(items=list(horses.values()), total=total)
+        current_ms, current_body = await measure(render_response_model, content)
+        fast_ms, fast_body = await measure(render_pre_serialized, content)
+        print(
+            f"pedigree={pedigree} limit={LIMIT} bytes={len(fast_body)}: "
+            f"response_model={current_ms:.1f}ms "
+            f"pre_serialized={fast_ms:.1f}ms "
+            f"identical={current_body == fast_body}"
+        )
+
+
+async def main():
+    async with get_db() as session:
+        horse_repository = HorseRepository(session=session)
+        await benchmark_serialization(horse_repository=horse_repository)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
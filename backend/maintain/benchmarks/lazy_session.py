@@ -0,0 +1,57 @@
+import asyncio
+import sys
+
+import httpx
+from sqlalchemy import event
+
+from main import app
+from utils.database import async_engine
+
+# Запросы, которые не должны брать соединение из пула, и те, которым оно нужно.
+EXPECTED_CONNECTIONS = {
+    "/health": 0,
+    "/api/photos/not-a-uuid": 0,
+    "/api/horses/breeds/not-found": 1,
+    "/api/horses?limit=1": 1,
+}
+# Изменяющий запрос с невалидным телом тоже не должен доходить до БД.
+EXPECTED_POST_CONNECTIONS = {"/api/horses/breeds": 0}
+
+connections = 0
+
+
+@event.listens_for(async_engine.sync_engine, "engine_connect")
+def count_connections(*args):
+    global connections
+    connections += 1
+
+
+async def main():
+    global connections
+    ok = True
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        requests = [
+            *(
+                ("GET", path, expected)
+                for path, expected in EXPECTED_CONNECTIONS.items()
+            ),
+            *(
+                ("POST", path, expected)
+                for path, expected in EXPECTED_POST_CONNECTIONS.items()
+            ),
+        ]
+        for method, path, expected in requests:
+            connections = 0
+            response = await client.request(method, path, json={})
+            passed = connections == expected
+            ok = ok and passed
+            print(
+                f"{'OK  ' if passed else 'FAIL'} {method} {path}: {response.status_code}, "
+                f"{connections} connections (expected {expected})"
+            )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
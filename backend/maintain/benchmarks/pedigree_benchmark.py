@@ -0,0 +1,51 @@
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import event
+
+from repositories import HorseRepository
+from utils.database import async_engine, get_db
+
+DEPTHS = (1, 2, 3)
+LIMIT = 100
+ROUNDS = 10
+
+query_count = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_queries(*args, **kwargs):
+    global query_count
+    query_count += 1
+
+
+async def benchmark_pedigree(horse_repository: HorseRepository):
+    global query_count
+    for depth in DEPTHS:
+        timings: list[float] = []
+        queries: list[int] = []
+        for _ in range(ROUNDS):
+            query_count = 0
+            started = time.perf_counter()
+            await horse_repository.get_horse_list_full_info(
+                limit=LIMIT, pedigree=depth, sort=["name"]
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+            queries.append(query_count)
+        print(
+            f"pedigree={depth} limit={LIMIT}: "
+            f"queries={max(queries)} "
+            f"median={statistics.median(timings):.1f}ms "
+            f"p95={sorted(timings)[int(len(timings) * 0.95) - 1]:.1f}ms"
+        )
+
+
+async def main():
+    async with get_db() as session:
+        horse_repository = HorseRepository(session=session)
+        await benchmark_pedigree(horse_repository=horse_repository)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+import asyncio
+import io
+import sys
+
+import httpx
+from PIL import Image
+
+from main import app
+from utils.images import derivative_renderer
+from utils.storage import storage_backend
+
+
+def make_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (1600, 900), (40, 90, 160)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def check(name: str, passed: bool) -> bool:
+    print(f"{'OK  ' if passed else 'FAIL'} {name}")
+    return passed
+
+
+async def main():
+    content = make_png()
+    ok = True
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first, second = [
+            (
+                await client.post(
+                    "/api/photos", files={"file": (name, content, "image/png")}
+                )
+            ).json()
+            for name in ("first.png", "second.png")
+        ]
+        await asyncio.gather(*derivative_renderer._background)
+        ok &= check(
+            "одинаковое содержимое — один путь", first["path"] == second["path"]
+        )
+        ok &= check(
+            "файл хранится по хэшу", await storage_backend.exists(first["path"])
+        )
+
+        await client.delete(f"/api/photos/{first['id']}")
+        ok &= check(
+            "файл остаётся, пока на него есть ссылка",
+            await storage_backend.exists(first["path"]),
+        )
+
+        await client.delete(f"/api/photos/{second['id']}")
+        leftovers = await storage_backend.list_keys(first["path"])
+        ok &= check("последнее удаление убирает файл и копии", not leftovers)
+    derivative_renderer.shutdown()
+    await storage_backend.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Массовый импорт против поштучной загрузки: число запросов к БД и время.
+
+Запуск из backend/src: PYTHONPATH=. python ../maintain/benchmarks/photo_import.py
+Все названия файлов совпадают, чтобы поштучная загрузка перебирала суффиксы.
+"""
+
+import asyncio
+import io
+import sys
+import time
+
+import httpx
+from PIL import Image
+from sqlalchemy import event
+
+from main import app
+from utils.database import async_engine
+from utils.images import derivative_renderer
+from utils.storage import storage_backend
+
+FILE_COUNT = 20
+
+query_count = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_queries(*args, **kwargs):
+    global query_count
+    query_count += 1
+
+
+def make_png(seed: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), (seed, 100, 200)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def check(name: str, passed: bool) -> bool:
+    print(f"{'OK  ' if passed else 'FAIL'} {name}")
+    return passed
+
+
+async def main():
+    global query_count
+    contents = [make_png(seed) for seed in range(FILE_COUNT)]
+    ok = True
+    ids = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        query_count = 0
+        started = time.perf_counter()
+        for content in contents:
+            response = await client.post(
+                "/api/photos",
+                files={"file": ("import-bench.png", content, "image/png")},
+            )
+            ids.append(response.json()["id"])
+        print(
+            f"поштучно: {query_count} запросов, "
+            f"{(time.perf_counter() - started) * 1000:.0f} мс"
+        )
+
+        files = [
+            ("files", ("import-bench.png", content, "image/png"))
+            for content in contents
+        ]
+        files.append(("files", ("broken.png", b"not an image", "image/png")))
+        files.append(("files", ("copy.png", contents[0], "image/png")))
+        query_count = 0
+        started = time.perf_counter()
+        response = await client.post("/api/photos/import", files=files)
+        print(
+            f"импорт: {query_count} запросов, "
+            f"{(time.perf_counter() - started) * 1000:.0f} мс"
+        )
+        report = response.json()
+        ids.extend(item["photo"]["id"] for item in report["items"] if item["photo"])
+
+        ok &= check(
+            "отчёт по каждому файлу",
+            report["created"] == FILE_COUNT + 1
+            and report["failed"] == 1
+            and report["items"][FILE_COUNT]["status"] == "failed",
+        )
+        names = [item["photo"]["name"] for item in report["items"] if item["photo"]]
+        photos = (await client.get("/api/photos", params={"limit": 1000})).json()
+        all_names = [photo["name"] for photo in photos["items"]]
+        ok &= check(
+            "названия уникальны",
+            len(set(names)) == len(names) and len(set(all_names)) == len(all_names),
+        )
+        ok &= check(
+            "одинаковое содержимое — один файл",
+            report["items"][0]["photo"]["path"] == report["items"][-1]["photo"]["path"],
+        )
+
+        await asyncio.gather(*derivative_renderer._background)
+        await client.post("/api/photos/batch-delete", json={"ids": ids})
+    derivative_renderer.shutdown()
+    await storage_backend.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+import asyncio
+import statistics
+import sys
+import time
+
+from repositories import BreedRepository
+from settings import settings
+from utils.database import make_async_engine, make_async_session_factory
+
+ROUNDS = 1000
+
+# Отдельный движок с пулом: с NullPool время подключения скрывает разницу.
+engine = make_async_engine(settings.database_url, use_null_pool=False)
+transactional_sessions = make_async_session_factory(engine)
+autocommit_sessions = make_async_session_factory(
+    engine.execution_options(isolation_level="AUTOCOMMIT")
+)
+
+
+async def catalogue_request(session) -> None:
+    """Лёгкий запрос каталога (список пород с подсчётом), где заметна доля BEGIN/COMMIT."""
+    await BreedRepository(session).get_filtered(limit=20)
+
+
+async def transactional() -> None:
+    async with transactional_sessions() as session:
+        await catalogue_request(session)
+        await session.commit()
+
+
+async def autocommit() -> None:
+    async with autocommit_sessions() as session:
+        await catalogue_request(session)
+
+
+async def measure(run) -> list[float]:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main():
+    # Прогрев пула и кэшей подготовленных выражений.
+    for run in (transactional, autocommit):
+        await measure(run)
+
+    results = {}
+    for name, run in (
+        ("transaction + COMMIT", transactional),
+        ("autocommit", autocommit),
+    ):
+        timings = await measure(run)
+        results[name] = statistics.median(timings)
+        print(
+            f"{name:22} median {statistics.median(timings):.3f} ms, "
+            f"p95 {statistics.quantiles(timings, n=20)[-1]:.3f} ms"
+        )
+    saved = results["transaction + COMMIT"] - results["autocommit"]
+    print(f"saved per request: {saved:.3f} ms")
+    await engine.dispose()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+import asyncio
+import sys
+import time
+
+from sqlalchemy import event, select, update
+
+from core.protocols.cache import CacheBackendProtocol
+from models.horse import horse
+from repositories import BreedRepository, HorseRepository
+from utils import cache
+from utils.database import async_engine, get_db
+
+ROUNDS = 200
+
+query_count = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_queries(*args, **kwargs):
+    global query_count
+    query_count += 1
+
+
+def create_backend() -> CacheBackendProtocol:
+    try:
+        import fakeredis
+    except ImportError:
+        return cache.LRUCacheBackend(max_entries=1024)
+    return cache.RedisCacheBackend(fakeredis.FakeAsyncRedis())
+
+
+async def measure(load) -> tuple[float, int]:
+    global query_count
+    query_count = 0
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        await load()
+    return (time.perf_counter() - started) / ROUNDS * 1000, query_count
+
+
+async def check_repository_cache() -> bool:
+    global query_count
+    ok = True
+    async with get_db() as session:
+        horse_row = (await session.execute(select(horse.c.id).limit(1))).first()
+        if horse_row is None:
+            print("SKIP no horses")
+            return True
+        horse_id = horse_row[0]
+        breed_repository = BreedRepository(session)
+        horse_repository = HorseRepository(session)
+        loads = {
+            "breeds.get_filtered": lambda: breed_repository.get_filtered(limit=20),
+            "horse card": lambda: horse_repository.get_horse_full_info_by_id(
+                horse_id=horse_id
+            ),
+        }
+
+        for name, load in loads.items():
+            cache.cache_backend = None
+            expected = await load()
+            uncached_ms, uncached_queries = await measure(load)
+            cache.cache_backend = create_backend()
+            first = await load()
+            cached_ms, cached_queries = await measure(load)
+            passed = first == expected and cached_queries == 0
+            ok = ok and passed
+            print(
+                f"{'OK  ' if passed else 'FAIL'} {name}: "
+                f"{uncached_ms:.2f} ms / {uncached_queries // ROUNDS} queries -> "
+                f"{cached_ms:.2f} ms / {cached_queries} queries "
+                f"({type(cache.cache_backend).__name__})"
+            )
+
+        # Изменение лошади после коммита должно сбросить кэш карточки.
+        await session.execute(
+            update(horse).where(horse.c.id == horse_id).values(name=horse.c.name)
+        )
+        await session.commit()
+        await asyncio.sleep(0)
+        query_count = 0
+        await loads["horse card"]()
+        passed = query_count > 0
+        ok = ok and passed
+        print(f"{'OK  ' if passed else 'FAIL'} horse card reloaded after commit")
+    return ok
+
+
+async def main():
+    ok = await check_repository_cache()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""Проверка S3StorageBackend на S3-совместимом сервере (например, локальном MinIO).
+
+Запуск из backend/src:
+    S3_ENDPOINT_URL=http://127.0.0.1:9000 S3_BUCKET=media \\
+    S3_ACCESS_KEY_ID=... S3_SECRET_ACCESS_KEY=... \\
+    PYTHONPATH=. python ../maintain/benchmarks/s3_storage.py
+Бакет должен существовать. Скрипт пишет и удаляет ключи с префиксом storage-check/.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from settings import settings
+from utils.storage import S3StorageBackend
+
+PREFIX = "storage-check/"
+
+
+def check(name: str, passed: bool) -> bool:
+    print(f"{'OK  ' if passed else 'FAIL'} {name}")
+    return passed
+
+
+async def main():
+    storage = S3StorageBackend(
+        httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=settings.s3_max_connections)
+        ),
+        endpoint_url=settings.s3_endpoint_url,
+        region=settings.s3_region,
+        bucket=settings.s3_bucket,
+        access_key_id=settings.s3_access_key_id,
+        secret_access_key=settings.s3_secret_access_key,
+        multipart_chunk_size=5 * 1024 * 1024,
+    )
+    ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        small = directory / "small"
+        small.write_bytes(b"small file")
+        await storage.save(f"{PREFIX}small file.txt", small)
+        ok &= check("загрузка одним запросом", not small.exists())
+        ok &= check("exists", await storage.exists(f"{PREFIX}small file.txt"))
+        ok &= check(
+            "exists для отсутствующего ключа",
+            not await storage.exists(f"{PREFIX}missing"),
+        )
+
+        content = os.urandom(12 * 1024 * 1024)
+        large = directory / "large"
+        large.write_bytes(content)
+        started = time.perf_counter()
+        await storage.save(f"{PREFIX}large.bin", large)
+        elapsed = time.perf_counter() - started
+        downloaded = directory / "downloaded"
+        await storage.download(f"{PREFIX}large.bin", downloaded)
+        ok &= check(
+            f"multipart-загрузка 12 МБ за {elapsed * 1000:.0f} мс",
+            downloaded.read_bytes() == content,
+        )
+
+        keys = await storage.list_keys(PREFIX)
+        ok &= check(
+            "list_keys",
+            keys == [f"{PREFIX}large.bin", f"{PREFIX}small file.txt"],
+        )
+
+        async with httpx.AsyncClient() as client:
+            url = await storage.presigned_url(f"{PREFIX}small file.txt", expires_in=60)
+            response = await client.get(url)
+            ok &= check("presigned GET", response.content == b"small file")
+            url = await storage.presigned_url(
+                f"{PREFIX}put.txt", method="PUT", expires_in=60
+            )
+            response = await client.put(url, content=b"put")
+            ok &= check(
+                "presigned PUT",
+                response.status_code == 200
+                and await storage.exists(f"{PREFIX}put.txt"),
+            )
+
+        for key in await storage.list_keys(PREFIX):
+            await storage.delete(key)
+        ok &= check("delete", not await storage.list_keys(PREFIX))
+    await storage.close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
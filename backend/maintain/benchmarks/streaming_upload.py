@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from core.exceptions.base import ClientError
+from utils.storage import LocalStorageBackend
+from utils.uploads import receive_upload
+
+SIZE = 64 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# Начало MOV-файла: атом ftyp с брендом QuickTime.
+MOV_HEAD = b"\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00qt  "
+
+
+def make_upload(head: bytes, size: int) -> UploadFile:
+    # Как и Starlette, держим в памяти не больше 1 МБ, остальное — на диске.
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(head)
+    block = b"\x00" * CHUNK_SIZE
+    remaining = size - len(head)
+    while remaining > 0:
+        spooled.write(block[:remaining])
+        remaining -= CHUNK_SIZE
+    spooled.seek(0)
+    return UploadFile(spooled, size=size, filename="video.mov")
+
+
+async def read_whole(upload: UploadFile, path: Path) -> None:
+    content = await upload.read()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, lambda: path.write_bytes(content))
+
+
+async def stream(upload: UploadFile, path: Path) -> None:
+    received = await receive_upload(
+        upload,
+        directory=path.parent,
+        expected_format="isobmff",
+        max_bytes=SIZE,
+        chunk_size=CHUNK_SIZE,
+    )
+    storage = LocalStorageBackend(
+        path.parent, base_url="", staging_dir=Path(tempfile.gettempdir())
+    )
+    await storage.save(path.name, received.temp_path)
+
+
+async def measure(name: str, copy, directory: Path) -> None:
+    upload = make_upload(MOV_HEAD, SIZE)
+    tracemalloc.start()
+    started = time.perf_counter()
+    await copy(upload, directory / f"{name}.mov")
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:>14}: {elapsed * 1000:7.1f} ms, peak {peak / 1024 / 1024:6.1f} MB")
+
+
+async def expect_rejected(
+    name: str, upload: UploadFile, directory: Path, max_bytes: int = SIZE
+) -> bool:
+    try:
+        await receive_upload(
+            upload,
+            directory=directory,
+            expected_format="isobmff",
+            max_bytes=max_bytes,
+            chunk_size=CHUNK_SIZE,
+        )
+    except ClientError as error:
+        leftovers = list(directory.glob(".upload-*"))
+        passed = not leftovers
+        print(f"{'OK  ' if passed else 'FAIL'} {name}: {error}")
+        return passed
+    print(f"FAIL {name}: файл принят")
+    return False
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        await measure("read_whole", read_whole, directory)
+        await measure("receive_upload", stream, directory)
+
+        ok = await expect_rejected(
+            "подмена расширения", make_upload(b"MZ\x90\x00", CHUNK_SIZE), directory
+        )
+        oversized = make_upload(MOV_HEAD, SIZE)
+        oversized.size = None
+        ok &= await expect_rejected(
+            "превышение размера", oversized, directory, max_bytes=SIZE // 2
+        )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
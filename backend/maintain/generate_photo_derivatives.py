@@ -0,0 +1,26 @@
+"""Создать недостающие уменьшенные копии для уже загруженных фотографий.
+
+Запуск из backend/src: PYTHONPATH=. python ../maintain/generate_photo_derivatives.py
+"""
+
+import asyncio
+
+from utils.images import derivative_names, derivative_renderer
+from utils.storage import storage_backend
+
+
+async def main():
+    originals = [
+        key for key in await storage_backend.list_keys("") if derivative_names(key)
+    ]
+    try:
+        for index, filename in enumerate(originals, start=1):
+            await derivative_renderer.render_safely(filename)
+            print(f"[{index}/{len(originals)}] {filename}")
+    finally:
+        derivative_renderer.shutdown()
+        await storage_backend.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
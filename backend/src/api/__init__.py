@@ -7,3 +7,4 @@ from .horses import router as horses_router
 from .photos import router as photos_router
 from .prices import router as prices_router
 from .site_settings import router as site_settings_router
+from .storage import router as storage_router
@@ -2,7 +2,7 @@ from typing import Annotated, Literal
 
 from fastapi import APIRouter, Depends, Query
 
-from core.entities.base import PaginatedEntities
+from core.entities.base import CountMode, PaginatedEntities
 from core.schemas.breeds import (
     BreedCreateDto,
     BreedOutDto,
@@ -10,7 +10,9 @@ from core.schemas.breeds import (
     BreedUpdateDto,
 )
 from core.services.breeds import BreedService
+from depends.conditional import breed_not_modified, breeds_not_modified
 from depends.services import get_breed_service
+from depends.utils import replica_safe
 
 router = APIRouter()
 
@@ -20,7 +22,9 @@ router = APIRouter()
     response_model=PaginatedEntities[BreedOutDto],
     tags=["Horse Breeds"],
     description="Получить список пород с фильтрацией и сортировкой",
+    dependencies=[Depends(breeds_not_modified)],
 )
+@replica_safe
 async def get_breeds(
     breed_service: Annotated[BreedService, Depends(get_breed_service)],
     name: str | None = Query(None, description="Фильтр по названию (вхождение)"),
@@ -33,6 +37,10 @@ async def get_breeds(
     ) = Query(None, description="Сортировка"),
     limit: int | None = Query(None, description="Лимит"),
     offset: int | None = Query(None, description="Смещение"),
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчёта total: exact, estimated или cached",
+    ),
 ) -> PaginatedEntities[BreedOutDto]:
     entities, total = await breed_service.get_filtered(
         name=name,
@@ -42,10 +50,12 @@ async def get_breeds(
         sort=sort,
         limit=limit,
         offset=offset,
+        count_mode=count_mode,
     )
     return PaginatedEntities(
         items=[BreedOutDto.model_validate(entity) for entity in entities],
         total=total,
+        total_mode=count_mode,
     )
 
 
@@ -54,7 +64,9 @@ async def get_breeds(
     response_model=BreedOutDto | BreedOutWithPageDataDto,
     tags=["Horse Breeds"],
     description="Получить породу по slug или UUID",
+    dependencies=[Depends(breed_not_modified)],
 )
+@replica_safe
 async def get_breed(
     slug_or_id: str,
     breed_service: Annotated[BreedService, Depends(get_breed_service)],
@@ -2,7 +2,7 @@ from typing import Annotated, Literal
 
 from fastapi import APIRouter, Depends, Query
 
-from core.entities.base import PaginatedEntities
+from core.entities.base import CountMode, PaginatedEntities
 from core.schemas.coat_color import (
     CoatColorCreateDto,
     CoatColorOutDto,
@@ -10,7 +10,9 @@ from core.schemas.coat_color import (
     CoatColorUpdateDto,
 )
 from core.services.coat_color import CoatColorService
+from depends.conditional import coat_color_not_modified, coat_colors_not_modified
 from depends.services import get_coat_color_service
+from depends.utils import replica_safe
 
 router = APIRouter()
 
@@ -20,7 +22,9 @@ router = APIRouter()
     response_model=PaginatedEntities[CoatColorOutDto],
     tags=["Horse Coat Color"],
     description="Получить список мастей с фильтрацией и сортировкой",
+    dependencies=[Depends(coat_colors_not_modified)],
 )
+@replica_safe
 async def get_coat_colors(
     coat_color_service: Annotated[CoatColorService, Depends(get_coat_color_service)],
     name: str | None = Query(None, description="Фильтр по названию (вхождение)"),
@@ -33,6 +37,10 @@ async def get_coat_colors(
     ) = Query(None, description="Сортировка"),
     limit: int | None = Query(None, description="Лимит"),
     offset: int | None = Query(None, description="Смещение"),
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчёта total: exact, estimated или cached",
+    ),
 ) -> PaginatedEntities[CoatColorOutDto]:
     entities, total = await coat_color_service.get_filtered(
         name=name,
@@ -42,10 +50,12 @@ async def get_coat_colors(
         sort=sort,
         limit=limit,
         offset=offset,
+        count_mode=count_mode,
     )
     return PaginatedEntities(
         items=[CoatColorOutDto.model_validate(entity) for entity in entities],
         total=total,
+        total_mode=count_mode,
     )
 
 
@@ -54,7 +64,9 @@ async def get_coat_colors(
     response_model=CoatColorOutDto | CoatColorOutWithPageDataDto,
     tags=["Horse Coat Color"],
     description="Получить масть по slug или UUID",
+    dependencies=[Depends(coat_color_not_modified)],
 )
+@replica_safe
 async def get_coat_color(
     coat_color_service: Annotated[CoatColorService, Depends(get_coat_color_service)],
     slug_or_id: str,
@@ -3,14 +3,16 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query
 
-from core.entities.base import PaginatedEntities
+from core.entities.base import CountMode, PaginatedEntities
 from core.schemas.horse_owner import (
     HorseOwnerCreateInDto,
     HorseOwnerOutDto,
     HorseOwnerUpdateDto,
 )
 from core.services.horse_owner import HorseOwnerService
+from depends.conditional import horse_owner_not_modified, horse_owners_not_modified
 from depends.services import get_horse_owner_service
+from depends.utils import replica_safe
 
 router = APIRouter()
 
@@ -20,7 +22,9 @@ router = APIRouter()
     response_model=PaginatedEntities[HorseOwnerOutDto],
     tags=["Horse Owners"],
     description="Получить список владельцев с фильтрацией и сортировкой",
+    dependencies=[Depends(horse_owners_not_modified)],
 )
+@replica_safe
 async def get_horse_owners(
     horse_owner_service: Annotated[HorseOwnerService, Depends(get_horse_owner_service)],
     name: str | None = Query(None, description="Фильтр по имени (вхождение)"),
@@ -38,6 +42,10 @@ async def get_horse_owners(
     ) = Query(None, description="Сортировка"),
     limit: int | None = Query(None, description="Лимит"),
     offset: int | None = Query(None, description="Смещение"),
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчёта total: exact, estimated или cached",
+    ),
 ) -> PaginatedEntities[HorseOwnerOutDto]:
     entities, total = await horse_owner_service.get_filtered(
         name=name,
@@ -48,10 +56,12 @@ async def get_horse_owners(
         sort=sort,
         limit=limit,
         offset=offset,
+        count_mode=count_mode,
     )
     return PaginatedEntities(
         items=[HorseOwnerOutDto.model_validate(entity) for entity in entities],
         total=total,
+        total_mode=count_mode,
     )
 
 
@@ -60,7 +70,9 @@ async def get_horse_owners(
     response_model=HorseOwnerOutDto,
     tags=["Horse Owners"],
     description="Получить владельца по UUID",
+    dependencies=[Depends(horse_owner_not_modified)],
 )
+@replica_safe
 async def get_horse_owner(
     id: UUID,
     horse_owner_service: Annotated[HorseOwnerService, Depends(get_horse_owner_service)],
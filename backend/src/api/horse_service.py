@@ -2,7 +2,7 @@ from typing import Annotated, Literal
 
 from fastapi import APIRouter, Depends, Query
 
-from core.entities.base import PaginatedEntities
+from core.entities.base import CountMode, PaginatedEntities
 from core.schemas.horse_service import (
     HorseServiceCreateDto,
     HorseServiceOutDto,
@@ -10,7 +10,9 @@ from core.schemas.horse_service import (
     HorseServiceUpdateDto,
 )
 from core.services.horse_service import HorseServiceService
+from depends.conditional import horse_service_not_modified, horse_services_not_modified
 from depends.services import get_horse_service_service
+from depends.utils import replica_safe
 
 router = APIRouter()
 
@@ -20,7 +22,9 @@ router = APIRouter()
     response_model=PaginatedEntities[HorseServiceOutDto],
     tags=["Horse Service"],
     description="Получить список услуг с фильтрацией и сортировкой",
+    dependencies=[Depends(horse_services_not_modified)],
 )
+@replica_safe
 async def get_horse_services(
     horse_service_service: Annotated[
         HorseServiceService, Depends(get_horse_service_service)
@@ -46,6 +50,10 @@ async def get_horse_services(
     ) = Query(None, description="Сортировка"),
     limit: int | None = Query(None, description="Лимит"),
     offset: int | None = Query(None, description="Смещение"),
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчёта total: exact, estimated или cached",
+    ),
 ) -> PaginatedEntities[HorseServiceOutDto]:
     entities, total = await horse_service_service.get_filtered(
         name=name,
@@ -55,10 +63,12 @@ async def get_horse_services(
         sort=sort,
         limit=limit,
         offset=offset,
+        count_mode=count_mode,
     )
     return PaginatedEntities(
         items=[HorseServiceOutDto.model_validate(entity) for entity in entities],
         total=total,
+        total_mode=count_mode,
     )
 
 
@@ -67,7 +77,9 @@ async def get_horse_services(
     response_model=HorseServiceOutDto | HorseServiceOutWithPageDataDto,
     tags=["Horse Service"],
     description="Получить услугу по slug или UUID",
+    dependencies=[Depends(horse_service_not_modified)],
 )
+@replica_safe
 async def get_horse_service(
     horse_service_service: Annotated[
         HorseServiceService, Depends(get_horse_service_service)
@@ -2,10 +2,12 @@ from datetime import date
 from typing import Annotated, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from pydantic import TypeAdapter
 
 from core.entities import (
     _HORSE_AVAILABLE_SORT_FIELDS,
+    CountMode,
     HorseKindEnum,
     HorseSexEnum,
     PaginatedEntities,
@@ -19,17 +21,31 @@ from core.schemas import (
     UserOutDto,
 )
 from core.services.horse import HorseService
+from depends.conditional import horses_not_modified
 from depends.services import get_current_user, get_horse_service
+from depends.utils import replica_safe
+from settings import settings
+from utils.responses import PreSerializedJSONResponse
 
 router = APIRouter()
 
+_HORSE_LIST_ADAPTER = TypeAdapter(
+    PaginatedEntities[HorseOutDto | HorseWithPedigreeOutDto]
+)
+_HORSE_ADAPTER: TypeAdapter[HorseOutDto | HorseWithPedigreeOutDto] = TypeAdapter(
+    HorseOutDto | HorseWithPedigreeOutDto
+)
+
 
 @router.get(
     "",
     response_model=PaginatedEntities[HorseOutDto | HorseWithPedigreeOutDto],
     description="Получить список лошадей с фильтрацией и сортировкой",
+    dependencies=[Depends(horses_not_modified)],
 )
+@replica_safe
 async def get_horses(
+    response: Response,
     horse_service: Annotated[HorseService, Depends(get_horse_service)],
     current_user: Annotated[UserOutDto | None, Depends(get_current_user)],
     sort: list[_HORSE_AVAILABLE_SORT_FIELDS] | None = Query(
@@ -72,8 +88,19 @@ async def get_horses(
     pedigree: int | None = Query(None, description="Количество поколений"),
     limit: int | None = Query(None, description="Лимит"),
     offset: int | None = Query(None, description="Смещение"),
-) -> PaginatedEntities[HorseOutDto | HorseWithPedigreeOutDto]:
-    return await horse_service.get_filtered_horses(
+    cursor: str | None = Query(
+        None, description="Курсор следующей страницы (next_cursor); заменяет offset"
+    ),
+    with_total: bool | None = Query(
+        None,
+        description="Считать общее количество (по умолчанию только без курсора)",
+    ),
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчёта total: exact, estimated или cached",
+    ),
+) -> PaginatedEntities[HorseOutDto | HorseWithPedigreeOutDto] | Response:
+    horses = await horse_service.get_filtered_horses(
         user=current_user,
         name=name,
         description=description,
@@ -95,23 +122,40 @@ async def get_horses(
         limit=limit,
         offset=offset,
         sort=sort,
+        cursor=cursor,
+        with_total=with_total,
+        count_mode=count_mode,
     )
+    if settings.fast_json_responses:
+        # Заголовки условного GET из зависимостей переносятся в готовый ответ.
+        return PreSerializedJSONResponse.from_adapter(
+            _HORSE_LIST_ADAPTER, horses, headers=response.headers
+        )
+    return horses
 
 
 @router.get(
     "/{slug_or_id}",
     response_model=HorseOutDto | HorseWithPedigreeOutDto,
     description="Получить лошадь по slug или UUID",
+    dependencies=[Depends(horses_not_modified)],
 )
+@replica_safe
 async def get_horse(
+    response: Response,
     current_user: Annotated[UserOutDto | None, Depends(get_current_user)],
     horse_service: Annotated[HorseService, Depends(get_horse_service)],
     slug_or_id: str,
     pedigree: int | None = Query(None, description="Количество поколений"),
-) -> HorseOutDto | HorseWithPedigreeOutDto:
-    return await horse_service.get_horse_by_slug_or_id(
+) -> HorseOutDto | HorseWithPedigreeOutDto | Response:
+    horse = await horse_service.get_horse_by_slug_or_id(
         slug_or_id=slug_or_id, pedigree=pedigree, user=current_user
     )
+    if settings.fast_json_responses:
+        return PreSerializedJSONResponse.from_adapter(
+            _HORSE_ADAPTER, horse, headers=response.headers
+        )
+    return horse
 
 
 @router.post(
@@ -177,6 +221,7 @@ async def set_horse_pedigree(
     description="Получить родословное древо лошади",
     response_model=PaginatedEntities[HorseOutDto],
 )
+@replica_safe
 async def get_horse_pedigree(
     current_user: Annotated[UserOutDto | None, Depends(get_current_user)],
     horse_service: Annotated[HorseService, Depends(get_horse_service)],
@@ -12,15 +12,23 @@ from fastapi import (
     UploadFile,
 )
 
-from core.entities.base import PaginatedEntities
+from core.entities.base import CountMode, PaginatedEntities
 from core.schemas.photos import (
     PhotoBatchDeleteDto,
     PhotoCreateDto,
+    PhotoFinalizeDto,
+    PhotoImportItemDto,
+    PhotoImportReportDto,
     PhotoOutDto,
+    PhotoPresignedUrlDto,
     PhotoUpdateDto,
+    PhotoUploadIntentCreateDto,
+    PhotoUploadIntentDto,
 )
 from core.services.photos import PhotoService
+from depends.conditional import photo_not_modified, photos_not_modified
 from depends.services import get_photo_service
+from depends.utils import replica_safe
 
 router = APIRouter()
 
@@ -30,7 +38,9 @@ router = APIRouter()
     response_model=PaginatedEntities[PhotoOutDto],
     tags=["Photos"],
     description="Получить список фотографий с фильтрацией и сортировкой",
+    dependencies=[Depends(photos_not_modified)],
 )
+@replica_safe
 async def get_photos(
     photo_service: Annotated[PhotoService, Depends(get_photo_service)],
     name: str | None = Query(None, description="Фильтр по названию (вхождение)"),
@@ -52,8 +62,19 @@ async def get_photos(
     ) = Query(None, description="Сортировка"),
     limit: int | None = Query(None, description="Лимит"),
     offset: int | None = Query(None, description="Смещение"),
+    cursor: str | None = Query(
+        None, description="Курсор следующей страницы (next_cursor); заменяет offset"
+    ),
+    with_total: bool | None = Query(
+        None,
+        description="Считать общее количество (по умолчанию только без курсора)",
+    ),
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчёта total: exact, estimated или cached",
+    ),
 ) -> PaginatedEntities[PhotoOutDto]:
-    entities, total = await photo_service.get_filtered(
+    entities, total, next_cursor = await photo_service.get_filtered(
         name=name,
         description=description,
         price_ids=price_ids,
@@ -61,9 +82,17 @@ async def get_photos(
         sort=sort,
         limit=limit,
         offset=offset,
+        cursor=cursor,
+        with_total=with_total,
+        count_mode=count_mode,
     )
     items = [PhotoOutDto.model_validate(entity) for entity in entities]
-    return PaginatedEntities(items=items, total=total)
+    return PaginatedEntities(
+        items=items,
+        total=total,
+        next_cursor=next_cursor,
+        total_mode=None if total is None else count_mode,
+    )
 
 
 @router.get(
@@ -71,7 +100,9 @@ async def get_photos(
     response_model=PhotoOutDto,
     tags=["Photos"],
     description="Получить фотографию по UUID",
+    dependencies=[Depends(photo_not_modified)],
 )
+@replica_safe
 async def get_photo(
     id: UUID,
     photo_service: Annotated[PhotoService, Depends(get_photo_service)],
@@ -83,6 +114,21 @@ async def get_photo(
     return PhotoOutDto.model_validate(photo)
 
 
+@router.get(
+    "/photos/{id}/presigned-url",
+    response_model=PhotoPresignedUrlDto,
+    tags=["Photos"],
+    description="Получить временную ссылку на файл фотографии",
+)
+@replica_safe
+async def get_photo_presigned_url(
+    id: UUID,
+    photo_service: Annotated[PhotoService, Depends(get_photo_service)],
+) -> PhotoPresignedUrlDto:
+    url, expires_in = await photo_service.get_presigned_url(id)
+    return PhotoPresignedUrlDto(url=url, expires_in=expires_in)
+
+
 @router.post(
     "/photos",
     response_model=PhotoOutDto,
@@ -105,6 +151,68 @@ async def create_photo(
     return PhotoOutDto.model_validate(photo)
 
 
+@router.post(
+    "/photos/import",
+    response_model=PhotoImportReportDto,
+    tags=["Photos"],
+    description="Массовый импорт фотографий с отчётом по каждому файлу",
+)
+async def import_photos(
+    photo_service: Annotated[PhotoService, Depends(get_photo_service)],
+    files: list[UploadFile] = File(..., description="Файлы фотографий или видео"),
+    description: str | None = Form(
+        None, description="Описание для всех фотографий (опционально)"
+    ),
+) -> PhotoImportReportDto:
+    results = await photo_service.import_files(files, description)
+    items = [
+        PhotoImportItemDto(
+            filename=filename,
+            status="created" if photo is not None else "failed",
+            photo=PhotoOutDto.model_validate(photo) if photo is not None else None,
+            detail=detail,
+        )
+        for filename, photo, detail in results
+    ]
+    created = sum(item.status == "created" for item in items)
+    return PhotoImportReportDto(
+        created=created, failed=len(items) - created, items=items
+    )
+
+
+@router.post(
+    "/photos/upload-intent",
+    response_model=PhotoUploadIntentDto,
+    tags=["Photos"],
+    description=(
+        "Получить ссылку для загрузки файла напрямую в хранилище; "
+        "после загрузки вызвать /photos/{id}/finalize"
+    ),
+)
+async def create_photo_upload_intent(
+    photo_service: Annotated[PhotoService, Depends(get_photo_service)],
+    data: PhotoUploadIntentCreateDto = Body(...),
+) -> PhotoUploadIntentDto:
+    id, upload_url, expires_in = await photo_service.create_upload_intent(data)
+    return PhotoUploadIntentDto(id=id, upload_url=upload_url, expires_in=expires_in)
+
+
+@router.post(
+    "/photos/{id}/finalize",
+    response_model=PhotoOutDto,
+    tags=["Photos"],
+    description="Проверить загруженный по ссылке файл и создать фотографию",
+)
+async def finalize_photo_upload(
+    id: UUID,
+    photo_service: Annotated[PhotoService, Depends(get_photo_service)],
+    data: PhotoFinalizeDto = Body(...),
+) -> PhotoOutDto:
+    photo = await photo_service.finalize_upload(id, data)
+
+    return PhotoOutDto.model_validate(photo)
+
+
 @router.patch(
     "/photos/{id}",
     response_model=PhotoOutDto,
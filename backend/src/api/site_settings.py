@@ -1,17 +1,21 @@
 from typing import Annotated, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query, Response
 
-from core.entities.base import PaginatedEntities
+from core.entities.base import CountMode, PaginatedEntities
 from core.schemas.site_settings import (
     SiteSettingCreateDto,
     SiteSettingOutDto,
     SiteSettingSimpleOutDto,
+    SiteSettingsSnapshotOutDto,
     SiteSettingUpdateDto,
 )
 from core.services.site_settings import SiteSettingsService
+from depends.conditional import site_setting_not_modified, site_settings_not_modified
 from depends.services import get_site_settings_service
+from depends.utils import replica_safe
+from utils.responses import PreSerializedJSONResponse, etag_matches
 
 router = APIRouter()
 
@@ -20,7 +24,9 @@ router = APIRouter()
     "/site_settings",
     tags=["Site Settings"],
     description="Получить список настроек с фильтрацией и сортировкой",
+    dependencies=[Depends(site_settings_not_modified)],
 )
+@replica_safe
 async def get_site_settings(
     site_settings_service: Annotated[
         SiteSettingsService, Depends(get_site_settings_service)
@@ -55,7 +61,19 @@ async def get_site_settings(
         False,
         description="Полный список с пагинацией (по умолчанию только key, value, type)",
     ),
+    count_mode: CountMode = Query(
+        CountMode.EXACT,
+        description="Способ подсчёта total: exact, estimated или cached",
+    ),
 ):
+    if not full and not (name or value or description or sort):
+        # Публичный сайт читает настройки по ключам и типам: отдаём из снимка
+        snapshot = await site_settings_service.get_snapshot()
+        return [
+            SiteSettingSimpleOutDto.model_validate(entity)
+            for entity in snapshot.filter(keys=key, types=type)
+        ]
+
     entities, total = await site_settings_service.get_filtered(
         key=key,
         name=name,
@@ -65,6 +83,7 @@ async def get_site_settings(
         sort=sort,
         limit=limit if full else None,  # Без full=true игнорируем пагинацию
         offset=offset if full else None,
+        count_mode=count_mode,
     )
 
     if not full:
@@ -75,15 +94,38 @@ async def get_site_settings(
     return PaginatedEntities(
         items=[SiteSettingOutDto.model_validate(entity) for entity in entities],
         total=total,
+        total_mode=count_mode,
     )
 
 
+@router.get(
+    "/site_settings/snapshot",
+    response_model=SiteSettingsSnapshotOutDto,
+    tags=["Site Settings"],
+    description="Получить все настройки одним объектом со значениями, приведёнными к типам",
+)
+@replica_safe
+async def get_site_settings_snapshot(
+    site_settings_service: Annotated[
+        SiteSettingsService, Depends(get_site_settings_service)
+    ],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    snapshot = await site_settings_service.get_snapshot()
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if if_none_match is not None and etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return PreSerializedJSONResponse(snapshot.body, headers=headers)
+
+
 @router.get(
     "/site_settings/{id}",
     response_model=SiteSettingOutDto,
     tags=["Site Settings"],
     description="Получить настройку по UUID",
+    dependencies=[Depends(site_setting_not_modified)],
 )
+@replica_safe
 async def get_site_setting(
     id: UUID,
     site_settings_service: Annotated[
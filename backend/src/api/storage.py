@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from settings import settings
+from utils.storage import LocalStorageBackend, storage_backend
+from utils.uploads import receive_stream, size_limit_error
+
+router = APIRouter()
+
+
+@router.put(
+    "/storage/{key:path}",
+    status_code=204,
+    include_in_schema=False,
+)
+async def upload_to_storage(
+    key: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+) -> None:
+    """Приём файла по ссылке из presigned_url локального хранилища.
+
+    Тело запроса пишется на диск по мере получения, без multipart и без
+    обращений к базе данных. Для S3 эту роль выполняет само хранилище.
+    """
+    if not isinstance(
+        storage_backend, LocalStorageBackend
+    ) or not storage_backend.verify_upload(key, expires=expires, signature=signature):
+        raise HTTPException(status_code=403, detail="Недействительная ссылка загрузки")
+
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.upload_max_bytes:
+        raise size_limit_error(settings.upload_max_bytes)
+
+    received = await receive_stream(
+        request.stream(),
+        directory=storage_backend.staging_dir,
+        max_bytes=settings.upload_max_bytes,
+    )
+    try:
+        await storage_backend.save(key, received.temp_path)
+    finally:
+        await received.discard()
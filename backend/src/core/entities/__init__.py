@@ -1,4 +1,4 @@
-from .base import Entity, PaginatedEntities, SlugMixin, TimeStampMixin
+from .base import CountMode, Entity, PaginatedEntities, SlugMixin, TimeStampMixin
 from .breeds import Breed
 from .coat_color import CoatColor
 from .horse import (
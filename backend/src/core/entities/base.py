@@ -1,5 +1,6 @@
 import re
 from datetime import datetime
+from enum import StrEnum, auto
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
@@ -141,6 +142,14 @@ class Entity(BaseModel):
         return self
 
 
+class CountMode(StrEnum):
+    """Способ подсчёта общего количества элементов списка."""
+
+    EXACT = auto()
+    ESTIMATED = auto()
+    CACHED = auto()
+
+
 class PaginatedEntities[T](BaseModel):
     """Пагинированный список сущностей или DTO."""
 
@@ -148,7 +157,15 @@ class PaginatedEntities[T](BaseModel):
         default_factory=list,
         description="Список элементов",
     )
-    total: int = Field(
+    total: int | None = Field(
         default=0,
-        description="Общее количество элементов",
+        description="Общее количество элементов (None, если не запрашивалось)",
+    )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Курсор следующей страницы (None на последней странице)",
+    )
+    total_mode: CountMode | None = Field(
+        default=None,
+        description="Способ, которым получен total (None, если total не считался)",
     )
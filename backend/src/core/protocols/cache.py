@@ -0,0 +1,14 @@
+from typing import Iterable, Protocol, Sequence
+
+
+class CacheBackendProtocol(Protocol):
+    """Хранилище кэша репозиториев с версиями таблиц для инвалидации.
+
+    get_versions возвращает None, если версии получить не удалось, — тогда
+    кэш для запроса не используется.
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+    async def set(self, key: str, value: bytes, *, ttl_seconds: float) -> None: ...
+    async def get_versions(self, tables: Sequence[str]) -> list[int] | None: ...
+    async def bump_versions(self, tables: Iterable[str]) -> None: ...
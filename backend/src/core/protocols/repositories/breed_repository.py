@@ -1,6 +1,7 @@
 from typing import Literal, Protocol
 from uuid import UUID
 
+from core.entities.base import CountMode
 from core.entities.breeds import Breed
 
 from .base_repository import BaseRepositoryProtocol
@@ -26,4 +27,5 @@ class BreedRepositoryProtocol(BaseRepositoryProtocol[Breed], Protocol):
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[Breed], int]: ...
@@ -1,5 +1,6 @@
 from typing import Literal, Protocol
 
+from core.entities.base import CountMode
 from core.entities.horse_owner import HorseOwner
 
 from .base_repository import BaseRepositoryProtocol
@@ -22,4 +23,5 @@ class HorseOwnerRepositoryProtocol(BaseRepositoryProtocol[HorseOwner], Protocol)
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[HorseOwner], int]: ...
@@ -4,6 +4,7 @@ from uuid import UUID
 
 from core.entities import (
     _HORSE_AVAILABLE_SORT_FIELDS,
+    CountMode,
     Horse,
     HorseChildren,
     HorseKindEnum,
@@ -57,7 +58,12 @@ class HorseRepositoryProtocol(BaseRepositoryProtocol[Horse], Protocol):
         offset: int | None = None,
         sort: list[_HORSE_AVAILABLE_SORT_FIELDS] | None = None,
         pedigree: int | None = None,
-    ) -> tuple[Mapping[UUID, HorseOutDto | HorseWithPedigreeOutDto], int]:
+        cursor: str | None = None,
+        with_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> tuple[
+        Mapping[UUID, HorseOutDto | HorseWithPedigreeOutDto], int | None, str | None
+    ]:
         """Получить полную информацию о лошадях c породой, мастью, владельцем, фотографиями и услугами с возможностью фильтрации и сортировки"""
         ...
 
@@ -1,6 +1,7 @@
 from typing import Literal, Protocol
 from uuid import UUID
 
+from core.entities.base import CountMode
 from core.entities.horse_service import HorseServiceEntity
 
 from .base_repository import BaseRepositoryProtocol
@@ -39,4 +40,5 @@ class HorseServiceRepositoryProtocol(
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[HorseServiceEntity], int]: ...
@@ -1,6 +1,7 @@
-from typing import Literal, Protocol
+from typing import Awaitable, Callable, Iterable, Literal, Protocol
 from uuid import UUID
 
+from core.entities.base import CountMode
 from core.entities.photos import Photo
 
 from .base_repository import BaseRepositoryProtocol
@@ -8,6 +9,7 @@ from .base_repository import BaseRepositoryProtocol
 
 class PhotoRepositoryProtocol(BaseRepositoryProtocol[Photo], Protocol):
     async def find_by_name(self, name: str) -> Photo | None: ...
+    async def find_names_with_prefixes(self, prefixes: Iterable[str]) -> set[str]: ...
     async def get_filtered(
         self,
         *,
@@ -30,5 +32,13 @@ class PhotoRepositoryProtocol(BaseRepositoryProtocol[Photo], Protocol):
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
-    ) -> tuple[list[Photo], int]: ...
+        cursor: str | None = None,
+        with_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> tuple[list[Photo], int | None, str | None]: ...
+    async def lock_path(self, path: str) -> None: ...
+    async def count_by_path(self, path: str) -> int: ...
     async def batch_delete(self, ids: list[UUID]) -> None: ...
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None: ...
+    def after_rollback(self, callback: Callable[[], Awaitable[None]]) -> None: ...
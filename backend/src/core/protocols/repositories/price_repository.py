@@ -1,7 +1,13 @@
-from typing import Literal, Protocol
+from typing import Literal, Protocol, Sequence
 from uuid import UUID
 
+from core.entities.base import CountMode
 from core.entities.prices import Price, PriceGroup, PriceGroupsRelation, PricePhotos
+from core.schemas.prices import (
+    PriceOutDto,
+    PriceOutWithPageDataDto,
+    PriceOutWithTablesDto,
+)
 
 from .base_repository import BaseRepositoryProtocol
 
@@ -16,6 +22,7 @@ class PriceGroupRepositoryProtocol(BaseRepositoryProtocol[PriceGroup], Protocol)
         sort: list[Literal["name", "-name"]] | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[PriceGroup], int]: ...
 
 
@@ -31,7 +38,19 @@ class PriceRepositoryProtocol(BaseRepositoryProtocol[Price], Protocol):
         sort: list[Literal["name", "-name"]] | None = None,
         limit: int | None = None,
         offset: int | None = None,
-    ) -> tuple[list[Price], int]: ...
+        cursor: str | None = None,
+        with_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> tuple[list[Price], int | None, str | None]: ...
+
+    async def get_with_relations(
+        self,
+        prices: Sequence[Price],
+        *,
+        include_page_data: bool = False,
+        include_tables: bool = False,
+    ) -> list[PriceOutDto | PriceOutWithPageDataDto | PriceOutWithTablesDto]: ...
+
     async def get_price_groups(self, price_id: UUID) -> list[PriceGroupsRelation]: ...
     async def set_price_groups(self, price_id: UUID, group_ids: list[UUID]) -> None: ...
     async def get_price_photos(self, price_id: UUID) -> list[PricePhotos]: ...
@@ -1,5 +1,6 @@
 from typing import Literal, Protocol
 
+from core.entities.base import CountMode
 from core.entities.site_settings import SiteSetting
 
 from .base_repository import BaseRepositoryProtocol
@@ -8,6 +9,7 @@ from .base_repository import BaseRepositoryProtocol
 class SiteSettingsRepositoryProtocol(BaseRepositoryProtocol[SiteSetting], Protocol):
     async def find_by_key(self, key: str) -> SiteSetting | None: ...
     async def find_by_name(self, name: str) -> SiteSetting | None: ...
+    async def get_all_ordered_by_key(self) -> list[SiteSetting]: ...
     async def get_filtered(
         self,
         *,
@@ -35,4 +37,5 @@ class SiteSettingsRepositoryProtocol(BaseRepositoryProtocol[SiteSetting], Protoc
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[SiteSetting], int]: ...
@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Awaitable, Callable, Protocol
 from uuid import UUID
 
 from core.entities.user import User, UserScope, UserScopeRelation
@@ -9,6 +9,7 @@ from .base_repository import BaseRepositoryProtocol
 class UserRepositoryProtocol(BaseRepositoryProtocol[User], Protocol):
     async def get_by_username(self, username: str) -> User | None: ...
     async def get_user_scopes(self, user_id: UUID) -> list[UserScope]: ...
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None: ...
 
 
 class UserScopeRepositoryProtocol(BaseRepositoryProtocol[UserScope], Protocol): ...
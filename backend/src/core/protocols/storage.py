@@ -0,0 +1,35 @@
+from pathlib import Path
+from typing import Literal, Protocol
+
+
+class StorageBackendProtocol(Protocol):
+    """Хранилище медиафайлов. Ключ — путь файла относительно корня хранилища.
+
+    staging_dir — каталог для временных файлов загрузки: из него save
+    переносит файл в хранилище. local_path возвращает путь к файлу на диске,
+    если хранилище локальное, иначе None. get_size возвращает None для
+    отсутствующего ключа, move переносит объект внутри хранилища.
+    delete_expired удаляет ключи prefix, изменённые раньше older_than (unix
+    time), и забытые временные файлы staging_dir; возвращает их число.
+    """
+
+    staging_dir: Path
+
+    def url(self, key: str) -> str: ...
+    def local_path(self, key: str) -> Path | None: ...
+    async def exists(self, key: str) -> bool: ...
+    async def get_size(self, key: str) -> int | None: ...
+    async def read_head(self, key: str, length: int) -> bytes: ...
+    async def content_digest(self, key: str) -> str: ...
+    async def save(self, key: str, source: Path) -> None: ...
+    async def move(self, source_key: str, key: str) -> None: ...
+    async def download(self, key: str, destination: Path) -> None: ...
+    async def delete(self, key: str) -> None: ...
+    async def list_keys(self, prefix: str) -> list[str]: ...
+    async def delete_expired(self, prefix: str, *, older_than: float) -> int: ...
+
+    async def presigned_url(
+        self, key: str, *, method: Literal["GET", "PUT"] = "GET", expires_in: int
+    ) -> str: ...
+
+    async def close(self) -> None: ...
@@ -24,9 +24,15 @@ from .horses import (
 from .photos import (
     PhotoBatchDeleteDto,
     PhotoCreateDto,
+    PhotoFinalizeDto,
+    PhotoImportItemDto,
+    PhotoImportReportDto,
     PhotoOutDto,
     PhotoOutShortDto,
+    PhotoPresignedUrlDto,
     PhotoUpdateDto,
+    PhotoUploadIntentCreateDto,
+    PhotoUploadIntentDto,
 )
 from .prices import (
     PriceCreateDto,
@@ -82,6 +88,12 @@ __all__ = [
     "PhotoUpdateDto",
     "PhotoOutShortDto",
     "PhotoBatchDeleteDto",
+    "PhotoPresignedUrlDto",
+    "PhotoUploadIntentCreateDto",
+    "PhotoUploadIntentDto",
+    "PhotoFinalizeDto",
+    "PhotoImportItemDto",
+    "PhotoImportReportDto",
     "BreedOutDto",
     "BreedCreateDto",
     "BreedUpdateDto",
@@ -1,11 +1,17 @@
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
 from pydantic import Field, computed_field, field_serializer
 
 from core.entities.photos import Photo
 from core.schemas.baseschema import BaseSchema
-from settings import settings
+from utils.images import build_srcset
+from utils.storage import storage_backend
+
+
+def _media_url(filename: str) -> str:
+    return storage_backend.url(filename)
 
 
 class PhotoOutDto(BaseSchema):
@@ -31,8 +37,13 @@ class PhotoOutDto(BaseSchema):
     @property
     def url(self) -> str:
         """Вычисляемый URL для фотографии."""
-        protocol = "https" if not settings.debug else "http"
-        return f"{protocol}://{settings.cms_backend_domain}/media/{self.path}"
+        return _media_url(self.path)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def srcset(self) -> dict[str, str]:
+        """srcset уменьшенных копий по MIME-типам (пусто для видео и SVG)."""
+        return build_srcset(self.path, _media_url)
 
     class Config:
         from_attributes = True
@@ -61,11 +72,14 @@ class PhotoUpdateDto(BaseSchema):
 
 
 class PhotoOutShortDto(BaseSchema):
-    """Упрощенный DTO для фотографии - только id, is_main и url."""
+    """Упрощенный DTO для фотографии - только id, is_main, url и srcset."""
 
     id: UUID
     is_main: bool
     url: str
+    srcset: dict[str, str] = Field(
+        default_factory=dict, description="srcset уменьшенных копий по MIME-типам"
+    )
 
     @field_serializer("id")
     def serialize_id(self, value: UUID) -> str:
@@ -79,3 +93,55 @@ class PhotoBatchDeleteDto(BaseSchema):
     """DTO для массового удаления фотографий."""
 
     ids: list[UUID] = Field(..., description="Список UUID фотографий для удаления")
+
+
+class PhotoImportItemDto(BaseSchema):
+    """Результат импорта одного файла."""
+
+    filename: str = Field(..., description="Имя файла в запросе")
+    status: Literal["created", "failed"] = Field(..., description="Итог импорта")
+    photo: PhotoOutDto | None = Field(None, description="Созданная фотография")
+    detail: str | None = Field(None, description="Причина ошибки")
+
+
+class PhotoImportReportDto(BaseSchema):
+    """DTO отчёта о массовом импорте фотографий."""
+
+    created: int = Field(..., description="Количество созданных фотографий")
+    failed: int = Field(..., description="Количество файлов с ошибкой")
+    items: list[PhotoImportItemDto] = Field(
+        ..., description="Результаты в порядке файлов запроса"
+    )
+
+
+class PhotoPresignedUrlDto(BaseSchema):
+    """DTO временной ссылки на файл фотографии."""
+
+    url: str = Field(..., description="Подписанная ссылка на файл")
+    expires_in: int = Field(..., description="Срок действия ссылки в секундах")
+
+
+class PhotoUploadIntentCreateDto(BaseSchema):
+    """DTO запроса на прямую загрузку файла в хранилище."""
+
+    filename: str = Field(..., description="Имя загружаемого файла")
+    size: int | None = Field(None, description="Размер файла в байтах")
+
+
+class PhotoUploadIntentDto(BaseSchema):
+    """DTO ссылки для прямой загрузки файла в хранилище."""
+
+    id: UUID = Field(..., description="UUID будущей фотографии")
+    upload_url: str = Field(..., description="Подписанная ссылка для загрузки")
+    method: str = Field(default="PUT", description="HTTP-метод загрузки")
+    expires_in: int = Field(..., description="Срок действия ссылки в секундах")
+
+    @field_serializer("id")
+    def serialize_id(self, value: UUID) -> str:
+        return str(value)
+
+
+class PhotoFinalizeDto(PhotoCreateDto):
+    """DTO завершения прямой загрузки: проверка файла и создание фотографии."""
+
+    filename: str = Field(..., description="Имя загруженного файла")
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
 from pydantic import Field, field_serializer
@@ -44,6 +45,13 @@ class SiteSettingSimpleOutDto(BaseSchema):
         from_attributes = True
 
 
+class SiteSettingsSnapshotOutDto(BaseSchema):
+    """DTO снимка всех настроек: значения приведены к типам настроек."""
+
+    version: int = Field(..., description="Версия снимка в текущем воркере")
+    settings: dict[str, Any] = Field(..., description="Значения настроек по ключам")
+
+
 class SiteSettingCreateDto(BaseSchema):
     """DTO для создания настройки."""
 
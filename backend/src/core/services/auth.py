@@ -1,19 +1,152 @@
+import hashlib
+import time
+from typing import Iterable
+
 from core.entities.user import User
 from core.exceptions.auth import InvalidCredentials, UserAlreadyExists
 from core.protocols.repositories.user_repository import UserRepositoryProtocol
 from core.protocols.security import SecurityProtocol
 from core.schemas.auth import AuthTokens, LoginData, RegisterData
 from core.schemas.users import UserOutDto
+from settings import settings
+from utils.cache import has_shared_versions, shared_versions, watch_tables
+from utils.table_events import on_tables_committed
+
+_CURRENT_USER_CACHE_MAX_ENTRIES = 1024
+_USER_TABLES = ("users", "user_scopes", "user_scopes_relations")
+
+
+class CurrentUserCache:
+    """Пользователи со scopes, уже найденные по access-токену.
+
+    Ключ — хэш токена; запись живёт не дольше ttl_seconds и не дольше exp токена.
+    Сбрасывается явно (invalidate) при изменении пользователя или его scopes и
+    после коммита транзакций, изменивших таблицы пользователей. Коммиты других
+    воркеров видны по общим версиям этих таблиц в Redis: при их изменении кэш
+    сбрасывается целиком, а при недоступном Redis не используется.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version = 1
+        self._shared_versions: list[int] | None = None
+        self._entries: dict[str, tuple[UserOutDto, float]] = {}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+    async def _sync_shared_versions(self) -> bool:
+        """Сбросить кэш, если таблицы пользователей изменил другой воркер.
+
+        Возвращает False, если общие версии нужны, но не получены.
+        """
+        if not has_shared_versions():
+            return True
+        versions = await shared_versions(_USER_TABLES)
+        if versions is None or versions != self._shared_versions:
+            self.invalidate()
+            self._shared_versions = versions
+        return versions is not None
+
+    async def get(self, token: str) -> UserOutDto | None:
+        if not await self._sync_shared_versions():
+            self.misses += 1
+            return None
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= time.time():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def set(
+        self, token: str, user: UserOutDto, *, expires_at: float, version: int
+    ) -> None:
+        # Пока пользователь загружался, кэш могли сбросить: такой результат устарел.
+        if version != self._version:
+            return
+        if has_shared_versions() and self._shared_versions is None:
+            return
+        if len(self._entries) >= self.max_entries:
+            now = time.time()
+            self._entries = {
+                key: entry for key, entry in self._entries.items() if entry[1] > now
+            }
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+        self._entries[self._key(token)] = (
+            user,
+            min(time.time() + self.ttl_seconds, expires_at),
+        )
+
+    def invalidate(
+        self, tables: Iterable[str] | None = None, *, username: str | None = None
+    ) -> None:
+        """Сбросить записи пользователя username или, если он не указан, все записи."""
+        self._version += 1
+        if username is None:
+            self._entries.clear()
+            return
+        self._entries = {
+            key: entry
+            for key, entry in self._entries.items()
+            if entry[0].username != username
+        }
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            # Каждое попадание экономит запрос пользователя и запрос его scopes.
+            "saved_queries": self.hits * 2,
+        }
+
+
+current_user_cache = CurrentUserCache(
+    # Без общих версий изменения из других воркеров не видны: кэш только при WORKERS=1.
+    ttl_seconds=(
+        settings.current_user_cache_ttl_seconds
+        if settings.workers == 1 or has_shared_versions()
+        else 0
+    ),
+    max_entries=_CURRENT_USER_CACHE_MAX_ENTRIES,
+)
+on_tables_committed(_USER_TABLES, current_user_cache.invalidate)
+watch_tables(_USER_TABLES)
 
 
 class AuthService:
     def __init__(
-        self, user_repository: UserRepositoryProtocol, security: SecurityProtocol
+        self,
+        user_repository: UserRepositoryProtocol,
+        security: SecurityProtocol,
+        user_cache: CurrentUserCache = current_user_cache,
     ):
         self.user_repository = user_repository
         self.security = security
+        self.user_cache = user_cache
 
     async def get_current_user(self, token: str) -> UserOutDto:
+        cached = await self.user_cache.get(token)
+        if cached is not None:
+            return cached
+        version = self.user_cache.version
+
         payload = self.security.decode_token(token)
         if not payload:
             raise InvalidCredentials("Недействительный или просроченный токен")
@@ -32,7 +165,11 @@ class AuthService:
         user_dict = user.model_dump()
         user_dict["scopes"] = scopes
 
-        return UserOutDto.model_validate(user_dict)
+        current_user = UserOutDto.model_validate(user_dict)
+        self.user_cache.set(
+            token, current_user, expires_at=payload["exp"], version=version
+        )
+        return current_user
 
     async def register(self, data: RegisterData) -> UserOutDto:
         if await self.user_repository.get_by_username(username=data.username):
@@ -43,6 +180,14 @@ class AuthService:
         data.password = self.security.hash_password(data.password)
         user = User(**data.model_dump())
         user = await self.user_repository.create(user)
+        # Токены удалённого ранее пользователя с тем же именем не должны
+        # получить его прежние scopes.
+        username = user.username
+
+        async def invalidate_cached_user() -> None:
+            self.user_cache.invalidate(username=username)
+
+        self.user_repository.after_commit(invalidate_cached_user)
         # Optionally, send a welcome email here
         return UserOutDto.model_validate(user)
 
@@ -1,7 +1,7 @@
 from typing import Literal
 from uuid import UUID
 
-from core.entities.base import _generate_slug
+from core.entities.base import CountMode, _generate_slug
 from core.entities.breeds import Breed
 from core.exceptions.base import ClientError
 from core.protocols.repositories.breed_repository import BreedRepositoryProtocol
@@ -124,6 +124,7 @@ class BreedService:
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[Breed], int]:
         """Получить отфильтрованный список пород."""
         return await self.breed_repository.get_filtered(
@@ -134,4 +135,5 @@ class BreedService:
             sort=sort,
             limit=limit,
             offset=offset,
+            count_mode=count_mode,
         )
@@ -1,6 +1,7 @@
 from typing import Literal
 from uuid import UUID
 
+from core.entities.base import CountMode
 from core.entities.coat_color import CoatColor
 from core.exceptions.base import ClientError
 from core.protocols.repositories.coat_color_repository import (
@@ -133,6 +134,7 @@ class CoatColorService:
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[CoatColor], int]:
         """Получить отфильтрованный список мастей."""
         return await self.coat_color_repository.get_filtered(
@@ -143,4 +145,5 @@ class CoatColorService:
             sort=sort,
             limit=limit,
             offset=offset,
+            count_mode=count_mode,
         )
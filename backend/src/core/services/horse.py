@@ -8,6 +8,7 @@ from core.entities import (
     _HORSE_AVAILABLE_SORT_FIELDS,
     Breed,
     CoatColor,
+    CountMode,
     Horse,
     HorseKindEnum,
     HorseOwner,
@@ -409,8 +410,14 @@ class HorseService:
         limit: int | None = 25,
         offset: int | None = 0,
         sort: list[_HORSE_AVAILABLE_SORT_FIELDS] | None = None,
+        cursor: str | None = None,
+        with_total: bool | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> PaginatedEntities[HorseOutDto | HorseWithPedigreeOutDto]:
-        """Получить отфильтрованный список лошадей."""
+        """Получить отфильтрованный список лошадей.
+
+        По умолчанию общее количество считается только для страниц без курсора.
+        """
         if limit is not None and limit > 100:
             limit = 100
         if limit is not None and limit < 1:
@@ -421,31 +428,40 @@ class HorseService:
             pedigree = 3
         if pedigree is not None and pedigree < 0:
             pedigree = None
-        horses, total = await self.horse_repository.get_horse_list_full_info(
-            name=name,
-            description=description,
-            breed_ids=breed_ids,
-            coat_color_ids=coat_color_ids,
-            kind=kind,
-            height_gte=height_gte,
-            height_lte=height_lte,
-            sex=sex,
-            bdate_gte=bdate_gte,
-            bdate_lte=bdate_lte,
-            ddate_gte=ddate_gte,
-            ddate_lte=ddate_lte,
-            horse_owner_ids=horse_owner_ids,
-            this_stable=this_stable,
-            exclude_ids=exclude_ids,
-            include_ids=include_ids,
-            limit=limit,
-            offset=offset,
-            sort=sort,
-            pedigree=pedigree,
+        if with_total is None:
+            with_total = cursor is None
+        horses, total, next_cursor = (
+            await self.horse_repository.get_horse_list_full_info(
+                name=name,
+                description=description,
+                breed_ids=breed_ids,
+                coat_color_ids=coat_color_ids,
+                kind=kind,
+                height_gte=height_gte,
+                height_lte=height_lte,
+                sex=sex,
+                bdate_gte=bdate_gte,
+                bdate_lte=bdate_lte,
+                ddate_gte=ddate_gte,
+                ddate_lte=ddate_lte,
+                horse_owner_ids=horse_owner_ids,
+                this_stable=this_stable,
+                exclude_ids=exclude_ids,
+                include_ids=include_ids,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+                pedigree=pedigree,
+                cursor=cursor,
+                with_total=with_total,
+                count_mode=count_mode,
+            )
         )
         return PaginatedEntities(
             items=list(horses.values()),
             total=total,
+            next_cursor=next_cursor,
+            total_mode=None if total is None else count_mode,
         )
 
     async def add_horse_service(self):
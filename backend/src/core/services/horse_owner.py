@@ -1,6 +1,7 @@
 from typing import Literal
 from uuid import UUID
 
+from core.entities.base import CountMode
 from core.entities.horse_owner import HorseOwner
 from core.exceptions.base import ClientError
 from core.protocols.repositories.horse_owner_repository import (
@@ -57,6 +58,7 @@ class HorseOwnerService:
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[HorseOwner], int]:
         """Получить отфильтрованный список владельцев."""
         return await self.horse_owner_repository.get_filtered(
@@ -68,4 +70,5 @@ class HorseOwnerService:
             sort=sort,
             limit=limit,
             offset=offset,
+            count_mode=count_mode,
         )
@@ -1,6 +1,7 @@
 from typing import Literal
 from uuid import UUID
 
+from core.entities.base import CountMode
 from core.entities.horse_service import HorseServiceEntity
 from core.exceptions.base import ClientError
 from core.protocols.repositories.horse_service_repository import (
@@ -149,6 +150,7 @@ class HorseServiceService:
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[HorseServiceEntity], int]:
         """Получить отфильтрованный список услуг."""
         return await self.horse_service_repository.get_filtered(
@@ -159,4 +161,5 @@ class HorseServiceService:
             sort=sort,
             limit=limit,
             offset=offset,
+            count_mode=count_mode,
         )
@@ -1,21 +1,75 @@
-import os
-import uuid
+import asyncio
+import io
 from pathlib import Path
 from typing import Literal
-from uuid import UUID
+from uuid import UUID, uuid4
 
+from fastapi import UploadFile
+
+from core.entities.base import CountMode
 from core.entities.photos import Photo
 from core.exceptions.base import ClientError
 from core.protocols.repositories.photo_repository import PhotoRepositoryProtocol
-from core.schemas.photos import PhotoCreateDto, PhotoUpdateDto
+from core.protocols.storage import StorageBackendProtocol
+from core.schemas.photos import (
+    PhotoCreateDto,
+    PhotoFinalizeDto,
+    PhotoUpdateDto,
+    PhotoUploadIntentCreateDto,
+)
 from settings import settings
+from utils.images import DerivativeRenderer, derivative_renderer
+from utils.storage import UPLOADS_PREFIX, storage_backend
+from utils.uploads import (
+    MEDIA_HEAD_BYTES,
+    ReceivedUpload,
+    content_path,
+    receive_upload,
+    size_limit_error,
+    sniff_media_format,
+)
+
+# Допустимые расширения и формат, который должна показать сигнатура файла.
+_MEDIA_FORMATS = {
+    # Изображения
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".png": "png",
+    ".gif": "gif",
+    ".bmp": "bmp",
+    ".webp": "webp",
+    ".svg": "svg",
+    ".ico": "ico",
+    ".tiff": "tiff",
+    ".tif": "tiff",
+    ".heic": "isobmff",
+    ".heif": "isobmff",
+    # Видео
+    ".mp4": "isobmff",
+    ".avi": "avi",
+    ".mov": "isobmff",
+    ".wmv": "asf",
+    ".flv": "flv",
+    ".webm": "matroska",
+    ".mkv": "matroska",
+    ".m4v": "isobmff",
+    ".3gp": "isobmff",
+    ".ogv": "ogg",
+    ".mpeg": "mpeg",
+    ".mpg": "mpeg",
+}
 
 
 class PhotoService:
-    def __init__(self, photo_repository: PhotoRepositoryProtocol):
+    def __init__(
+        self,
+        photo_repository: PhotoRepositoryProtocol,
+        renderer: DerivativeRenderer = derivative_renderer,
+        storage: StorageBackendProtocol = storage_backend,
+    ):
         self.photo_repository = photo_repository
-        self.media_dir = Path(__file__).parent.parent.parent / "media"
-        self.media_dir.mkdir(parents=True, exist_ok=True)
+        self.renderer = renderer
+        self.storage = storage
 
     async def _generate_unique_name(
         self, base_name: str, exclude_id: UUID | None = None
@@ -32,101 +86,129 @@ class PhotoService:
             current_name = f"{base_name}-{counter}"
             counter += 1
 
+    async def _generate_unique_names(self, base_names: list[str]) -> list[str]:
+        """Уникальные названия для нескольких фотографий одним запросом к БД.
+
+        Схема суффиксов та же, что у _generate_unique_name; названия внутри
+        набора тоже не повторяются.
+        """
+        taken = await self.photo_repository.find_names_with_prefixes(base_names)
+        names = []
+        for base_name in base_names:
+            counter = 1
+            current_name = base_name
+            while current_name in taken:
+                current_name = f"{base_name}-{counter}"
+                counter += 1
+            taken.add(current_name)
+            names.append(current_name)
+        return names
+
     def _get_file_extension(self, filename: str) -> str:
         return Path(filename).suffix
 
-    def _generate_filename(self, original_filename: str) -> str:
-        extension = self._get_file_extension(original_filename)
-        unique_id = str(uuid.uuid4())
-        return f"{unique_id}{extension}"
+    def _get_url(self, filename: str) -> str:
+        return self.storage.url(filename)
+
+    async def _receive_file(
+        self, file: UploadFile, original_filename: str
+    ) -> tuple[ReceivedUpload, str]:
+        """Принять файл во временный файл и вычислить его путь по хэшу."""
+        media_format = self._validate_file_type(original_filename)
+        received = await receive_upload(
+            file,
+            directory=self.storage.staging_dir,
+            expected_format=media_format,
+            max_bytes=settings.upload_max_bytes,
+            chunk_size=settings.upload_chunk_size,
+        )
+        filename = content_path(
+            received.digest, self._get_file_extension(original_filename)
+        )
+        return received, filename
+
+    async def _place_file(self, received: ReceivedUpload, filename: str) -> None:
+        """Перенести файл в хранилище, если его там ещё нет (под lock_path)."""
+        try:
+            if not await self.storage.exists(filename):
+                await self.storage.save(filename, received.temp_path)
+        finally:
+            await received.discard()
+
+    async def _save_file(self, file: UploadFile, original_filename: str) -> str:
+        """Сохранить файл под именем по хэшу содержимого и вернуть его путь.
+
+        Повторная загрузка того же содержимого не пишет второй копии: новая
+        запись photos просто ссылается на уже сохранённый файл.
+        """
+        received, filename = await self._receive_file(file, original_filename)
+        try:
+            await self.photo_repository.lock_path(filename)
+        except BaseException:
+            await received.discard()
+            raise
+        self._discard_on_rollback([filename])
+        await self._place_file(received, filename)
+        self._render_after_commit([filename])
+        return filename
 
-    def _get_file_path(self, filename: str) -> Path:
-        return self.media_dir / filename
+    def _render_after_commit(self, filenames: list[str]) -> None:
+        """Создать производные копии, когда запись о файле закоммичена."""
 
-    def _get_url(self, filename: str) -> str:
-        protocol = "https" if not settings.debug else "http"
-        return f"{protocol}://{settings.cms_backend_domain}/media/{filename}"
+        async def render() -> None:
+            for filename in filenames:
+                self.renderer.schedule(filename)
 
-    async def _save_file(self, file_content: bytes, filename: str) -> str:
-        import asyncio
+        self.photo_repository.after_commit(render)
 
-        file_path = self._get_file_path(filename)
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, lambda: file_path.write_bytes(file_content))
-        return filename
+    def _release_after_commit(self, filenames: list[str]) -> None:
+        """Освободить файлы, когда изменение ссылавшихся на них записей закоммичено.
 
-    async def _delete_file(self, filename: str) -> None:
-        import asyncio
+        Раньше нельзя: файл удалился бы, а откат транзакции вернул бы ссылку на него.
+        """
+        self.photo_repository.after_commit(lambda: self._release_files(filenames))
 
-        file_path = self._get_file_path(filename)
-        if file_path.exists():
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, file_path.unlink)
+    def _discard_on_rollback(self, filenames: list[str]) -> None:
+        """Удалить размещённые файлы, если транзакция, создающая записи, откатится."""
+        self.photo_repository.after_rollback(lambda: self._release_files(filenames))
+
+    async def _release_files(self, filenames: list[str]) -> None:
+        """Удалить файлы, на которые больше не ссылается ни одна фотография.
+
+        Выполняется после завершения транзакции, изменившей записи photos
+        (см. _release_after_commit и _discard_on_rollback).
+        """
+        # Блокировки берутся в одном порядке, чтобы параллельные удаления
+        # не ждали друг друга по кругу.
+        for filename in sorted(set(filenames)):
+            await self.photo_repository.lock_path(filename)
+            if await self.photo_repository.count_by_path(filename) == 0:
+                await self._delete_file(filename)
+
+    async def _delete_file(self, filename: str) -> None:
+        await self.storage.delete(filename)
+        await self.renderer.delete(filename)
 
     def _get_name_from_filename(self, filename: str) -> str:
         return Path(filename).stem
 
-    def _validate_file_type(self, filename: str, content: bytes) -> None:
+    def _validate_file_type(self, filename: str) -> str:
         extension = self._get_file_extension(filename).lower()
-
-        image_extensions = {
-            ".jpg",
-            ".jpeg",
-            ".png",
-            ".gif",
-            ".bmp",
-            ".webp",
-            ".svg",
-            ".ico",
-            ".tiff",
-            ".tif",
-            ".heic",
-            ".heif",
-        }
-
-        video_extensions = {
-            ".mp4",
-            ".avi",
-            ".mov",
-            ".wmv",
-            ".flv",
-            ".webm",
-            ".mkv",
-            ".m4v",
-            ".3gp",
-            ".ogv",
-            ".mpeg",
-            ".mpg",
-        }
-
-        allowed_extensions = image_extensions | video_extensions
-
-        if extension not in allowed_extensions:
+        media_format = _MEDIA_FORMATS.get(extension)
+        if media_format is None:
             raise ClientError(
                 f"Недопустимый тип файла: {extension}. "
                 f"Разрешены только изображения и видео файлы"
             )
+        return media_format
 
-    async def create_from_upload(
-        self, data: PhotoCreateDto, file, original_filename: str | None
-    ) -> Photo:
-        from fastapi import UploadFile
-
-        from core.exceptions.base import ClientError
-
-        if not original_filename:
-            raise ClientError("Имя файла не указано")
-
-        file_content = await file.read()
-        return await self.create(data, file_content, original_filename)
-
-    async def create(
-        self, data: PhotoCreateDto, file_content: bytes, original_filename: str
+    async def _create_photo(
+        self,
+        data: PhotoCreateDto,
+        filename: str,
+        original_filename: str,
+        id: UUID | None = None,
     ) -> Photo:
-        self._validate_file_type(original_filename, file_content)
-        filename = self._generate_filename(original_filename)
-        await self._save_file(file_content, filename)
-
         name = data.name
         if not name or name.strip() == "":
             name = self._get_name_from_filename(original_filename)
@@ -139,45 +221,195 @@ class PhotoService:
             description=description,
             path=filename,
         )
+        if id is not None:
+            photo.id = id
 
         return await self.photo_repository.create(photo)
 
-    async def update_from_upload(
-        self, id: UUID, data: PhotoUpdateDto, file, original_filename: str | None
+    async def create_from_upload(
+        self, data: PhotoCreateDto, file: UploadFile, original_filename: str | None
     ) -> Photo:
-        from fastapi import UploadFile
+        if not original_filename:
+            raise ClientError("Имя файла не указано")
 
-        from core.exceptions.base import ClientError
+        filename = await self._save_file(file, original_filename)
+        return await self._create_photo(data, filename, original_filename)
+
+    async def import_files(
+        self, files: list[UploadFile], description: str | None = None
+    ) -> list[tuple[str, Photo | None, str | None]]:
+        """Создать фотографии из набора файлов.
+
+        Файлы принимаются параллельно (не больше PHOTO_IMPORT_CONCURRENCY
+        одновременно), названия подбираются одним запросом, записи photos
+        вставляются одним bulk_create. Ошибка в одном файле не прерывает
+        импорт остальных. Возвращает (имя файла, фотография, ошибка) в порядке
+        files.
+        """
+        if len(files) > settings.photo_import_max_files:
+            raise ClientError(
+                f"За один запрос можно импортировать не больше "
+                f"{settings.photo_import_max_files} файлов"
+            )
 
-        file_content = None
-        filename = None
+        semaphore = asyncio.Semaphore(settings.photo_import_concurrency)
+
+        async def receive(file: UploadFile) -> tuple[str, ReceivedUpload, str] | str:
+            """(имя файла, принятый файл, путь в хранилище) или текст ошибки."""
+            async with semaphore:
+                try:
+                    if not file.filename:
+                        raise ClientError("Имя файла не указано")
+                    received, filename = await self._receive_file(file, file.filename)
+                except ClientError as exc:
+                    return str(exc)
+                return file.filename, received, filename
+
+        results = await asyncio.gather(
+            *(receive(file) for file in files), return_exceptions=True
+        )
+        received_files: dict[int, tuple[str, ReceivedUpload, str]] = {}
+        errors: dict[int, str] = {}
+        for index, result in enumerate(results):
+            if isinstance(result, tuple):
+                received_files[index] = result
+            elif isinstance(result, str):
+                errors[index] = result
+        try:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            # Файлы с одинаковым содержимым переносятся в хранилище один раз.
+            placements: dict[str, ReceivedUpload] = {}
+            for _, received, filename in received_files.values():
+                if filename in placements:
+                    await received.discard()
+                else:
+                    placements[filename] = received
+            for filename in sorted(placements):
+                await self.photo_repository.lock_path(filename)
+            self._discard_on_rollback(list(placements))
+        except BaseException:
+            await asyncio.gather(
+                *(received.discard() for _, received, _ in received_files.values())
+            )
+            raise
 
-        if file:
-            if not original_filename:
-                raise ClientError("Имя файла не указано")
-            file_content = await file.read()
-            filename = original_filename
+        async def place(filename: str) -> None:
+            async with semaphore:
+                await self._place_file(placements[filename], filename)
 
-        return await self.update(id, data, file_content, filename)
+        await asyncio.gather(*(place(filename) for filename in placements))
 
-    async def update(
+        indexes = list(received_files)
+        names = await self._generate_unique_names(
+            [
+                self._get_name_from_filename(received_files[index][0])
+                for index in indexes
+            ]
+        )
+        photos = await self.photo_repository.bulk_create(
+            [
+                Photo(
+                    name=name,
+                    description=description or "",
+                    path=received_files[index][2],
+                )
+                for index, name in zip(indexes, names)
+            ]
+        )
+        self._render_after_commit(list(placements))
+
+        created = dict(zip(indexes, photos))
+        return [
+            (file.filename or "", created.get(index), errors.get(index))
+            for index, file in enumerate(files)
+        ]
+
+    def _staging_key(self, id: UUID) -> str:
+        return f"{UPLOADS_PREFIX}{id}"
+
+    async def create_upload_intent(
+        self, data: PhotoUploadIntentCreateDto
+    ) -> tuple[UUID, str, int]:
+        """Выдать UUID будущей фотографии и ссылку для загрузки файла.
+
+        Файл загружается клиентом напрямую в хранилище, минуя приложение;
+        запись photos создаёт finalize_upload.
+        """
+        self._validate_file_type(data.filename)
+        if data.size is not None and data.size > settings.upload_max_bytes:
+            raise size_limit_error(settings.upload_max_bytes)
+
+        id = uuid4()
+        expires_in = settings.presigned_url_ttl_seconds
+        url = await self.storage.presigned_url(
+            self._staging_key(id), method="PUT", expires_in=expires_in
+        )
+        return id, url, expires_in
+
+    async def finalize_upload(self, id: UUID, data: PhotoFinalizeDto) -> Photo:
+        """Проверить загруженный по ссылке файл и создать фотографию.
+
+        Файл переносится под имя по хэшу содержимого, как при обычной
+        загрузке. Повторный вызов возвращает уже созданную фотографию.
+        """
+        staging_key = self._staging_key(id)
+        await self.photo_repository.lock_path(staging_key)
+        photo = await self.photo_repository.get_by_id(id)
+        if photo is not None:
+            return photo
+
+        media_format = self._validate_file_type(data.filename)
+        size = await self.storage.get_size(staging_key)
+        if size is None:
+            raise ClientError("Файл не загружен")
+        try:
+            if size > settings.upload_max_bytes:
+                raise size_limit_error(settings.upload_max_bytes)
+            head = await self.storage.read_head(staging_key, MEDIA_HEAD_BYTES)
+            if sniff_media_format(head) != media_format:
+                raise ClientError("Содержимое файла не соответствует его расширению")
+        except ClientError:
+            await self.storage.delete(staging_key)
+            raise
+
+        filename = content_path(
+            await self.storage.content_digest(staging_key),
+            self._get_file_extension(data.filename),
+        )
+        await self.photo_repository.lock_path(filename)
+        self._discard_on_rollback([filename])
+        if not await self.storage.exists(filename):
+            await self.storage.move(staging_key, filename)
+        else:
+            await self.storage.delete(staging_key)
+        self._render_after_commit([filename])
+        return await self._create_photo(data, filename, data.filename, id=id)
+
+    async def create(
+        self, data: PhotoCreateDto, file_content: bytes, original_filename: str
+    ) -> Photo:
+        file = UploadFile(io.BytesIO(file_content), size=len(file_content))
+        return await self.create_from_upload(data, file, original_filename)
+
+    async def update_from_upload(
         self,
         id: UUID,
         data: PhotoUpdateDto,
-        file_content: bytes | None = None,
-        original_filename: str | None = None,
+        file: UploadFile | None,
+        original_filename: str | None,
     ) -> Photo:
         photo = await self.photo_repository.get_by_id(id)
         if photo is None:
             raise ClientError("Фотография не найдена")
 
-        if file_content is not None and original_filename is not None:
-            self._validate_file_type(original_filename, file_content)
+        old_filename = None
+        if file:
+            if not original_filename:
+                raise ClientError("Имя файла не указано")
             old_filename = photo.path
-            await self._delete_file(old_filename)
-            filename = self._generate_filename(original_filename)
-            await self._save_file(file_content, filename)
-            photo.path = filename
+            photo.path = await self._save_file(file, original_filename)
 
         update_data = {}
 
@@ -200,20 +432,44 @@ class PhotoService:
         for key, value in update_data.items():
             setattr(photo, key, value)
 
-        return await self.photo_repository.update(photo)
+        updated = await self.photo_repository.update(photo)
+        # Старый файл освобождается только после того, как запись ссылается
+        # на новый.
+        if old_filename is not None and old_filename != photo.path:
+            self._release_after_commit([old_filename])
+        return updated
+
+    async def update(
+        self,
+        id: UUID,
+        data: PhotoUpdateDto,
+        file_content: bytes | None = None,
+        original_filename: str | None = None,
+    ) -> Photo:
+        file = None
+        if file_content is not None and original_filename is not None:
+            file = UploadFile(io.BytesIO(file_content), size=len(file_content))
+        return await self.update_from_upload(id, data, file, original_filename)
 
     async def get_by_id(self, id: UUID) -> Photo | None:
         return await self.photo_repository.get_by_id(id)
 
-    async def delete(self, id: UUID) -> None:
+    async def get_presigned_url(self, id: UUID) -> tuple[str, int]:
         photo = await self.photo_repository.get_by_id(id)
         if photo is None:
             raise ClientError("Фотография не найдена")
 
-        filename = photo.path
-        await self._delete_file(filename)
+        expires_in = settings.presigned_url_ttl_seconds
+        url = await self.storage.presigned_url(photo.path, expires_in=expires_in)
+        return url, expires_in
+
+    async def delete(self, id: UUID) -> None:
+        photo = await self.photo_repository.get_by_id(id)
+        if photo is None:
+            raise ClientError("Фотография не найдена")
 
         await self.photo_repository.delete(id)
+        self._release_after_commit([photo.path])
 
     async def get_filtered(
         self,
@@ -237,7 +493,10 @@ class PhotoService:
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
-    ) -> tuple[list[Photo], int]:
+        cursor: str | None = None,
+        with_total: bool | None = None,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> tuple[list[Photo], int | None, str | None]:
         return await self.photo_repository.get_filtered(
             name=name,
             description=description,
@@ -246,6 +505,9 @@ class PhotoService:
             sort=sort,
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            with_total=cursor is None if with_total is None else with_total,
+            count_mode=count_mode,
         )
 
     async def batch_delete(self, ids: list[UUID]) -> None:
@@ -258,7 +520,5 @@ class PhotoService:
             if photo:
                 photos_to_delete.append(photo)
 
-        for photo in photos_to_delete:
-            await self._delete_file(photo.path)
-
         await self.photo_repository.batch_delete(ids)
+        self._release_after_commit([photo.path for photo in photos_to_delete])
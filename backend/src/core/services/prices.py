@@ -1,6 +1,7 @@
 from typing import Literal
 from uuid import UUID
 
+from core.entities.base import CountMode
 from core.entities.prices import Price, PriceGroup
 from core.exceptions.base import ClientError
 from core.protocols.repositories.photo_repository import PhotoRepositoryProtocol
@@ -78,6 +79,7 @@ class PriceGroupService:
         sort: list[Literal["name", "-name"]] | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[PriceGroup], int]:
         """Получить отфильтрованный список групп."""
         return await self.price_group_repository.get_filtered(
@@ -86,6 +88,7 @@ class PriceGroupService:
             sort=sort,
             limit=limit,
             offset=offset,
+            count_mode=count_mode,
         )
 
 
@@ -237,8 +240,14 @@ class PriceService:
         sort: list[Literal["name", "-name"]] | None = None,
         limit: int | None = None,
         offset: int | None = None,
-    ) -> tuple[list[Price], int]:
-        """Получить отфильтрованный список цен."""
+        cursor: str | None = None,
+        with_total: bool | None = None,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> tuple[list[Price], int | None, str | None]:
+        """Получить отфильтрованный список цен.
+
+        По умолчанию общее количество считается только для страниц без курсора.
+        """
         return await self.price_repository.get_filtered(
             name=name,
             description=description,
@@ -246,6 +255,9 @@ class PriceService:
             sort=sort,
             limit=limit,
             offset=offset,
+            cursor=cursor,
+            with_total=cursor is None if with_total is None else with_total,
+            count_mode=count_mode,
         )
 
     async def update_price_photos(
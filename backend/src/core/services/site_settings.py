@@ -1,85 +1,193 @@
+import asyncio
+import hashlib
 import json
-from datetime import datetime
-from typing import Literal
+import time
+from datetime import date, datetime
+from typing import Any, Iterable, Literal, Sequence
 from uuid import UUID
 
+from pydantic import TypeAdapter
+
+from core.entities.base import CountMode
 from core.entities.site_settings import SiteSetting, SiteSettingType
 from core.exceptions.base import ClientError
 from core.protocols.repositories.site_settings_repository import (
     SiteSettingsRepositoryProtocol,
 )
-from core.schemas.site_settings import SiteSettingCreateDto, SiteSettingUpdateDto
+from core.schemas.site_settings import (
+    SiteSettingCreateDto,
+    SiteSettingsSnapshotOutDto,
+    SiteSettingUpdateDto,
+)
+from settings import settings
+from utils.table_events import on_tables_committed
+
+_SNAPSHOT_VALUES_ADAPTER = TypeAdapter(dict[str, Any])
+
+
+_BOOLEAN_VALUES = {
+    "true": True,
+    "1": True,
+    "yes": True,
+    "on": True,
+    "false": False,
+    "0": False,
+    "no": False,
+    "off": False,
+}
+
+
+def parse_setting_value(value: str, setting_type: SiteSettingType) -> Any:
+    """Привести строковое значение настройки к её типу (ValueError, если не удалось)."""
+    if setting_type == SiteSettingType.string:
+        return value
+    if setting_type == SiteSettingType.number:
+        # Целое число
+        return int(value)
+    if setting_type == SiteSettingType.float:
+        return float(value)
+    if setting_type == SiteSettingType.boolean:
+        value_lower = value.lower().strip()
+        if value_lower not in _BOOLEAN_VALUES:
+            raise ValueError(f"Неверное булево значение: {value}")
+        return _BOOLEAN_VALUES[value_lower]
+    if setting_type == SiteSettingType.object:
+        # Валидный JSON
+        return json.loads(value)
+    if setting_type == SiteSettingType.date:
+        # Дата в формате YYYY-MM-DD
+        return date.fromisoformat(value)
+    if setting_type == SiteSettingType.time:
+        # Время в формате HH:MM
+        return datetime.strptime(value, "%H:%M").time()
+    if setting_type == SiteSettingType.datetime:
+        # Дата и время в формате "YYYY-MM-DD HH:MM"
+        return datetime.strptime(value, "%Y-%m-%d %H:%M")
+    raise ClientError(f"Неизвестный тип настройки: {setting_type}")
+
+
+class SiteSettingsSnapshot:
+    """Неизменяемый снимок всех настроек с уже разобранными значениями.
+
+    body — готовый JSON ответа /site_settings/snapshot. etag считается только по
+    значениям, поэтому совпадает у воркеров с разными версиями снимка.
+    """
+
+    def __init__(self, *, version: int, settings: Sequence[SiteSetting]) -> None:
+        self.version = version
+        self.settings = tuple(settings)
+        self.values: dict[str, Any] = {
+            setting.key: self._parse(setting) for setting in self.settings
+        }
+        values_json = _SNAPSHOT_VALUES_ADAPTER.dump_json(self.values)
+        self.etag = f'W/"{hashlib.blake2b(values_json, digest_size=16).hexdigest()}"'
+        self.body = (
+            SiteSettingsSnapshotOutDto(version=version, settings=self.values)
+            .model_dump_json(by_alias=True)
+            .encode()
+        )
+
+    @staticmethod
+    def _parse(setting: SiteSetting) -> Any:
+        # Значения проверяются при записи; строки, записанные в обход сервиса,
+        # отдаём как есть, чтобы одна настройка не ломала весь снимок.
+        try:
+            return parse_setting_value(setting.value, SiteSettingType(setting.type))
+        except (ValueError, ClientError):
+            return setting.value
+
+    def filter(
+        self, *, keys: Iterable[str] | None = None, types: Iterable[str] | None = None
+    ) -> list[SiteSetting]:
+        """Настройки снимка с фильтрами по ключам и типам (в порядке ключей)."""
+        keys = set(keys) if keys else None
+        types = set(types) if types else None
+        return [
+            setting
+            for setting in self.settings
+            if (keys is None or setting.key in keys)
+            and (types is None or setting.type in types)
+        ]
+
+
+class SiteSettingsSnapshotCache:
+    """Снимок таблицы site_settings в памяти воркера.
+
+    Версия растёт при каждом сбросе: после create/update/delete через сервис и после
+    коммита любой транзакции, изменившей site_settings. Изменения, сделанные в других
+    воркерах, подхватываются не позже чем через ttl_seconds.
+    """
+
+    def __init__(self, *, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: SiteSettingsSnapshot | None = None
+        self._loaded_at = 0.0
+        self._version = 1
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self, tables: Iterable[str] | None = None) -> None:
+        self._version += 1
+        self._snapshot = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    async def get(
+        self, site_settings_repository: SiteSettingsRepositoryProtocol
+    ) -> SiteSettingsSnapshot:
+        if self._is_fresh():
+            return self._snapshot  # type: ignore[return-value]
+        async with self._lock:
+            if self._is_fresh():
+                return self._snapshot  # type: ignore[return-value]
+            version = self._version
+            snapshot = SiteSettingsSnapshot(
+                version=version,
+                settings=await site_settings_repository.get_all_ordered_by_key(),
+            )
+            if version == self._version:
+                self._snapshot = snapshot
+                self._loaded_at = time.monotonic()
+            return snapshot
+
+
+site_settings_snapshot_cache = SiteSettingsSnapshotCache(
+    ttl_seconds=settings.site_settings_snapshot_ttl_seconds
+)
+# Снимок сбрасывается и после коммита записей в обход сервиса.
+on_tables_committed(("site_settings",), site_settings_snapshot_cache.invalidate)
 
 
 class SiteSettingsService:
-    def __init__(self, site_settings_repository: SiteSettingsRepositoryProtocol):
+    def __init__(
+        self,
+        site_settings_repository: SiteSettingsRepositoryProtocol,
+        snapshot_cache: SiteSettingsSnapshotCache = site_settings_snapshot_cache,
+    ):
         self.site_settings_repository = site_settings_repository
+        self.snapshot_cache = snapshot_cache
 
     def _validate_value_by_type(self, value: str, setting_type: SiteSettingType) -> str:
         """Валидирует значение в зависимости от типа и возвращает строковое представление."""
         try:
-            if setting_type == SiteSettingType.string:
-                # Любая строка - просто возвращаем
-                return value
-
-            elif setting_type == SiteSettingType.number:
-                # Целое число
-                int(value)
-                return value
-
-            elif setting_type == SiteSettingType.float:
-                # Число с плавающей точкой
-                float(value)
-                return value
-
-            elif setting_type == SiteSettingType.boolean:
-                # Булево значение
-                value_lower = value.lower().strip()
-                if value_lower not in (
-                    "true",
-                    "false",
-                    "1",
-                    "0",
-                    "yes",
-                    "no",
-                    "on",
-                    "off",
-                ):
-                    raise ValueError(f"Неверное булево значение: {value}")
-                # Нормализуем к true/false
-                normalized = value_lower in ("true", "1", "yes", "on")
-                return "true" if normalized else "false"
-
-            elif setting_type == SiteSettingType.object:
-                # Валидный JSON
-                json.loads(value)
-                return value
-
-            elif setting_type == SiteSettingType.date:
-                # Дата в формате YYYY-MM-DD
-                from datetime import date as date_type
-
-                date_type.fromisoformat(value)
-                return value
-
-            elif setting_type == SiteSettingType.time:
-                # Время в формате HH:MM
-                datetime.strptime(value, "%H:%M")
-                return value
-
-            elif setting_type == SiteSettingType.datetime:
-                # Дата и время в формате "YYYY-MM-DD HH:MM"
-                datetime.strptime(value, "%Y-%m-%d %H:%M")
-                return value
-
-            else:
-                raise ClientError(f"Неизвестный тип настройки: {setting_type}")
-
+            parsed = parse_setting_value(value, setting_type)
         except ValueError as e:
             raise ClientError(f"Неверное значение для типа {setting_type}: {str(e)}")
         except json.JSONDecodeError:
             raise ClientError(f"Неверный JSON для типа object: {value}")
 
+        if setting_type == SiteSettingType.boolean:
+            # Нормализуем к true/false
+            return "true" if parsed else "false"
+        return value
+
     async def create(self, data: SiteSettingCreateDto) -> SiteSetting:
         """Создать новую настройку."""
         # Проверяем уникальность key
@@ -103,7 +211,9 @@ class SiteSettingsService:
             type=str(data.type),
         )
 
-        return await self.site_settings_repository.create(site_setting)
+        created = await self.site_settings_repository.create(site_setting)
+        self.snapshot_cache.invalidate()
+        return created
 
     async def update(self, id: UUID, data: SiteSettingUpdateDto) -> SiteSetting:
         """Обновить настройку."""
@@ -147,7 +257,9 @@ class SiteSettingsService:
         for key, value in update_data.items():
             setattr(site_setting, key, value)
 
-        return await self.site_settings_repository.update(site_setting)
+        updated = await self.site_settings_repository.update(site_setting)
+        self.snapshot_cache.invalidate()
+        return updated
 
     async def get_by_id(self, id: UUID) -> SiteSetting | None:
         """Получить настройку по UUID."""
@@ -159,6 +271,11 @@ class SiteSettingsService:
         if site_setting is None:
             raise ClientError("Настройка не найдена")
         await self.site_settings_repository.delete(id)
+        self.snapshot_cache.invalidate()
+
+    async def get_snapshot(self) -> SiteSettingsSnapshot:
+        """Снимок всех настроек из кэша воркера."""
+        return await self.snapshot_cache.get(self.site_settings_repository)
 
     async def get_filtered(
         self,
@@ -187,6 +304,7 @@ class SiteSettingsService:
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[SiteSetting], int]:
         """Получить отфильтрованный список настроек."""
         return await self.site_settings_repository.get_filtered(
@@ -198,4 +316,5 @@ class SiteSettingsService:
             sort=sort,
             limit=limit,
             offset=offset,
+            count_mode=count_mode,
         )
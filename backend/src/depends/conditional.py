@@ -0,0 +1,238 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated, Any, Awaitable, Callable, Sequence
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from depends.utils import get_session
+from models.breeds import breeds
+from models.coat_color import coat_color
+from models.horse import horse, horse_children, horse_photos
+from models.horse_owner import horse_owner
+from models.horse_service import horse_service, horse_service_relations
+from models.photos import photos
+from models.prices import price_groups, price_groups_relations, price_photos, prices
+from models.site_settings import site_settings
+from repositories.freshness import (
+    RowRelation,
+    get_row_freshness,
+    get_tables_freshness,
+)
+from settings import settings
+from utils.cache import shared_versions, watch_tables
+from utils.response_cache import set_response_cache_tags
+from utils.responses import etag_matches
+
+
+def _lookup_clause(table: Table, slug_or_id: str) -> ColumnElement[bool] | None:
+    try:
+        return table.c.id == UUID(slug_or_id)
+    except ValueError:
+        if "slug" in table.c:
+            return table.c.slug == slug_or_id
+        return None
+
+
+def _is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def _etag(request: Request, values: list[Any]) -> str:
+    # Ответ зависит от пути, фильтров и пользователя (access_token в cookie).
+    signature = json.dumps(
+        [
+            request.url.path,
+            request.query_params.multi_items(),
+            request.cookies.get("access_token"),
+            values,
+        ],
+        default=str,
+    ).encode()
+    return f'W/"{hashlib.blake2b(signature, digest_size=16).hexdigest()}"'
+
+
+def _not_modified(
+    request: Request, *, etag: str, last_modified: datetime | None
+) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _respond(
+    request: Request,
+    response: Response,
+    *,
+    etag: str,
+    last_modified: datetime | None = None,
+) -> None:
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Cookie"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(timezone.utc), usegmt=True
+        )
+    if _not_modified(request, etag=etag, last_modified=last_modified):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def conditional_get(*tables: Table) -> Callable[..., Awaitable[None]]:
+    """Зависимость условного GET для списков: ETag и 304 до сборки ответа.
+
+    Если задан Redis, ETag строится по общим версиям таблиц, которые
+    увеличиваются после каждого коммита, изменившего таблицу: к БД зависимость
+    не обращается и выставляет ETag на каждый ответ. Иначе отпечаток —
+    количество строк и max(created_at, updated_at) каждой таблицы (для таблиц
+    связей — хэш строк) — считается запросом к БД и только для запросов с
+    If-None-Match или If-Modified-Since; он видит и изменения, сделанные в
+    других воркерах и в обход приложения.
+
+    Эти же таблицы становятся тегами ответа в кэше анонимных ответов.
+    """
+
+    table_names = tuple(table.name for table in tables)
+    watch_tables(table_names)
+
+    async def check_not_modified(
+        request: Request,
+        response: Response,
+        session: Annotated[AsyncSession, Depends(get_session)],
+    ) -> None:
+        versions = await shared_versions(table_names)
+        set_response_cache_tags(request, table_names, versions=versions)
+        if versions is not None:
+            _respond(request, response, etag=_etag(request, ["shared", *versions]))
+            return
+        if not _is_conditional(request):
+            return
+        freshness = await get_tables_freshness(session, tables)
+        _respond(
+            request,
+            response,
+            etag=_etag(request, freshness.values),
+            last_modified=freshness.last_modified,
+        )
+
+    return check_not_modified
+
+
+def conditional_get_row(
+    table: Table, *, param: str, relations: Sequence[RowRelation] = ()
+) -> Callable[..., Awaitable[None]]:
+    """Зависимость условного GET для карточки: 304 по метке времени строки.
+
+    Строка находится по параметру пути param (slug или UUID). Отпечаток —
+    max(created_at, updated_at) строки и её собственные строки relations —
+    считается только для запросов с If-None-Match или If-Modified-Since:
+    обычный GET к БД ради заголовков не обращается. Если строка не найдена,
+    заголовки не выставляются и ошибку формирует сам эндпоинт.
+
+    Таблицы строки и связей становятся тегами ответа в кэше анонимных
+    ответов; при включённом кэше к ним запоминаются общие версии из Redis.
+    """
+
+    cache_tags = tuple(
+        sorted(
+            {
+                name
+                for relation in relations
+                for name in (relation.link.name, relation.target.name)
+            }
+            | {table.name}
+        )
+    )
+    watch_tables(cache_tags)
+
+    async def check_not_modified(
+        request: Request,
+        response: Response,
+        session: Annotated[AsyncSession, Depends(get_session)],
+    ) -> None:
+        versions = (
+            await shared_versions(cache_tags)
+            if settings.response_cache_enabled
+            else None
+        )
+        set_response_cache_tags(request, cache_tags, versions=versions)
+        slug_or_id = request.path_params.get(param)
+        if not _is_conditional(request) or slug_or_id is None:
+            return
+        row_clause = _lookup_clause(table, str(slug_or_id))
+        if row_clause is None:
+            return
+        freshness = await get_row_freshness(
+            session, table, row_clause, relations=relations
+        )
+        if freshness is None:
+            return
+        _respond(
+            request,
+            response,
+            etag=_etag(request, freshness.values),
+            last_modified=freshness.last_modified,
+        )
+
+    return check_not_modified
+
+
+# Карточка лошади собирается из связанных таблиц, а родословная — из других
+# лошадей, поэтому и список, и карточка зависят от всего набора таблиц.
+_HORSE_TABLES = (
+    horse,
+    breeds,
+    coat_color,
+    horse_owner,
+    photos,
+    horse_photos,
+    horse_service,
+    horse_service_relations,
+    horse_children,
+)
+_PRICE_RELATION_TABLES = (price_groups, price_groups_relations, price_photos, photos)
+_PRICE_RELATIONS = (
+    RowRelation(
+        price_groups_relations,
+        row_column="price_id",
+        target=price_groups,
+        target_column="group_id",
+    ),
+    RowRelation(
+        price_photos, row_column="price_id", target=photos, target_column="photo_id"
+    ),
+)
+
+horses_not_modified = conditional_get(*_HORSE_TABLES)
+breeds_not_modified = conditional_get(breeds)
+breed_not_modified = conditional_get_row(breeds, param="slug_or_id")
+coat_colors_not_modified = conditional_get(coat_color)
+coat_color_not_modified = conditional_get_row(coat_color, param="slug_or_id")
+horse_owners_not_modified = conditional_get(horse_owner)
+horse_owner_not_modified = conditional_get_row(horse_owner, param="id")
+horse_services_not_modified = conditional_get(horse_service)
+horse_service_not_modified = conditional_get_row(horse_service, param="slug_or_id")
+photos_not_modified = conditional_get(photos, horse_photos, price_photos)
+photo_not_modified = conditional_get_row(photos, param="id")
+prices_not_modified = conditional_get(prices, *_PRICE_RELATION_TABLES)
+price_not_modified = conditional_get_row(
+    prices, param="slug_or_id", relations=_PRICE_RELATIONS
+)
+price_groups_not_modified = conditional_get(price_groups)
+price_group_not_modified = conditional_get_row(price_groups, param="id")
+site_settings_not_modified = conditional_get(site_settings)
+site_setting_not_modified = conditional_get_row(site_settings, param="id")
@@ -1,20 +1,69 @@
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, Callable
 
+from fastapi import Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.protocols.security import SecurityProtocol
 from settings import settings
-from utils.database import AsyncSessionLocal
+from utils.database import open_session, replica_router
+from utils.response_cache import mark_replica_read
 from utils.security import Security
+from utils.table_events import run_session_callbacks
 
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Клиент, только что отправивший изменяющий запрос, какое-то время читает
+# из основной БД, чтобы увидеть свои изменения несмотря на отставание реплик.
+PRIMARY_UNTIL_COOKIE = "db_primary_until"
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    session: AsyncSession = AsyncSessionLocal()
+
+def replica_safe[F: Callable](endpoint: F) -> F:
+    """Разрешить эндпоинту читать с реплики (применяется под @router.get)."""
+    endpoint.replica_safe = True  # type: ignore[attr-defined]
+    return endpoint
+
+
+def _use_replica(request: Request) -> bool:
+    if not replica_router or request.method not in _SAFE_METHODS:
+        return False
+    if not getattr(request.scope.get("endpoint"), "replica_safe", False):
+        return False
+    try:
+        primary_until = float(request.cookies.get(PRIMARY_UNTIL_COOKIE, 0))
+    except ValueError:
+        primary_until = 0
+    return primary_until <= time.time()
+
+
+async def get_session(
+    request: Request, response: Response
+) -> AsyncGenerator[AsyncSession, None]:
+    if replica_router and request.method not in _SAFE_METHODS:
+        window = settings.replica_primary_window_seconds
+        response.set_cookie(
+            PRIMARY_UNTIL_COOKIE,
+            str(int(time.time()) + window),
+            max_age=window,
+            httponly=True,
+            samesite="lax",
+        )
+    # Чтение обходится без транзакции: это экономит BEGIN и COMMIT на запрос.
+    read_only = request.method in _SAFE_METHODS
+    replica = _use_replica(request)
+    if replica:
+        mark_replica_read(request)
+    session: AsyncSession = open_session(replica=replica, autocommit=read_only)
+    # Соединение берётся из пула только при первом запросе сессии. Если обработчик
+    # завершился раньше (кэш, 304, ошибка валидации), завершать нечего.
     try:
         yield session
-        await session.commit()
+        if not read_only and session.in_transaction():
+            await session.commit()
+            await run_session_callbacks(session)
     except Exception:
-        await session.rollback()
+        if session.in_transaction():
+            await session.rollback()
+            await run_session_callbacks(session)
         raise
     finally:
         await session.close()
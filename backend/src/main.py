@@ -1,11 +1,11 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
-from pathlib import Path
 
 from fastapi import APIRouter, FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from pydantic import ValidationError
 from uvicorn import run
 
@@ -19,12 +19,19 @@ from api import (
     photos_router,
     prices_router,
     site_settings_router,
+    storage_router,
 )
 from core.exceptions.auth import InvalidCredentials
 from core.exceptions.base import ClientError
+from core.services.auth import current_user_cache
 from settings import settings
+from utils.cache import has_shared_versions
 from utils.configure_logger import configure_logger
+from utils.database import get_pool_stats
+from utils.images import DerivativeStaticFiles, derivative_renderer
+from utils.response_cache import ResponseCacheMiddleware, response_cache
 from utils.seeding.init_registry import init_registry
+from utils.storage import LocalStorageBackend, expire_uploads, storage_backend
 
 configure_logger(
     logger_root_name=__name__, logger_prefix_output="NEXORA FASTAPI BACKEND"
@@ -34,7 +41,17 @@ configure_logger(
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     await init_registry()
+    uploads_expiry = asyncio.create_task(
+        expire_uploads(
+            storage_backend,
+            ttl_seconds=settings.staged_upload_ttl_seconds,
+            interval_seconds=settings.staged_upload_cleanup_interval_seconds,
+        )
+    )
     yield
+    uploads_expiry.cancel()
+    derivative_renderer.shutdown()
+    await storage_backend.close()
 
 
 app = FastAPI(
@@ -53,6 +70,7 @@ router.include_router(horse_service_router)
 router.include_router(photos_router)
 router.include_router(prices_router)
 router.include_router(site_settings_router)
+router.include_router(storage_router)
 app.include_router(router)
 
 
@@ -61,12 +79,39 @@ async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
 
 
-if settings.debug:
-    media_dir = Path(__file__).parent / "media"
-    media_dir.mkdir(parents=True, exist_ok=True)
-    app.mount("/media", StaticFiles(directory=str(media_dir)), name="media")
+@app.get("/health/response_cache", tags=["Healthcheck"])
+async def response_cache_stats() -> dict[str, int | float]:
+    return response_cache.stats()
+
+
+@app.get("/health/current_user_cache", tags=["Healthcheck"])
+async def current_user_cache_stats() -> dict[str, int | float]:
+    return current_user_cache.stats()
+
+
+@app.get("/health/db_pool", tags=["Healthcheck"])
+async def db_pool_stats() -> dict[str, dict[str, int | float]]:
+    return get_pool_stats()
 
 
+if settings.debug and isinstance(storage_backend, LocalStorageBackend):
+    app.mount(
+        "/media",
+        DerivativeStaticFiles(
+            directory=str(storage_backend.root), renderer=derivative_renderer
+        ),
+        name="media",
+    )
+
+if settings.response_cache_enabled:
+    if settings.workers == 1 or has_shared_versions():
+        app.add_middleware(ResponseCacheMiddleware)
+    else:
+        logging.getLogger(__name__).warning(
+            "RESPONSE_CACHE_ENABLED проигнорирован: при WORKERS>1 нужен Redis "
+            "(REPOSITORY_CACHE_ENABLED и REDIS_URL)"
+        )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -0,0 +1,67 @@
+"""trigram search indexes
+
+Revision ID: 033e87f8d35a
+Revises: bab7f85d0fdd
+Create Date: 2026-10-17 11:04:52.118730
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "033e87f8d35a"
+down_revision: Union[str, Sequence[str], None] = "bab7f85d0fdd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRIGRAM_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("breeds", "name"),
+    ("breeds", "slug"),
+    ("breeds", "description"),
+    ("breeds", "page_data"),
+    ("coat_color", "name"),
+    ("coat_color", "slug"),
+    ("coat_color", "description"),
+    ("coat_color", "page_data"),
+    ("horse", "name"),
+    ("horse", "description"),
+    ("horse_owner", "name"),
+    ("horse_owner", "description"),
+    ("horse_owner", "address"),
+    ("horse_service", "name"),
+    ("horse_service", "slug"),
+    ("horse_service", "description"),
+    ("horse_service", "page_data"),
+    ("photos", "name"),
+    ("photos", "description"),
+    ("price_groups", "name"),
+    ("price_groups", "description"),
+    ("prices", "name"),
+    ("prices", "description"),
+    ("site_settings", "name"),
+    ("site_settings", "value"),
+    ("site_settings", "description"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table_name, column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"ix_{table_name}_{column}_trgm",
+            table_name,
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Расширение pg_trgm оставляем: им могут пользоваться объекты вне этой миграции.
+    for table_name, column in reversed(TRIGRAM_COLUMNS):
+        op.drop_index(f"ix_{table_name}_{column}_trgm", table_name=table_name)
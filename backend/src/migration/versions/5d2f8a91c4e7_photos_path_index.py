@@ -0,0 +1,28 @@
+"""photos path index
+
+Revision ID: 5d2f8a91c4e7
+Revises: 033e87f8d35a
+Create Date: 2026-10-17 18:40:12.304517
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d2f8a91c4e7"
+down_revision: Union[str, Sequence[str], None] = "033e87f8d35a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Одинаковые загрузки ссылаются на один файл, ссылки считаются по path.
+    op.create_index(op.f("ix_photos_path"), "photos", ["path"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_photos_path"), table_name="photos")
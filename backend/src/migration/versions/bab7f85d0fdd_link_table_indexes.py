@@ -0,0 +1,112 @@
+"""link table indexes
+
+Revision ID: bab7f85d0fdd
+Revises: 47d6367ed482
+Create Date: 2026-10-17 10:12:41.503218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "bab7f85d0fdd"
+down_revision: Union[str, Sequence[str], None] = "47d6367ed482"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Перед уникальным ограничением удаляем повторяющиеся связи родитель–потомок.
+    op.execute("""
+        DELETE FROM horse_children AS duplicate
+        USING horse_children AS original
+        WHERE duplicate.horse_id = original.horse_id
+          AND duplicate.child_id = original.child_id
+          AND duplicate.id > original.id
+        """)
+    op.create_unique_constraint(
+        "uq_horse_children_horse_id_child_id",
+        "horse_children",
+        ["horse_id", "child_id"],
+    )
+    op.create_index(
+        "ix_horse_children_child_id",
+        "horse_children",
+        ["child_id"],
+        unique=False,
+        postgresql_include=["horse_id"],
+    )
+    op.create_index(
+        "ix_horse_photos_horse_id",
+        "horse_photos",
+        ["horse_id"],
+        unique=False,
+        postgresql_include=["photo_id", "is_main"],
+    )
+    op.create_index(
+        "ix_horse_photos_photo_id", "horse_photos", ["photo_id"], unique=False
+    )
+    op.create_index(
+        "ix_horse_service_relations_horse_id",
+        "horse_service_relations",
+        ["horse_id"],
+        unique=False,
+        postgresql_include=["service_id"],
+    )
+    op.create_index(
+        "ix_horse_service_relations_service_id",
+        "horse_service_relations",
+        ["service_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_price_groups_relations_price_id",
+        "price_groups_relations",
+        ["price_id"],
+        unique=False,
+        postgresql_include=["group_id"],
+    )
+    op.create_index(
+        "ix_price_groups_relations_group_id",
+        "price_groups_relations",
+        ["group_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_price_photos_price_id",
+        "price_photos",
+        ["price_id"],
+        unique=False,
+        postgresql_include=["photo_id", "is_main"],
+    )
+    op.create_index(
+        "ix_price_photos_photo_id", "price_photos", ["photo_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_price_photos_photo_id", table_name="price_photos")
+    op.drop_index("ix_price_photos_price_id", table_name="price_photos")
+    op.drop_index(
+        "ix_price_groups_relations_group_id", table_name="price_groups_relations"
+    )
+    op.drop_index(
+        "ix_price_groups_relations_price_id", table_name="price_groups_relations"
+    )
+    op.drop_index(
+        "ix_horse_service_relations_service_id",
+        table_name="horse_service_relations",
+    )
+    op.drop_index(
+        "ix_horse_service_relations_horse_id", table_name="horse_service_relations"
+    )
+    op.drop_index("ix_horse_photos_photo_id", table_name="horse_photos")
+    op.drop_index("ix_horse_photos_horse_id", table_name="horse_photos")
+    op.drop_index("ix_horse_children_child_id", table_name="horse_children")
+    op.drop_constraint(
+        "uq_horse_children_horse_id_child_id", "horse_children", type_="unique"
+    )
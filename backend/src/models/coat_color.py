@@ -1,6 +1,6 @@
 from sqlalchemy import Column, String, Table, Text
 
-from utils.basemodel import metadata, timestamp_columns, uuid_pk
+from utils.basemodel import metadata, timestamp_columns, trigram_indexes, uuid_pk
 
 coat_color = Table(
     "coat_color",
@@ -12,4 +12,5 @@ coat_color = Table(
     Column("slug", String(63), nullable=False, index=True),
     Column("description", String(511), nullable=True),
     Column("page_data", Text(), nullable=False, default="<div></div>"),
+    *trigram_indexes("coat_color", "name", "slug", "description", "page_data"),
 )
@@ -1,6 +1,17 @@
-from sqlalchemy import Boolean, Column, Date, ForeignKey, Integer, String, Table, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+)
 
-from utils.basemodel import metadata, timestamp_columns, uuid_pk
+from utils.basemodel import metadata, timestamp_columns, trigram_indexes, uuid_pk
 
 horse = Table(
     "horse",
@@ -29,6 +40,7 @@ horse = Table(
     Column(
         "this_stable", Boolean(), nullable=False, default=True, server_default="true"
     ),
+    *trigram_indexes("horse", "name", "description"),
 )
 
 horse_children = Table(
@@ -38,6 +50,10 @@ horse_children = Table(
     *timestamp_columns(),
     Column("horse_id", ForeignKey("horse.id", ondelete="CASCADE"), nullable=False),
     Column("child_id", ForeignKey("horse.id", ondelete="CASCADE"), nullable=False),
+    UniqueConstraint(
+        "horse_id", "child_id", name="uq_horse_children_horse_id_child_id"
+    ),
+    Index("ix_horse_children_child_id", "child_id", postgresql_include=["horse_id"]),
 )
 
 horse_photos = Table(
@@ -48,4 +64,10 @@ horse_photos = Table(
     Column("horse_id", ForeignKey("horse.id", ondelete="CASCADE"), nullable=False),
     Column("photo_id", ForeignKey("photos.id", ondelete="CASCADE"), nullable=False),
     Column("is_main", Boolean(), nullable=False, default=False),
+    Index(
+        "ix_horse_photos_horse_id",
+        "horse_id",
+        postgresql_include=["photo_id", "is_main"],
+    ),
+    Index("ix_horse_photos_photo_id", "photo_id"),
 )
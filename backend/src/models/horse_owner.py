@@ -1,7 +1,7 @@
 from sqlalchemy import Column, String, Table, text
 from sqlalchemy.dialects.postgresql import JSONB
 
-from utils.basemodel import metadata, timestamp_columns, uuid_pk
+from utils.basemodel import metadata, timestamp_columns, trigram_indexes, uuid_pk
 
 horse_owner = Table(
     "horse_owner",
@@ -18,4 +18,5 @@ horse_owner = Table(
         nullable=False,
         server_default=text("'[]'::jsonb"),
     ),
+    *trigram_indexes("horse_owner", "name", "description", "address"),
 )
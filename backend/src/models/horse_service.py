@@ -1,6 +1,6 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Table, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Table, Text
 
-from utils.basemodel import metadata, timestamp_columns, uuid_pk
+from utils.basemodel import metadata, timestamp_columns, trigram_indexes, uuid_pk
 
 horse_service = Table(
     "horse_service",
@@ -13,6 +13,7 @@ horse_service = Table(
     Column("price", Integer(), nullable=False),
     Column("price_formatter", String(7), nullable=False),
     Column("page_data", Text(), nullable=False, default="<div></div>"),
+    *trigram_indexes("horse_service", "name", "slug", "description", "page_data"),
 )
 
 horse_service_relations = Table(
@@ -26,4 +27,10 @@ horse_service_relations = Table(
     Column("description_override", String(511), nullable=True),
     Column("price_override", Integer(), nullable=True),
     Column("price_formatter_override", String(7), nullable=True),
+    Index(
+        "ix_horse_service_relations_horse_id",
+        "horse_id",
+        postgresql_include=["service_id"],
+    ),
+    Index("ix_horse_service_relations_service_id", "service_id"),
 )
@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Date, ForeignKey, Integer, String, Table, Text
 
-from utils.basemodel import metadata, timestamp_columns, uuid_pk
+from utils.basemodel import metadata, timestamp_columns, trigram_indexes, uuid_pk
 
 photos = Table(
     "photos",
@@ -9,5 +9,6 @@ photos = Table(
     *timestamp_columns(),
     Column("name", String(63), nullable=False, index=True),
     Column("description", String(511), nullable=True),
-    Column("path", String(511), nullable=False),
+    Column("path", String(511), nullable=False, index=True),
+    *trigram_indexes("photos", "name", "description"),
 )
@@ -1,7 +1,7 @@
-from sqlalchemy import Boolean, Column, ForeignKey, String, Table, Text, text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, String, Table, Text, text
 from sqlalchemy.dialects.postgresql import JSONB
 
-from utils.basemodel import metadata, timestamp_columns, uuid_pk
+from utils.basemodel import metadata, timestamp_columns, trigram_indexes, uuid_pk
 
 prices = Table(
     "prices",
@@ -18,6 +18,7 @@ prices = Table(
         nullable=False,
         server_default=text("'[]'::jsonb"),
     ),
+    *trigram_indexes("prices", "name", "description"),
 )
 
 price_groups = Table(
@@ -27,6 +28,7 @@ price_groups = Table(
     *timestamp_columns(),
     Column("name", String(63), nullable=False, index=True),
     Column("description", String(511), nullable=True),
+    *trigram_indexes("price_groups", "name", "description"),
 )
 
 price_groups_relations = Table(
@@ -37,6 +39,12 @@ price_groups_relations = Table(
     Column(
         "group_id", ForeignKey("price_groups.id", ondelete="CASCADE"), nullable=False
     ),
+    Index(
+        "ix_price_groups_relations_price_id",
+        "price_id",
+        postgresql_include=["group_id"],
+    ),
+    Index("ix_price_groups_relations_group_id", "group_id"),
 )
 
 price_photos = Table(
@@ -46,4 +54,10 @@ price_photos = Table(
     Column("price_id", ForeignKey("prices.id", ondelete="CASCADE"), nullable=False),
     Column("photo_id", ForeignKey("photos.id", ondelete="CASCADE"), nullable=False),
     Column("is_main", Boolean(), nullable=False, default=False),
+    Index(
+        "ix_price_photos_price_id",
+        "price_id",
+        postgresql_include=["photo_id", "is_main"],
+    ),
+    Index("ix_price_photos_photo_id", "photo_id"),
 )
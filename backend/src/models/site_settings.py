@@ -1,6 +1,6 @@
 from sqlalchemy import Column, String, Table, Text
 
-from utils.basemodel import metadata, timestamp_columns, uuid_pk
+from utils.basemodel import metadata, timestamp_columns, trigram_indexes, uuid_pk
 
 site_settings = Table(
     "site_settings",
@@ -12,4 +12,5 @@ site_settings = Table(
     Column("name", String(63), nullable=False, unique=True, index=True),
     Column("description", String(511), nullable=True),
     Column("type", String(10), nullable=False),
+    *trigram_indexes("site_settings", "name", "value", "description"),
 )
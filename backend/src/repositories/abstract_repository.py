@@ -46,9 +46,9 @@ class AbstractRepository[E: Entity](ABC):
 
     async def update(self, entity: E) -> E:
         stmt = (
-            update(self.table)
-            .where(self.table.c.id == entity.id)
-            .values(**entity.model_dump())
+            update(self.table).where(self.table.c.id == entity.id)
+            # updated_at выставляется onupdate колонки, а не берётся из сущности.
+            .values(**entity.model_dump(exclude={"updated_at"}))
         )
         await self.session.execute(stmt)
         await self.session.flush()
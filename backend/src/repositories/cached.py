@@ -0,0 +1,105 @@
+import functools
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Iterable, get_type_hints
+
+from pydantic import TypeAdapter
+
+from settings import settings
+from utils import cache
+from utils.table_events import may_be_stale, written_tables
+
+from .abstract_repository import AbstractRepository
+
+_ENTITY_METHODS = frozenset({"get_by_id", "get_by_slug"})
+
+
+def _cache_key(
+    *, table: str, method: str, versions: list[int], params: dict[str, Any]
+) -> str:
+    digest = hashlib.blake2b(
+        json.dumps(params, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+    version = ".".join(map(str, versions))
+    return f"{table}:{method}:{version}:{digest}"
+
+
+def _cached_method(
+    repository_cls: type[AbstractRepository],
+    name: str,
+    *,
+    tables: tuple[str, ...],
+) -> Callable:
+    method = getattr(repository_cls, name)
+    signature = inspect.signature(method)
+    return_type: Any
+    if name in _ENTITY_METHODS:
+        # В AbstractRepository эти методы аннотированы типовым параметром E.
+        return_type = repository_cls.entity | None
+    else:
+        return_type = get_type_hints(method)["return"]
+    adapter: TypeAdapter[Any] = TypeAdapter(return_type)
+
+    @functools.wraps(method)
+    async def wrapper(self: AbstractRepository, *args, **kwargs):
+        backend = cache.cache_backend
+        # Незакоммиченные изменения своей же транзакции в кэш попадать не должны.
+        if backend is None or written_tables(self.session) & set(tables):
+            return await method(self, *args, **kwargs)
+
+        versions = await backend.get_versions(tables)
+        if versions is None:
+            return await method(self, *args, **kwargs)
+
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+        del params["self"]
+        key = _cache_key(
+            table=self.table.name, method=name, versions=versions, params=params
+        )
+
+        cached = await backend.get(key)
+        if cached is not None:
+            return adapter.validate_json(cached)
+
+        result = await method(self, *args, **kwargs)
+        if not may_be_stale(self.session, tables):
+            await backend.set(
+                key,
+                adapter.dump_json(result),
+                ttl_seconds=settings.repository_cache_ttl_seconds,
+            )
+        return result
+
+    return wrapper
+
+
+def cached_repository(
+    *,
+    methods: Iterable[str] = ("get_by_id", "get_by_slug", "get_filtered"),
+    depends_on: Iterable[str] = (),
+) -> Callable[[type[AbstractRepository]], type[AbstractRepository]]:
+    """Кэшировать результаты методов чтения репозитория в общем кэше.
+
+    Ключ строится из имени таблицы, метода, версий таблиц и аргументов вызова.
+    Версии таблиц увеличиваются после коммита любой транзакции, изменившей
+    таблицу репозитория или одну из depends_on, поэтому старые записи просто
+    перестают читаться и истекают по TTL. Кэш подключается через
+    REPOSITORY_CACHE_ENABLED, бэкенд берётся из utils.cache.cache_backend
+    в момент вызова (в проверках его можно подменить, например, на fakeredis).
+    """
+
+    def decorate(repository_cls: type[AbstractRepository]) -> type[AbstractRepository]:
+        tables = (repository_cls.table.name, *depends_on)
+        cache.watch_tables(tables)
+        for name in methods:
+            setattr(
+                repository_cls,
+                name,
+                _cached_method(repository_cls, name, tables=tables),
+            )
+        return repository_cls
+
+    return decorate
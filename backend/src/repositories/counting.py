@@ -0,0 +1,195 @@
+import json
+import time
+from typing import Any, Iterable
+
+from sqlalchemy import Select, Table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.sql.util import find_tables
+
+from core.entities import CountMode
+from settings import settings
+from utils.table_events import may_be_stale, on_tables_committed, written_tables
+
+_COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+class _ExplainJson(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) для произвольного SELECT с обычными параметрами."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select) -> None:
+        self.stmt = stmt
+
+
+@compiles(_ExplainJson)
+def _compile_explain_json(
+    element: _ExplainJson, compiler: SQLCompiler, **kw: Any
+) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.stmt, **kw)
+
+
+class CountCache:
+    """Кэш результатов COUNT по сигнатуре запроса (SQL и параметры фильтров).
+
+    Запись живёт не дольше ttl_seconds и сбрасывается после коммита транзакции,
+    изменившей любую из таблиц, на которые опирается запрос.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[int, float, frozenset[str]]] = {}
+        self._watched_tables: set[str] = set()
+
+    def get(self, key: str) -> int | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: int, *, tables: frozenset[str]) -> None:
+        unwatched = tables - self._watched_tables
+        if unwatched:
+            on_tables_committed(unwatched, self.invalidate)
+            self._watched_tables |= unwatched
+        if len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds, tables)
+
+    def invalidate(self, tables: Iterable[str] | None = None) -> None:
+        if tables is None:
+            self._entries.clear()
+            return
+        changed = frozenset(tables)
+        self._entries = {
+            key: entry for key, entry in self._entries.items() if not entry[2] & changed
+        }
+
+
+count_cache = CountCache(
+    ttl_seconds=settings.count_cache_ttl_seconds,
+    max_entries=_COUNT_CACHE_MAX_ENTRIES,
+)
+
+
+def _statement_tables(stmt: Select) -> frozenset[str]:
+    return frozenset(
+        element.name
+        for element in find_tables(stmt, check_columns=True)
+        if isinstance(element, Table)
+    )
+
+
+def _cache_key(session: AsyncSession, stmt: Select) -> str:
+    compiled = stmt.compile(dialect=session.get_bind().dialect)
+    params = compiled.params
+    return repr((str(compiled), sorted(params.items())))
+
+
+async def _exact_count(session: AsyncSession, stmt: Select) -> int:
+    result = await session.execute(stmt)
+    return result.scalar() or 0
+
+
+async def _cached_count(session: AsyncSession, stmt: Select) -> int:
+    tables = _statement_tables(stmt)
+    if written_tables(session) & tables:
+        # Незакоммиченные изменения видны только этой сессии: в кэш их не кладём.
+        return await _exact_count(session, stmt)
+    key = _cache_key(session, stmt)
+    cached = count_cache.get(key)
+    if cached is not None:
+        return cached
+    total = await _exact_count(session, stmt)
+    if not may_be_stale(session, tables):
+        count_cache.set(key, total, tables=tables)
+    return total
+
+
+async def _reltuples(session: AsyncSession, table: Table) -> int | None:
+    result = await session.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+        {"name": table.fullname},
+    )
+    reltuples = result.scalar()
+    # -1: таблица ещё ни разу не анализировалась, статистики нет.
+    if reltuples is None or reltuples < 0:
+        return None
+    return round(reltuples)
+
+
+# Узлы над оценкой строк COUNT: агрегаты (включая Partial и Finalize) и сбор
+# результатов параллельных воркеров.
+_COUNT_WRAPPER_NODES = frozenset({"Aggregate", "Gather", "Gather Merge"})
+_GATHER_NODES = frozenset({"Gather", "Gather Merge"})
+
+
+def _parallel_divisor(workers: int) -> float:
+    # Как get_parallel_divisor в PostgreSQL: под Gather оценки строк даны на один
+    # процесс, а ведущий процесс (parallel_leader_participation) берёт часть
+    # строк тем меньше, чем больше воркеров.
+    leader_contribution = 1.0 - 0.3 * workers
+    return workers + max(leader_contribution, 0.0)
+
+
+def _plan_rows(plan: dict[str, Any]) -> int:
+    """Оценка числа строк под агрегатом COUNT по плану EXPLAIN (FORMAT JSON)."""
+    divisor = 1.0
+    while plan["Node Type"] in _COUNT_WRAPPER_NODES and plan.get("Plans"):
+        if plan["Node Type"] in _GATHER_NODES:
+            divisor = _parallel_divisor(plan.get("Workers Planned", 0))
+        plan = plan["Plans"][0]
+    return round(plan["Plan Rows"] * divisor)
+
+
+async def _explain_rows(session: AsyncSession, stmt: Select) -> int | None:
+    result = await session.execute(_ExplainJson(stmt))
+    explain = result.scalar()
+    if explain is None:
+        return None
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    return _plan_rows(explain[0]["Plan"])
+
+
+async def _estimated_count(
+    session: AsyncSession, stmt: Select, *, table: Table | None
+) -> int:
+    if table is not None:
+        reltuples = await _reltuples(session, table)
+        if reltuples is not None:
+            return reltuples
+    rows = await _explain_rows(session, stmt)
+    if rows is None:
+        # План не получен — считаем точно, а не возвращаем выдуманную оценку.
+        return await _exact_count(session, stmt)
+    return rows
+
+
+async def count_rows(
+    session: AsyncSession,
+    stmt: Select,
+    *,
+    mode: CountMode = CountMode.EXACT,
+    table: Table | None = None,
+) -> int:
+    """Посчитать total для списка выбранным способом.
+
+    stmt — запрос вида SELECT count(...) с фильтрами списка. table передаётся,
+    только если список не отфильтрован и total равен числу строк таблицы: тогда
+    оценка берётся из pg_class.reltuples, иначе — из плана EXPLAIN.
+    """
+    if mode == CountMode.ESTIMATED:
+        return await _estimated_count(session, stmt, table=table)
+    if mode == CountMode.CACHED:
+        return await _cached_count(session, stmt)
+    return await _exact_count(session, stmt)
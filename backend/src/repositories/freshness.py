@@ -0,0 +1,135 @@
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import Table, func, literal_column, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import FromClause
+
+
+class Freshness:
+    """Отпечаток состояния данных для условных GET-запросов.
+
+    values меняются при любом изменении учтённых строк; last_modified — самая
+    поздняя метка created_at/updated_at среди них (None, если меток нет).
+    """
+
+    def __init__(self, *, values: list[Any], last_modified: datetime | None) -> None:
+        self.values = values
+        self.last_modified = last_modified
+
+
+class RowRelation:
+    """Связи карточки: строки link, у которых row_column ссылается на саму
+    строку, а target_column — на строку target, встроенную в ответ."""
+
+    def __init__(
+        self, link: Table, *, row_column: str, target: Table, target_column: str
+    ) -> None:
+        self.link = link
+        self.row_column = row_column
+        self.target = target
+        self.target_column = target_column
+
+
+def _changed_at(table: Table) -> ColumnElement[datetime]:
+    # updated_at заполняется только при UPDATE, новые строки видны по created_at.
+    return func.greatest(table.c.created_at, table.c.updated_at)
+
+
+def _rows_hash(table: Table) -> ColumnElement[Any]:
+    # В таблицах связей нет меток времени: замена одной связи на другую
+    # обнаруживается только по содержимому строк, удаление — по количеству.
+    return func.coalesce(
+        func.sum(func.hashtextextended(literal_column(f"{table.name}::text"), 0)), 0
+    )
+
+
+async def get_tables_freshness(
+    session: AsyncSession, tables: Sequence[Table]
+) -> Freshness:
+    """Состояние таблиц целиком — одним запросом.
+
+    Для таблиц с метками времени — количество строк (удаление не меняет
+    max(updated_at)) и самая поздняя метка, для таблиц связей — количество
+    и хэш строк.
+    """
+    columns: list[ColumnElement[Any]] = []
+    timestamp_labels = []
+    # Однострочные агрегаты по таблицам соединяются в одну строку результата.
+    from_clause: FromClause | None = None
+    for index, table in enumerate(tables):
+        has_timestamps = "updated_at" in table.c
+        state = func.max(_changed_at(table)) if has_timestamps else _rows_hash(table)
+        subquery = (
+            select(func.count().label(f"count_{index}"), state.label(f"state_{index}"))
+            .select_from(table)
+            .subquery()
+        )
+        columns.extend(subquery.c)
+        from_clause = (
+            subquery if from_clause is None else from_clause.join(subquery, true())
+        )
+        if has_timestamps:
+            timestamp_labels.append(f"state_{index}")
+
+    stmt = select(*columns)
+    if from_clause is not None:
+        stmt = stmt.select_from(from_clause)
+    row = (await session.execute(stmt)).mappings().one()
+    timestamps = [row[label] for label in timestamp_labels if row[label] is not None]
+    return Freshness(
+        values=list(row.values()),
+        last_modified=max(timestamps, default=None),
+    )
+
+
+async def get_row_freshness(
+    session: AsyncSession,
+    table: Table,
+    clause: ColumnElement[bool],
+    *,
+    relations: Sequence[RowRelation] = (),
+) -> Freshness | None:
+    """Состояние одной строки table и её собственных связей — одним запросом.
+
+    Подзапросы по связям выбирают строки по индексу внешнего ключа, поэтому
+    стоимость не зависит от размера таблиц. Возвращает None, если строка
+    по clause не найдена.
+    """
+    columns: list[ColumnElement[Any]] = [_changed_at(table).label("row_state")]
+    timestamp_labels = ["row_state"]
+    for index, relation in enumerate(relations):
+        link = relation.link
+        owned = link.c[relation.row_column] == table.c.id
+        columns.append(
+            select(func.count()).where(owned).scalar_subquery().label(f"count_{index}")
+        )
+        columns.append(
+            select(_rows_hash(link))
+            .where(owned)
+            .scalar_subquery()
+            .label(f"links_{index}")
+        )
+        columns.append(
+            select(func.max(_changed_at(relation.target)))
+            .select_from(
+                link.join(
+                    relation.target,
+                    link.c[relation.target_column] == relation.target.c.id,
+                )
+            )
+            .where(owned)
+            .scalar_subquery()
+            .label(f"state_{index}")
+        )
+        timestamp_labels.append(f"state_{index}")
+
+    row = (await session.execute(select(*columns).where(clause))).mappings().first()
+    if row is None:
+        return None
+    timestamps = [row[label] for label in timestamp_labels if row[label] is not None]
+    return Freshness(
+        values=list(row.values()),
+        last_modified=max(timestamps, default=None),
+    )
@@ -4,12 +4,17 @@ from uuid import UUID
 from sqlalchemy import Table, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.entities.base import CountMode
 from core.entities.horse_owner import HorseOwner
 from models.horse_owner import horse_owner
 
 from .abstract_repository import AbstractRepository
+from .cached import cached_repository
+from .counting import count_rows
+from .search import contains
 
 
+@cached_repository()
 class HorseOwnerRepository(AbstractRepository[HorseOwner]):
     table: Table = horse_owner
     entity = HorseOwner
@@ -30,6 +35,7 @@ class HorseOwnerRepository(AbstractRepository[HorseOwner]):
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[HorseOwner], int]:
         """Получить отфильтрованный список с подсчётом общего количества."""
         stmt = select(self.table)
@@ -37,17 +43,17 @@ class HorseOwnerRepository(AbstractRepository[HorseOwner]):
 
         conditions = []
         if name:
-            conditions.append(self.table.c.name.ilike(f"%{name}%"))
+            conditions.append(contains(self.table.c.name, name))
         if description:
-            conditions.append(self.table.c.description.ilike(f"%{description}%"))
+            conditions.append(contains(self.table.c.description, description))
         if type:
             conditions.append(self.table.c.type.in_(type))
         if address:
-            conditions.append(self.table.c.address.ilike(f"%{address}%"))
+            conditions.append(contains(self.table.c.address, address))
         if phone_numbers:
             # Поиск в JSONB массиве phone_numbers
             conditions.append(
-                self.table.c.phone_numbers.astext.ilike(f"%{phone_numbers}%")
+                contains(self.table.c.phone_numbers.astext, phone_numbers)
             )
 
         if conditions:
@@ -76,7 +82,11 @@ class HorseOwnerRepository(AbstractRepository[HorseOwner]):
             self.entity.model_validate(dict(row)) for row in rows.mappings().all()
         ]
 
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar() or 0
+        total = await count_rows(
+            self.session,
+            count_stmt,
+            mode=count_mode,
+            table=None if conditions else self.table,
+        )
 
         return entities, total
@@ -0,0 +1,271 @@
+import asyncio
+import time
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import String, literal, null, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.entities import HorseSexEnum
+from core.schemas import HorseOutDto, HorsePedigree, HorseWithPedigreeOutDto
+from models.horse import horse, horse_children
+from settings import settings
+from utils.table_events import may_be_stale, on_tables_committed, written_tables
+
+_SIRE_SEXES = (HorseSexEnum.MALE.value, HorseSexEnum.GELD.value)
+_DAM_SEXES = (HorseSexEnum.FEMALE.value,)
+
+# Пол родителя хранится в horse, поэтому изменения лошадей тоже влияют на граф.
+_PEDIGREE_TABLES = frozenset({horse.name, horse_children.name})
+
+
+class PedigreeGraph:
+    """Связи родословной: отец и мать каждой лошади, потомки лошадей."""
+
+    def __init__(self) -> None:
+        self.sire_by_horse: dict[UUID, UUID] = {}
+        self.dam_by_horse: dict[UUID, UUID] = {}
+        self.foals_by_horse: dict[UUID, tuple[UUID, ...]] = {}
+
+    def closure(self, *, horse_ids: Iterable[UUID], generations: int) -> set[UUID]:
+        """Предки на generations поколений вверх и потомки указанных лошадей."""
+        ids: set[UUID] = set()
+        level = list(horse_ids)
+        for h_id in level:
+            ids.update(self.foals_by_horse.get(h_id, ()))
+        for _ in range(generations):
+            parents = [
+                parent_id
+                for h_id in level
+                for parent_id in (
+                    self.sire_by_horse.get(h_id),
+                    self.dam_by_horse.get(h_id),
+                )
+                if parent_id is not None
+            ]
+            ids.update(parents)
+            level = parents
+        return ids
+
+    def add_parent(self, *, child_id: UUID, parent_id: UUID, parent_sex: str) -> None:
+        if parent_sex in _SIRE_SEXES:
+            self.sire_by_horse[child_id] = parent_id
+        elif parent_sex in _DAM_SEXES:
+            self.dam_by_horse[child_id] = parent_id
+
+    def add_foals(self, edges: Iterable[tuple[UUID, UUID]]) -> None:
+        """Добавить потомков по парам (parent_id, child_id).
+
+        Потомки собираются в списки и превращаются в кортежи один раз на
+        лошадь, а не пересоздаются на каждое ребро.
+        """
+        foals: dict[UUID, list[UUID]] = {}
+        for parent_id, child_id in edges:
+            foals.setdefault(parent_id, []).append(child_id)
+        for parent_id, children in foals.items():
+            self.foals_by_horse[parent_id] = (
+                *self.foals_by_horse.get(parent_id, ()),
+                *children,
+            )
+
+
+def _pedigree_edges_stmt(*, horse_ids: Sequence[UUID], generations: int):
+    """WITH RECURSIVE: предки на generations поколений вверх и потомки корневых лошадей."""
+    ancestors = (
+        select(
+            horse_children.c.child_id,
+            horse_children.c.horse_id.label("parent_id"),
+            literal(1).label("depth"),
+        )
+        .where(horse_children.c.child_id.in_(horse_ids))
+        .cte("ancestors", recursive=True)
+    )
+    parent_edge = horse_children.alias("parent_edge")
+    ancestors = ancestors.union_all(
+        select(
+            parent_edge.c.child_id,
+            parent_edge.c.horse_id,
+            ancestors.c.depth + 1,
+        )
+        .join(ancestors, parent_edge.c.child_id == ancestors.c.parent_id)
+        .where(ancestors.c.depth < generations)
+    )
+
+    parents_stmt = select(
+        ancestors.c.child_id,
+        ancestors.c.parent_id,
+        horse.c.sex.label("parent_sex"),
+        literal(False).label("is_foal"),
+    ).join(horse, horse.c.id == ancestors.c.parent_id)
+    foals_stmt = select(
+        horse_children.c.child_id,
+        horse_children.c.horse_id.label("parent_id"),
+        null().cast(String).label("parent_sex"),
+        literal(True).label("is_foal"),
+    ).where(horse_children.c.horse_id.in_(horse_ids))
+    return union(parents_stmt, foals_stmt)
+
+
+async def load_pedigree_graph(
+    session: AsyncSession, *, horse_ids: Iterable[UUID], generations: int
+) -> PedigreeGraph:
+    """Загрузить граф родословной одним рекурсивным запросом."""
+    graph = PedigreeGraph()
+    root_ids = list(horse_ids)
+    if not root_ids or generations <= 0:
+        return graph
+
+    result = await session.execute(
+        _pedigree_edges_stmt(horse_ids=root_ids, generations=generations)
+    )
+    foal_edges: list[tuple[UUID, UUID]] = []
+    for row in result.mappings().all():
+        child_id = UUID(str(row["child_id"]))
+        parent_id = UUID(str(row["parent_id"]))
+        if row["is_foal"]:
+            foal_edges.append((parent_id, child_id))
+        else:
+            graph.add_parent(
+                child_id=child_id, parent_id=parent_id, parent_sex=row["parent_sex"]
+            )
+    graph.add_foals(foal_edges)
+    return graph
+
+
+class PedigreeIndex:
+    """Граф всех связей horse_children в памяти воркера.
+
+    Загружается лениво при первом обращении одним запросом и сбрасывается после
+    коммита любой транзакции, изменившей horse или horse_children. Изменения,
+    сделанные в других воркерах, подхватываются не позже чем через ttl_seconds.
+    """
+
+    def __init__(self, *, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._graph: PedigreeGraph | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, tables: Iterable[str] | None = None) -> None:
+        self._generation += 1
+        self._graph = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._graph is not None
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    async def get_graph(self, session: AsyncSession) -> PedigreeGraph:
+        if self._is_fresh():
+            return self._graph  # type: ignore[return-value]
+        async with self._lock:
+            if self._is_fresh():
+                return self._graph  # type: ignore[return-value]
+            generation = self._generation
+            graph = await self._load(session)
+            if generation == self._generation and not may_be_stale(
+                session, _PEDIGREE_TABLES
+            ):
+                self._graph = graph
+                self._loaded_at = time.monotonic()
+            return graph
+
+    @staticmethod
+    async def _load(session: AsyncSession) -> PedigreeGraph:
+        graph = PedigreeGraph()
+        stmt = select(
+            horse_children.c.child_id,
+            horse_children.c.horse_id,
+            horse.c.sex,
+        ).join(horse, horse.c.id == horse_children.c.horse_id)
+        result = await session.execute(stmt)
+        foal_edges: list[tuple[UUID, UUID]] = []
+        for child_id, parent_id, parent_sex in result.all():
+            child_id = UUID(str(child_id))
+            parent_id = UUID(str(parent_id))
+            graph.add_parent(
+                child_id=child_id, parent_id=parent_id, parent_sex=parent_sex
+            )
+            foal_edges.append((parent_id, child_id))
+        graph.add_foals(foal_edges)
+        return graph
+
+
+pedigree_index = PedigreeIndex(ttl_seconds=settings.pedigree_index_ttl_seconds)
+on_tables_committed(_PEDIGREE_TABLES, pedigree_index.invalidate)
+
+
+def can_use_pedigree_index(session: AsyncSession) -> bool:
+    """Индекс не видит незакоммиченных изменений родословной в этой сессии."""
+    return settings.pedigree_index_enabled and not (
+        written_tables(session) & _PEDIGREE_TABLES
+    )
+
+
+async def get_pedigree_graph(
+    session: AsyncSession, *, horse_ids: Iterable[UUID], generations: int
+) -> PedigreeGraph:
+    """Граф родословной из индекса воркера, либо рекурсивным запросом."""
+    if can_use_pedigree_index(session):
+        return await pedigree_index.get_graph(session)
+    return await load_pedigree_graph(
+        session, horse_ids=horse_ids, generations=generations
+    )
+
+
+def _with_pedigree(
+    base_dto: HorseOutDto, pedigree: HorsePedigree
+) -> HorseWithPedigreeOutDto:
+    """Расширить готовый DTO родословной без повторной сериализации и валидации."""
+    return HorseWithPedigreeOutDto.model_construct(
+        _fields_set=base_dto.model_fields_set | {"pedigree"},
+        **base_dto.__dict__,
+        pedigree=pedigree,
+    )
+
+
+def build_pedigree_dtos(
+    *,
+    graph: PedigreeGraph,
+    horse_ids: Sequence[UUID],
+    dtos: dict[UUID, HorseOutDto],
+    generations: int,
+) -> dict[UUID, HorseWithPedigreeOutDto]:
+    """Собрать деревья родословной в памяти из уже загруженных DTO.
+
+    Узел строится один раз на лошадь и глубину и переиспользуется во всех
+    деревьях ответа, в которых он встречается.
+    """
+    top_level_ids = set(horse_ids)
+    nodes: dict[tuple[UUID, int], HorseOutDto | HorseWithPedigreeOutDto] = {}
+
+    def foals_of(h_id: UUID) -> list[HorseOutDto]:
+        return [dtos[f] for f in graph.foals_by_horse.get(h_id, ()) if f in dtos]
+
+    def build(
+        h_id: UUID | None, generations_left: int
+    ) -> HorseOutDto | HorseWithPedigreeOutDto | None:
+        if h_id is None or h_id not in dtos:
+            return None
+        if generations_left <= 0:
+            return dtos[h_id]
+        key = (h_id, generations_left)
+        if key not in nodes:
+            nodes[key] = _with_pedigree(
+                dtos[h_id],
+                HorsePedigree.model_construct(
+                    sire=build(graph.sire_by_horse.get(h_id), generations_left - 1),
+                    dam=build(graph.dam_by_horse.get(h_id), generations_left - 1),
+                    foals=foals_of(h_id) if h_id in top_level_ids else [],
+                ),
+            )
+        return nodes[key]
+
+    result: dict[UUID, HorseWithPedigreeOutDto] = {}
+    for h_id in horse_ids:
+        built = build(h_id, generations)
+        if isinstance(built, HorseWithPedigreeOutDto):
+            result[h_id] = built
+    return result
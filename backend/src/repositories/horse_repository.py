@@ -1,12 +1,24 @@
 from datetime import date
-from typing import Mapping, Union
+from itertools import chain
+from typing import Any, Iterable, Mapping, Union
 from uuid import UUID
 
-from sqlalchemy import Table, and_, delete, func, insert, or_, select
+from sqlalchemy import (
+    Table,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+)
 from sqlalchemy.sql.elements import ColumnElement
 
 from core.entities import (
     _HORSE_AVAILABLE_SORT_FIELDS,
+    CountMode,
     Horse,
     HorseChildren,
     HorseDateModeEnum,
@@ -18,7 +30,6 @@ from core.schemas import (
     CoatColorOutDto,
     HorseOutDto,
     HorseOwnerOutDto,
-    HorsePedigree,
     HorseServiceOutDto,
     HorseWithPedigreeOutDto,
     PhotoOutShortDto,
@@ -29,11 +40,47 @@ from models.horse import horse, horse_children, horse_photos
 from models.horse_owner import horse_owner
 from models.horse_service import horse_service, horse_service_relations
 from models.photos import photos
-from settings import settings
+from utils.images import build_srcset
+from utils.storage import storage_backend
 
 from .abstract_repository import AbstractRepository
+from .cached import cached_repository
+from .counting import count_rows
+from .horse_pedigree import (
+    build_pedigree_dtos,
+    get_pedigree_graph,
+)
+from .keyset import Keyset, KeysetColumn
+from .search import contains
+
+_HORSE_KEYS = frozenset(c.key for c in horse.c)
+# page_data в карточке не отдаётся, поэтому и не агрегируется.
+_CARD_SERVICE_COLUMNS = [c for c in horse_service.c if c.key != "page_data"]
+_EMPTY_JSON_ARRAY: ColumnElement[Any] = literal_column("'[]'::json")
 
 
+def _json_object(columns: Iterable[ColumnElement]) -> ColumnElement:
+    """json_build_object с именами колонок в качестве ключей."""
+    return func.json_build_object(
+        *chain.from_iterable(
+            (literal_column(f"'{column.key}'"), column) for column in columns
+        )
+    )
+
+
+@cached_repository(
+    methods=("get_horse_full_info_by_id", "get_horse_full_info_by_slug"),
+    depends_on=(
+        breeds.name,
+        coat_color.name,
+        horse_owner.name,
+        photos.name,
+        horse_photos.name,
+        horse_service.name,
+        horse_service_relations.name,
+        horse_children.name,
+    ),
+)
 class HorseRepository(AbstractRepository[Horse]):
     """Протокол для работы с лошадьми."""
 
@@ -41,8 +88,7 @@ class HorseRepository(AbstractRepository[Horse]):
     entity = Horse
 
     def _build_photo_url(self, path: str) -> str:
-        protocol = "https" if not settings.debug else "http"
-        return f"{protocol}://{settings.cms_backend_domain}/media/{path}"
+        return storage_backend.url(path)
 
     @staticmethod
     def _row_to_joined_table(row: Mapping, table: Table, suffixes: list[str]) -> dict:
@@ -73,9 +119,10 @@ class HorseRepository(AbstractRepository[Horse]):
 
         photos_dto = [
             PhotoOutShortDto(
-                id=UUID(photo["photo_id"]),
+                id=UUID(str(photo["photo_id"])),
                 is_main=photo["is_main"],
                 url=self._build_photo_url(photo["path"]),
+                srcset=build_srcset(photo["path"], self._build_photo_url),
             )
             for photo in photos_data
         ]
@@ -102,164 +149,142 @@ class HorseRepository(AbstractRepository[Horse]):
             this_stable=horse_data.get("this_stable", False),
         )
 
-    async def get_horse_full_info_by_slug(
-        self, *, horse_slug: str, pedigree: int | None = None
-    ) -> HorseOutDto | HorseWithPedigreeOutDto | None:
-        if pedigree is not None and pedigree > 0:
-            id_stmt = select(horse.c.id).where(horse.c.slug == horse_slug)
-            id_result = await self.session.execute(id_stmt)
-            id_row = id_result.first()
-            if id_row is None:
-                return None
-            horse_id = UUID(str(id_row[0]))
-            mapping, _ = await self.get_horse_list_full_info(
-                include_ids=[horse_id],
-                limit=1,
-                pedigree=pedigree,
-            )
-            return mapping.get(horse_id) if mapping else None
-
-        stmt = (
-            select(
-                horse,
-                breeds,
-                coat_color,
-                horse_owner,
-            )
+    @staticmethod
+    def _full_info_stmt():
+        return (
+            select(horse, breeds, coat_color, horse_owner)
             .outerjoin(breeds, horse.c.breed_id == breeds.c.id)
             .outerjoin(coat_color, horse.c.coat_color_id == coat_color.c.id)
             .outerjoin(horse_owner, horse.c.horse_owner_id == horse_owner.c.id)
-            .where(horse.c.slug == horse_slug)
         )
 
-        result = await self.session.execute(stmt)
-        row = result.mappings().first()
-
-        if row is None:
-            return None
+    @classmethod
+    def _card_stmt(cls):
+        """_full_info_stmt с фотографиями и услугами, собранными json_agg по каждой лошади."""
+        photos_json = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        _json_object(
+                            [
+                                horse_photos.c.photo_id,
+                                horse_photos.c.is_main,
+                                photos.c.path,
+                            ]
+                        )
+                    ),
+                    _EMPTY_JSON_ARRAY,
+                )
+            )
+            .select_from(
+                horse_photos.join(photos, horse_photos.c.photo_id == photos.c.id)
+            )
+            .where(horse_photos.c.horse_id == horse.c.id)
+            .scalar_subquery()
+        )
+        services_json = (
+            select(
+                func.coalesce(
+                    func.json_agg(_json_object(_CARD_SERVICE_COLUMNS)),
+                    _EMPTY_JSON_ARRAY,
+                )
+            )
+            .select_from(
+                horse_service.join(
+                    horse_service_relations,
+                    horse_service.c.id == horse_service_relations.c.service_id,
+                )
+            )
+            .where(horse_service_relations.c.horse_id == horse.c.id)
+            .scalar_subquery()
+        )
+        return cls._full_info_stmt().add_columns(
+            photos_json.label("photos_json"), services_json.label("services_json")
+        )
 
-        horse_id = UUID(str(row["id"]))
-        horse_keys = {c.key for c in horse.c}
-        horse_data = {k: v for k, v in row.items() if k in horse_keys}
+    @classmethod
+    def _split_full_info_row(
+        cls, row: Mapping
+    ) -> tuple[dict, dict | None, dict | None, dict | None]:
+        """Разобрать строку _full_info_stmt на лошадь, породу, масть и владельца."""
+        horse_data = {k: v for k, v in row.items() if k in _HORSE_KEYS}
         breed_data = (
-            self._row_to_joined_table(row, breeds, ["_1", ""])
+            cls._row_to_joined_table(row, breeds, ["_1", ""])
             if row.get("id_1") is not None
             else None
         )
         coat_color_data = (
-            self._row_to_joined_table(row, coat_color, ["_2", "_1", ""])
+            cls._row_to_joined_table(row, coat_color, ["_2", "_1", ""])
             if row.get("id_2") is not None
             else None
         )
         horse_owner_data = (
-            self._row_to_joined_table(row, horse_owner, ["_3", ""])
+            cls._row_to_joined_table(row, horse_owner, ["_3", ""])
             if row.get("id_3") is not None
             else None
         )
+        return horse_data, breed_data, coat_color_data, horse_owner_data
 
-        photos_stmt = (
-            select(horse_photos.c.photo_id, horse_photos.c.is_main, photos.c.path)
-            .join(photos, horse_photos.c.photo_id == photos.c.id)
-            .where(horse_photos.c.horse_id == horse_id)
-        )
-        photos_result = await self.session.execute(photos_stmt)
-        photos_data = [dict(row) for row in photos_result.mappings().all()]
-
-        services_stmt = (
-            select(horse_service)
-            .join(
-                horse_service_relations,
-                horse_service.c.id == horse_service_relations.c.service_id,
-            )
-            .where(horse_service_relations.c.horse_id == horse_id)
-        )
-        services_result = await self.session.execute(services_stmt)
-        services_data = [dict(row) for row in services_result.mappings().all()]
-
+    def _card_dto(self, row: Mapping) -> HorseOutDto:
+        """DTO лошади из строки _card_stmt."""
         return self._build_horse_dto(
-            horse_data,
-            breed_data,
-            coat_color_data,
-            horse_owner_data,
-            photos_data,
-            services_data,
+            *self._split_full_info_row(row),
+            row["photos_json"],
+            row["services_json"],
         )
 
-    async def get_horse_full_info_by_id(
-        self, *, horse_id: UUID, pedigree: int | None = None
+    def _card_dtos(self, rows: Iterable[Mapping]) -> dict[UUID, HorseOutDto]:
+        return {UUID(str(row["id"])): self._card_dto(row) for row in rows}
+
+    async def _get_card_rows(self, *, ids: Iterable[UUID]) -> list[dict]:
+        """Строки _card_stmt лошадей по идентификаторам — одним запросом."""
+        stmt = self._card_stmt().where(horse.c.id.in_(list(ids)))
+        result = await self.session.execute(stmt)
+        return [dict(row) for row in result.mappings().all()]
+
+    async def _get_horse_card(
+        self, where_clause: ColumnElement[bool]
+    ) -> HorseOutDto | None:
+        """Карточка лошади (порода, масть, владелец, фотографии, услуги) одним запросом."""
+        result = await self.session.execute(self._card_stmt().where(where_clause))
+        row = result.mappings().first()
+        if row is None:
+            return None
+        return self._card_dto(row)
+
+    async def get_horse_full_info_by_slug(
+        self, *, horse_slug: str, pedigree: int | None = None
     ) -> HorseOutDto | HorseWithPedigreeOutDto | None:
         if pedigree is not None and pedigree > 0:
-            mapping, _ = await self.get_horse_list_full_info(
+            id_stmt = select(horse.c.id).where(horse.c.slug == horse_slug)
+            id_result = await self.session.execute(id_stmt)
+            id_row = id_result.first()
+            if id_row is None:
+                return None
+            horse_id = UUID(str(id_row[0]))
+            mapping, _, _ = await self.get_horse_list_full_info(
                 include_ids=[horse_id],
                 limit=1,
                 pedigree=pedigree,
+                with_total=False,
             )
             return mapping.get(horse_id) if mapping else None
 
-        stmt = (
-            select(
-                horse,
-                breeds,
-                coat_color,
-                horse_owner,
-            )
-            .outerjoin(breeds, horse.c.breed_id == breeds.c.id)
-            .outerjoin(coat_color, horse.c.coat_color_id == coat_color.c.id)
-            .outerjoin(horse_owner, horse.c.horse_owner_id == horse_owner.c.id)
-            .where(horse.c.id == horse_id)
-        )
-
-        result = await self.session.execute(stmt)
-        row = result.mappings().first()
-
-        if row is None:
-            return None
-
-        horse_keys = {c.key for c in horse.c}
-        horse_data = {k: v for k, v in row.items() if k in horse_keys}
-        breed_data = (
-            self._row_to_joined_table(row, breeds, ["_1", ""])
-            if row.get("id_1") is not None
-            else None
-        )
-        coat_color_data = (
-            self._row_to_joined_table(row, coat_color, ["_2", "_1", ""])
-            if row.get("id_2") is not None
-            else None
-        )
-        horse_owner_data = (
-            self._row_to_joined_table(row, horse_owner, ["_3", ""])
-            if row.get("id_3") is not None
-            else None
-        )
+        return await self._get_horse_card(horse.c.slug == horse_slug)
 
-        photos_stmt = (
-            select(horse_photos.c.photo_id, horse_photos.c.is_main, photos.c.path)
-            .join(photos, horse_photos.c.photo_id == photos.c.id)
-            .where(horse_photos.c.horse_id == horse_id)
-        )
-        photos_result = await self.session.execute(photos_stmt)
-        photos_data = [dict(row) for row in photos_result.mappings().all()]
-
-        services_stmt = (
-            select(horse_service)
-            .join(
-                horse_service_relations,
-                horse_service.c.id == horse_service_relations.c.service_id,
+    async def get_horse_full_info_by_id(
+        self, *, horse_id: UUID, pedigree: int | None = None
+    ) -> HorseOutDto | HorseWithPedigreeOutDto | None:
+        if pedigree is not None and pedigree > 0:
+            mapping, _, _ = await self.get_horse_list_full_info(
+                include_ids=[horse_id],
+                limit=1,
+                pedigree=pedigree,
+                with_total=False,
             )
-            .where(horse_service_relations.c.horse_id == horse_id)
-        )
-        services_result = await self.session.execute(services_stmt)
-        services_data = [dict(row) for row in services_result.mappings().all()]
+            return mapping.get(horse_id) if mapping else None
 
-        return self._build_horse_dto(
-            horse_data,
-            breed_data,
-            coat_color_data,
-            horse_owner_data,
-            photos_data,
-            services_data,
-        )
+        return await self._get_horse_card(horse.c.id == horse_id)
 
     async def get_horse_list_full_info(
         self,
@@ -289,13 +314,21 @@ class HorseRepository(AbstractRepository[Horse]):
         offset: int | None = None,
         sort: list[_HORSE_AVAILABLE_SORT_FIELDS] | None = None,
         pedigree: int | None = None,
-    ) -> tuple[Mapping[UUID, Union[HorseOutDto, HorseWithPedigreeOutDto]], int]:
-        base_stmt = (
-            select(horse, breeds, coat_color, horse_owner)
-            .outerjoin(breeds, horse.c.breed_id == breeds.c.id)
-            .outerjoin(coat_color, horse.c.coat_color_id == coat_color.c.id)
-            .outerjoin(horse_owner, horse.c.horse_owner_id == horse_owner.c.id)
-        )
+        cursor: str | None = None,
+        with_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> tuple[
+        Mapping[UUID, Union[HorseOutDto, HorseWithPedigreeOutDto]],
+        int | None,
+        str | None,
+    ]:
+        """Список лошадей с полной информацией.
+
+        Возвращает лошадей, общее количество (None при with_total=False) и курсор
+        следующей страницы. При переданном cursor offset не используется.
+        """
+        # Фотографии и услуги собираются json_agg в том же запросе, что и страница.
+        base_stmt = self._card_stmt()
 
         count_stmt = select(func.count(func.distinct(horse.c.id))).select_from(
             horse.outerjoin(breeds, horse.c.breed_id == breeds.c.id)
@@ -305,9 +338,9 @@ class HorseRepository(AbstractRepository[Horse]):
 
         conditions: list[ColumnElement[bool]] = []
         if name:
-            conditions.append(horse.c.name.ilike(f"%{name}%"))
+            conditions.append(contains(horse.c.name, name))
         if description:
-            conditions.append(horse.c.description.ilike(f"%{description}%"))
+            conditions.append(contains(horse.c.description, description))
         if breed_ids:
             conditions.append(horse.c.breed_id.in_(breed_ids))
         if coat_color_ids:
@@ -353,256 +386,87 @@ class HorseRepository(AbstractRepository[Horse]):
         if include_ids:
             conditions.append(horse.c.id.in_(include_ids))
         if exclude_ids_that_are_children_of_sex:
-            subq = (
-                select(horse_children.c.child_id)
-                .join(horse, horse_children.c.horse_id == horse.c.id)
-                .where(
-                    horse.c.sex.in_(
+            # NOT EXISTS по индексу horse_children(child_id): размер запроса не
+            # зависит от числа связей в родословной.
+            parent = horse.alias("parent")
+            conditions.append(
+                ~exists().where(
+                    horse_children.c.child_id == horse.c.id,
+                    horse_children.c.horse_id == parent.c.id,
+                    parent.c.sex.in_(
                         [e.value for e in exclude_ids_that_are_children_of_sex]
-                    )
+                    ),
                 )
             )
-            conditions.append(~horse.c.id.in_(subq))
 
         if conditions:
             where_clause = and_(*conditions)
             base_stmt = base_stmt.where(where_clause)
             count_stmt = count_stmt.where(where_clause)
 
-        if sort:
-            order_by_clauses = []
-            for field in sort:
-                field_name = field[1:] if field.startswith("-") else field
-                if field_name == "breed_name":
-                    column = breeds.c.name
-                elif field_name == "coat_color_name":
-                    column = coat_color.c.name
-                else:
-                    column = horse.c[field_name]
-
-                if field.startswith("-"):
-                    order_by_clauses.append(column.desc().nulls_last())
-                else:
-                    order_by_clauses.append(column.asc().nulls_first())
-            base_stmt = base_stmt.order_by(*order_by_clauses)
-
-        if limit is not None:
-            base_stmt = base_stmt.limit(limit)
-        if offset is not None:
-            base_stmt = base_stmt.offset(offset)
+        keyset_columns: list[KeysetColumn] = []
+        for field in sort or []:
+            field_name = field[1:] if field.startswith("-") else field
+            if field_name == "breed_name":
+                column = breeds.c.name
+            elif field_name == "coat_color_name":
+                column = coat_color.c.name
+            else:
+                column = horse.c[field_name]
+
+            if field.startswith("-"):
+                keyset_columns.append(
+                    KeysetColumn(column, descending=True, nulls_first=False)
+                )
+            else:
+                keyset_columns.append(KeysetColumn(column, nulls_first=True))
+        keyset = Keyset(
+            keyset_columns, tiebreaker=horse.c.id, signature=",".join(sort or [])
+        )
+        base_stmt = keyset.apply(base_stmt, cursor=cursor, limit=limit, offset=offset)
 
         base_result = await self.session.execute(base_stmt)
-        rows = base_result.mappings().all()
-
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar() or 0
+        page_rows, next_cursor = keyset.page(base_result.mappings().all(), limit=limit)
+        rows = [dict(row) for row in page_rows]
+
+        total: int | None = None
+        if with_total:
+            # Соединения с породой, мастью и владельцем — многие-к-одному, поэтому
+            # без фильтров total равен числу строк horse.
+            total = await count_rows(
+                self.session,
+                count_stmt,
+                mode=count_mode,
+                table=None if conditions else horse,
+            )
 
         horse_ids = [UUID(str(row["id"])) for row in rows]
 
         if not horse_ids:
-            return {}, total
+            return {}, total, next_cursor
 
-        photos_stmt = (
-            select(
-                horse_photos.c.horse_id,
-                horse_photos.c.photo_id,
-                horse_photos.c.is_main,
-                photos.c.path,
-            )
-            .join(photos, horse_photos.c.photo_id == photos.c.id)
-            .where(horse_photos.c.horse_id.in_(horse_ids))
+        if not pedigree or pedigree <= 0:
+            return self._card_dtos(rows), total, next_cursor
+
+        graph = await get_pedigree_graph(
+            self.session, horse_ids=horse_ids, generations=pedigree
         )
-        photos_result = await self.session.execute(photos_stmt)
-        photos_by_horse: dict[UUID, list[dict]] = {}
-        for row in photos_result.mappings().all():
-            horse_id = UUID(str(row["horse_id"]))
-            if horse_id not in photos_by_horse:
-                photos_by_horse[horse_id] = []
-            photos_by_horse[horse_id].append(dict(row))
-
-        services_stmt = (
-            select(horse_service, horse_service_relations.c.horse_id)
-            .join(
-                horse_service_relations,
-                horse_service.c.id == horse_service_relations.c.service_id,
-            )
-            .where(horse_service_relations.c.horse_id.in_(horse_ids))
+        missing_ids = graph.closure(horse_ids=horse_ids, generations=pedigree) - set(
+            horse_ids
+        )
+        if missing_ids:
+            rows = [*rows, *await self._get_card_rows(ids=missing_ids)]
+        all_dtos = self._card_dtos(rows)
+        return (
+            build_pedigree_dtos(
+                graph=graph,
+                horse_ids=horse_ids,
+                dtos=all_dtos,
+                generations=pedigree,
+            ),
+            total,
+            next_cursor,
         )
-        services_result = await self.session.execute(services_stmt)
-        services_by_horse: dict[UUID, list[dict]] = {}
-        horse_service_keys = {c.key for c in horse_service.c}
-        for row in services_result.mappings().all():
-            horse_id = UUID(str(row["horse_id"]))
-            if horse_id not in services_by_horse:
-                services_by_horse[horse_id] = []
-            service_data = {k: v for k, v in row.items() if k in horse_service_keys}
-            services_by_horse[horse_id].append(service_data)
-
-        horses_dict: dict[UUID, HorseOutDto] = {}
-        horse_keys = {c.key for c in horse.c}
-        for row in rows:
-            horse_id = UUID(str(row["id"]))
-            horse_data = {k: v for k, v in row.items() if k in horse_keys}
-            breed_data = (
-                self._row_to_joined_table(row, breeds, ["_1", ""])
-                if row.get("id_1") is not None
-                else None
-            )
-            coat_color_data = (
-                self._row_to_joined_table(row, coat_color, ["_2", "_1", ""])
-                if row.get("id_2") is not None
-                else None
-            )
-            horse_owner_data = (
-                self._row_to_joined_table(row, horse_owner, ["_3", ""])
-                if row.get("id_3") is not None
-                else None
-            )
-
-            photos_data = photos_by_horse.get(horse_id, [])
-            services_data = services_by_horse.get(horse_id, [])
-
-            horses_dict[horse_id] = self._build_horse_dto(
-                horse_data,
-                breed_data,
-                coat_color_data,
-                horse_owner_data,
-                photos_data,
-                services_data,
-            )
-
-        if pedigree and pedigree > 0:
-            sire_by_horse: dict[UUID, UUID] = {}
-            dam_by_horse: dict[UUID, UUID] = {}
-            foals_by_horse: dict[UUID, list[UUID]] = {}
-
-            current_children: set[UUID] = set(horse_ids)
-            for _ in range(pedigree):
-                if not current_children:
-                    break
-                parents_stmt = (
-                    select(
-                        horse_children.c.child_id,
-                        horse_children.c.horse_id,
-                        horse.c.sex,
-                    )
-                    .join(horse, horse_children.c.horse_id == horse.c.id)
-                    .where(horse_children.c.child_id.in_(current_children))
-                )
-                parents_result = await self.session.execute(parents_stmt)
-                next_children: set[UUID] = set()
-                for row in parents_result.mappings().all():
-                    child_id = UUID(str(row["child_id"]))
-                    parent_id = UUID(str(row["horse_id"]))
-                    sex = row["sex"]
-                    if sex in (HorseSexEnum.MALE.value, HorseSexEnum.GELD.value):
-                        sire_by_horse[child_id] = parent_id
-                        next_children.add(parent_id)
-                    elif sex == HorseSexEnum.FEMALE.value:
-                        dam_by_horse[child_id] = parent_id
-                        next_children.add(parent_id)
-                current_children = next_children
-
-            foals_stmt = select(
-                horse_children.c.horse_id,
-                horse_children.c.child_id,
-            ).where(horse_children.c.horse_id.in_(horse_ids))
-            foals_result = await self.session.execute(foals_stmt)
-            for row in foals_result.mappings().all():
-                parent_id = UUID(str(row["horse_id"]))
-                child_id = UUID(str(row["child_id"]))
-                if parent_id not in foals_by_horse:
-                    foals_by_horse[parent_id] = []
-                foals_by_horse[parent_id].append(child_id)
-
-            pedigree_ids: set[UUID] = (
-                set(horse_ids)
-                | set(sire_by_horse.values())
-                | set(dam_by_horse.values())
-                | {f for fs in foals_by_horse.values() for f in fs}
-            )
-            missing_ids = pedigree_ids - set(horses_dict.keys())
-
-            all_dtos: dict[UUID, HorseOutDto] = dict(horses_dict)
-            batch_size = 50
-            if missing_ids:
-                missing_list = list(missing_ids)
-                for i in range(0, len(missing_list), batch_size):
-                    batch = missing_list[i : i + batch_size]
-                    fetched, _ = await self.get_horse_list_full_info(
-                        include_ids=batch,
-                        limit=len(batch) + 1,
-                        pedigree=0,
-                    )
-                    all_dtos.update(fetched)
-
-            top_level_ids = set(horse_ids)
-
-            def build_pedigree_dto(
-                h_id: UUID,
-                generations_left: int,
-            ) -> HorseOutDto | HorseWithPedigreeOutDto | None:
-                base_dto = all_dtos.get(h_id)
-                if base_dto is None:
-                    return None
-                if generations_left <= 0:
-                    return base_dto
-                sire_id = sire_by_horse.get(h_id)
-                dam_id = dam_by_horse.get(h_id)
-                sire_dto = (
-                    build_pedigree_dto(sire_id, generations_left - 1)
-                    if sire_id
-                    else None
-                )
-                dam_dto = (
-                    build_pedigree_dto(dam_id, generations_left - 1) if dam_id else None
-                )
-                foals_dtos = (
-                    [all_dtos[f] for f in foals_by_horse.get(h_id, []) if f in all_dtos]
-                    if h_id in top_level_ids
-                    else []
-                )
-                return HorseWithPedigreeOutDto(
-                    **base_dto.model_dump(),
-                    pedigree=HorsePedigree(
-                        sire=sire_dto,
-                        dam=dam_dto,
-                        foals=foals_dtos,
-                    ),
-                )
-
-            result_dict: dict[UUID, HorseWithPedigreeOutDto] = {}
-            for h_id in horse_ids:
-                built = build_pedigree_dto(h_id, pedigree)
-                if isinstance(built, HorseWithPedigreeOutDto):
-                    result_dict[h_id] = built
-                elif built is not None:
-                    result_dict[h_id] = HorseWithPedigreeOutDto(
-                        **built.model_dump(),
-                        pedigree=HorsePedigree(
-                            sire=None,
-                            dam=None,
-                            foals=[
-                                all_dtos[f]
-                                for f in foals_by_horse.get(h_id, [])
-                                if f in all_dtos
-                            ],
-                        ),
-                    )
-                else:
-                    base = horses_dict.get(h_id)
-                    if base is not None:
-                        result_dict[h_id] = HorseWithPedigreeOutDto(
-                            **base.model_dump(),
-                            pedigree=HorsePedigree(
-                                sire=None,
-                                dam=None,
-                                foals=[],
-                            ),
-                        )
-            return result_dict, total
-
-        return horses_dict, total
 
     async def get_available_dames(
         self,
@@ -626,7 +490,8 @@ class HorseRepository(AbstractRepository[Horse]):
         if target_horse.bdate is not None:
             filters["bdate_lte_or_none"] = target_horse.bdate
             filters["ddate_gte_or_none"] = target_horse.bdate
-        return await self.get_horse_list_full_info(**filters)
+        horses, total, _ = await self.get_horse_list_full_info(**filters)
+        return horses, total or 0
 
     async def get_available_sires(
         self,
@@ -649,7 +514,8 @@ class HorseRepository(AbstractRepository[Horse]):
             filters["name"] = search
         if target_horse.bdate is not None:
             filters["bdate_lte_or_none"] = target_horse.bdate
-        return await self.get_horse_list_full_info(**filters)
+        horses, total, _ = await self.get_horse_list_full_info(**filters)
+        return horses, total or 0
 
     async def get_available_children(
         self,
@@ -680,7 +546,8 @@ class HorseRepository(AbstractRepository[Horse]):
                 HorseSexEnum.MALE,
                 HorseSexEnum.GELD,
             ]
-        return await self.get_horse_list_full_info(**filters)
+        horses, total, _ = await self.get_horse_list_full_info(**filters)
+        return horses, total or 0
 
 
 class HorseChildrenRepository(AbstractRepository[HorseChildren]):
@@ -2,12 +2,17 @@ from typing import Literal
 
 from sqlalchemy import Table, func, or_, select
 
+from core.entities.base import CountMode
 from core.entities.horse_service import HorseServiceEntity
 from models.horse_service import horse_service
 
 from .abstract_repository import AbstractRepository
+from .cached import cached_repository
+from .counting import count_rows
+from .search import contains
 
 
+@cached_repository()
 class HorseServiceRepository(AbstractRepository[HorseServiceEntity]):
     table: Table = horse_service
     entity = HorseServiceEntity
@@ -36,6 +41,7 @@ class HorseServiceRepository(AbstractRepository[HorseServiceEntity]):
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[HorseServiceEntity], int]:
         """Получить отфильтрованный список с подсчётом общего количества."""
         stmt = select(self.table)
@@ -43,13 +49,13 @@ class HorseServiceRepository(AbstractRepository[HorseServiceEntity]):
 
         conditions = []
         if name:
-            conditions.append(self.table.c.name.ilike(f"%{name}%"))
+            conditions.append(contains(self.table.c.name, name))
         if slug:
-            conditions.append(self.table.c.slug.ilike(f"%{slug}%"))
+            conditions.append(contains(self.table.c.slug, slug))
         if description:
-            conditions.append(self.table.c.description.ilike(f"%{description}%"))
+            conditions.append(contains(self.table.c.description, description))
         if page_data:
-            conditions.append(self.table.c.page_data.ilike(f"%{page_data}%"))
+            conditions.append(contains(self.table.c.page_data, page_data))
 
         if conditions:
             where_clause = or_(*conditions)
@@ -77,7 +83,11 @@ class HorseServiceRepository(AbstractRepository[HorseServiceEntity]):
             self.entity.model_validate(dict(row)) for row in rows.mappings().all()
         ]
 
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar() or 0
+        total = await count_rows(
+            self.session,
+            count_stmt,
+            mode=count_mode,
+            table=None if conditions else self.table,
+        )
 
         return entities, total
@@ -0,0 +1,154 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+from sqlalchemy import Select, and_, false, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from core.exceptions.base import ClientError
+
+_KEY_PREFIX = "_keyset_"
+
+
+class KeysetColumn:
+    """Ключ сортировки для keyset-пагинации."""
+
+    def __init__(
+        self,
+        expression: ColumnElement,
+        *,
+        descending: bool = False,
+        nulls_first: bool | None = None,
+    ) -> None:
+        self.expression = expression
+        self.descending = descending
+        # По умолчанию как в PostgreSQL: NULL последними при ASC и первыми при DESC.
+        self.nulls_first = descending if nulls_first is None else nulls_first
+
+    def order_by(self) -> ColumnElement:
+        clause = self.expression.desc() if self.descending else self.expression.asc()
+        return clause.nulls_first() if self.nulls_first else clause.nulls_last()
+
+    def equals(self, value: Any) -> ColumnElement[bool]:
+        return self.expression.is_not_distinct_from(value)
+
+    def after(self, value: Any) -> ColumnElement[bool]:
+        """Условие «строка идёт после значения value» с учётом порядка NULL."""
+        if value is None:
+            return self.expression.is_not(None) if self.nulls_first else false()
+        if self.descending:
+            comparison = self.expression < value
+        else:
+            comparison = self.expression > value
+        if self.nulls_first:
+            return comparison
+        return or_(comparison, self.expression.is_(None))
+
+    def decode(self, value: Any) -> Any:
+        if value is None:
+            return None
+        python_type = self.expression.type.python_type
+        if issubclass(python_type, datetime):
+            return datetime.fromisoformat(value)
+        if issubclass(python_type, date):
+            return date.fromisoformat(value)
+        if issubclass(python_type, UUID):
+            return UUID(value)
+        return value
+
+
+class Keyset:
+    """Keyset-пагинация: курсор кодирует значения ключей сортировки последней строки.
+
+    Последним ключом всегда идёт уникальный tiebreaker (обычно id), поэтому порядок
+    строк однозначен и страницы не пересекаются. Курсор привязан к сортировке
+    (signature) и не может быть применён к выдаче с другим порядком.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[KeysetColumn],
+        *,
+        tiebreaker: ColumnElement,
+        signature: str,
+    ) -> None:
+        self.columns = [*columns, KeysetColumn(tiebreaker)]
+        self.signature = signature
+
+    def order_by(self) -> list[ColumnElement]:
+        return [column.order_by() for column in self.columns]
+
+    def where_after(self, values: Sequence[Any]) -> ColumnElement[bool]:
+        conditions = []
+        for index, column in enumerate(self.columns):
+            prefix = [
+                previous.equals(value)
+                for previous, value in zip(self.columns[:index], values)
+            ]
+            conditions.append(and_(*prefix, column.after(values[index])))
+        return or_(*conditions)
+
+    def encode(self, row: Any) -> str:
+        values = [row[f"{_KEY_PREFIX}{i}"] for i in range(len(self.columns))]
+        payload = json.dumps(
+            {"s": self.signature, "k": values},
+            default=_json_default,
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode()
+
+    def decode(self, cursor: str) -> list[Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            if payload["s"] != self.signature or len(payload["k"]) != len(self.columns):
+                raise ValueError(cursor)
+            return [
+                column.decode(value)
+                for column, value in zip(self.columns, payload["k"])
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError) as ex:
+            raise ClientError("Некорректный курсор пагинации") from ex
+
+    def apply(
+        self,
+        stmt: Select,
+        *,
+        cursor: str | None = None,
+        limit: int | None = None,
+        offset: int | None = None,
+    ) -> Select:
+        """Добавить порядок, условие курсора и лимит (на одну строку больше страницы)."""
+        stmt = stmt.add_columns(
+            *[
+                column.expression.label(f"{_KEY_PREFIX}{i}")
+                for i, column in enumerate(self.columns)
+            ]
+        ).order_by(*self.order_by())
+        if cursor:
+            stmt = stmt.where(self.where_after(self.decode(cursor)))
+        elif offset:
+            stmt = stmt.offset(offset)
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        return stmt
+
+    def page[R](
+        self, rows: Sequence[R], *, limit: int | None
+    ) -> tuple[Sequence[R], str | None]:
+        """Отрезать лишнюю строку и вернуть курсор следующей страницы, если она есть."""
+        if limit is None or len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, self.encode(rows[-1])
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Unsupported cursor value: {value!r}")
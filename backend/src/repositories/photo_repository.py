@@ -1,15 +1,20 @@
-from typing import Literal
+from typing import Iterable, Literal
 from uuid import UUID
 
 from sqlalchemy import Table, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.entities.base import CountMode
 from core.entities.photos import Photo
 from models.horse import horse_photos
 from models.photos import photos
 from models.prices import price_photos
+from utils.table_events import SessionCallback, after_commit, after_rollback
 
 from .abstract_repository import AbstractRepository
+from .counting import count_rows
+from .keyset import Keyset, KeysetColumn
+from .search import contains, starts_with
 
 
 class PhotoRepository(AbstractRepository[Photo]):
@@ -24,6 +29,16 @@ class PhotoRepository(AbstractRepository[Photo]):
             return None
         return self.entity.model_validate(dict(mapping))
 
+    async def find_names_with_prefixes(self, prefixes: Iterable[str]) -> set[str]:
+        """Все названия, начинающиеся с одного из prefixes, одним запросом."""
+        conditions = [
+            starts_with(self.table.c.name, prefix) for prefix in set(prefixes)
+        ]
+        if not conditions:
+            return set()
+        stmt = select(self.table.c.name).where(or_(*conditions))
+        return set((await self.session.execute(stmt)).scalars().all())
+
     async def get_filtered(
         self,
         *,
@@ -46,8 +61,10 @@ class PhotoRepository(AbstractRepository[Photo]):
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
-    ) -> tuple[list[Photo], int]:
-        base_table = self.table
+        cursor: str | None = None,
+        with_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> tuple[list[Photo], int | None, str | None]:
         conditions = []
 
         if price_ids or horse_ids:
@@ -74,9 +91,9 @@ class PhotoRepository(AbstractRepository[Photo]):
                 conditions.append(sql_or(*photo_ids_conditions))
 
         if name:
-            conditions.append(self.table.c.name.ilike(f"%{name}%"))
+            conditions.append(contains(self.table.c.name, name))
         if description:
-            conditions.append(self.table.c.description.ilike(f"%{description}%"))
+            conditions.append(contains(self.table.c.description, description))
 
         stmt = select(self.table).distinct()
         count_stmt = select(func.count(func.distinct(self.table.c.id)))
@@ -86,38 +103,64 @@ class PhotoRepository(AbstractRepository[Photo]):
             stmt = stmt.where(where_clause)
             count_stmt = count_stmt.where(where_clause)
 
-        order_by_clauses = []
+        keyset_columns: list[KeysetColumn] = []
 
         if sort:
             for field in sort:
                 if field.startswith("-"):
-                    order_by_clauses.append(self.table.c[field[1:]].desc())
+                    keyset_columns.append(
+                        KeysetColumn(self.table.c[field[1:]], descending=True)
+                    )
                 else:
-                    order_by_clauses.append(self.table.c[field].asc())
+                    keyset_columns.append(KeysetColumn(self.table.c[field]))
 
         user_sorts_by_created_at = sort and any(
             field in ("created_at", "-created_at") for field in sort
         )
         if not user_sorts_by_created_at:
-            order_by_clauses.append(self.table.c.created_at.desc())
-
-        if order_by_clauses:
-            stmt = stmt.order_by(*order_by_clauses)
+            keyset_columns.append(
+                KeysetColumn(self.table.c.created_at, descending=True)
+            )
 
-        if limit is not None:
-            stmt = stmt.limit(limit)
-        if offset is not None:
-            stmt = stmt.offset(offset)
+        keyset = Keyset(
+            keyset_columns, tiebreaker=self.table.c.id, signature=",".join(sort or [])
+        )
+        stmt = keyset.apply(stmt, cursor=cursor, limit=limit, offset=offset)
+
+        result = await self.session.execute(stmt)
+        rows, next_cursor = keyset.page(result.mappings().all(), limit=limit)
+        entities = [self.entity.model_validate(dict(row)) for row in rows]
+
+        total: int | None = None
+        if with_total:
+            total = await count_rows(
+                self.session,
+                count_stmt,
+                mode=count_mode,
+                table=None if conditions else self.table,
+            )
+
+        return entities, total, next_cursor
+
+    async def lock_path(self, path: str) -> None:
+        """Блокировка файла хранилища до конца транзакции.
+
+        Размещение файла с новой ссылкой на него и удаление файла после
+        последней ссылки выполняются под этой блокировкой и не пересекаются.
+        """
+        await self.session.execute(
+            select(func.pg_advisory_xact_lock(func.hashtextextended(path, 0)))
+        )
 
-        rows = await self.session.execute(stmt)
-        entities = [
-            self.entity.model_validate(dict(row)) for row in rows.mappings().all()
-        ]
+    async def count_by_path(self, path: str) -> int:
+        stmt = select(func.count()).where(self.table.c.path == path)
+        return (await self.session.execute(stmt)).scalar_one()
 
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar() or 0
+    def after_commit(self, callback: SessionCallback) -> None:
+        after_commit(self.session, callback)
 
-        return entities, total
+    def after_rollback(self, callback: SessionCallback) -> None:
+        after_rollback(self.session, callback)
 
     async def batch_delete(self, ids: list[UUID]) -> None:
         if not ids:
@@ -125,4 +168,3 @@ class PhotoRepository(AbstractRepository[Photo]):
 
         stmt = self.table.delete().where(self.table.c.id.in_(ids))
         await self.session.execute(stmt)
-        await self.session.commit()
@@ -1,13 +1,27 @@
-from typing import Literal
+from typing import Any, Literal, Sequence
 from uuid import UUID
 
 from sqlalchemy import Table, and_, delete, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.entities.base import CountMode
 from core.entities.prices import Price, PriceGroup, PriceGroupsRelation, PricePhotos
+from core.schemas.photos import PhotoOutShortDto
+from core.schemas.prices import (
+    PriceGroupSimpleDto,
+    PriceOutDto,
+    PriceOutWithPageDataDto,
+    PriceOutWithTablesDto,
+)
+from models.photos import photos
 from models.prices import price_groups, price_groups_relations, price_photos, prices
+from utils.images import build_srcset
+from utils.storage import storage_backend
 
 from .abstract_repository import AbstractRepository
+from .counting import count_rows
+from .keyset import Keyset, KeysetColumn
+from .search import contains
 
 
 class PriceGroupRepository(AbstractRepository[PriceGroup]):
@@ -31,6 +45,7 @@ class PriceGroupRepository(AbstractRepository[PriceGroup]):
         sort: list[Literal["name", "-name"]] | None = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[PriceGroup], int]:
         """Получить отфильтрованный список с подсчётом общего количества."""
         stmt = select(self.table)
@@ -38,9 +53,9 @@ class PriceGroupRepository(AbstractRepository[PriceGroup]):
 
         conditions = []
         if name:
-            conditions.append(self.table.c.name.ilike(f"%{name}%"))
+            conditions.append(contains(self.table.c.name, name))
         if description:
-            conditions.append(self.table.c.description.ilike(f"%{description}%"))
+            conditions.append(contains(self.table.c.description, description))
 
         if conditions:
             where_clause = or_(*conditions)
@@ -68,8 +83,12 @@ class PriceGroupRepository(AbstractRepository[PriceGroup]):
             self.entity.model_validate(dict(row)) for row in rows.mappings().all()
         ]
 
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar() or 0
+        total = await count_rows(
+            self.session,
+            count_stmt,
+            mode=count_mode,
+            table=None if conditions else self.table,
+        )
 
         return entities, total
 
@@ -118,7 +137,10 @@ class PriceRepository(AbstractRepository[Price]):
         sort: list[Literal["name", "-name"]] | None = None,
         limit: int | None = None,
         offset: int | None = None,
-    ) -> tuple[list[Price], int]:
+        cursor: str | None = None,
+        with_total: bool = True,
+        count_mode: CountMode = CountMode.EXACT,
+    ) -> tuple[list[Price], int | None, str | None]:
         """Получить отфильтрованный список с подсчётом общего количества."""
         stmt = select(self.table)
         count_stmt = select(func.count()).select_from(self.table)
@@ -128,14 +150,14 @@ class PriceRepository(AbstractRepository[Price]):
         # Фильтр по name - вхождение или список вхождений
         if name:
             if isinstance(name, list):
-                name_conditions = [self.table.c.name.ilike(f"%{n}%") for n in name]
+                name_conditions = [contains(self.table.c.name, n) for n in name]
                 conditions.append(or_(*name_conditions))
             else:
-                conditions.append(self.table.c.name.ilike(f"%{name}%"))
+                conditions.append(contains(self.table.c.name, name))
 
         # Фильтр по description - вхождение
         if description:
-            conditions.append(self.table.c.description.ilike(f"%{description}%"))
+            conditions.append(contains(self.table.c.description, description))
 
         # Фильтр по groups - полное совпадение с наименованием группы
         if groups:
@@ -160,31 +182,134 @@ class PriceRepository(AbstractRepository[Price]):
             stmt = stmt.where(where_clause)
             count_stmt = count_stmt.where(where_clause)
 
-        # Сортировка
-        if sort:
-            order_by_clauses = []
-            for field in sort:
-                if field.startswith("-"):
-                    order_by_clauses.append(self.table.c[field[1:]].desc())
-                else:
-                    order_by_clauses.append(self.table.c[field].asc())
-            stmt = stmt.order_by(*order_by_clauses)
+        # Сортировка (id замыкает порядок, чтобы курсор был однозначным)
+        keyset_columns: list[KeysetColumn] = []
+        for field in sort or []:
+            if field.startswith("-"):
+                keyset_columns.append(
+                    KeysetColumn(self.table.c[field[1:]], descending=True)
+                )
+            else:
+                keyset_columns.append(KeysetColumn(self.table.c[field]))
+        keyset = Keyset(
+            keyset_columns, tiebreaker=self.table.c.id, signature=",".join(sort or [])
+        )
 
-        # Пагинация
-        if limit is not None:
-            stmt = stmt.limit(limit)
-        if offset is not None:
-            stmt = stmt.offset(offset)
+        # Пагинация: курсор или смещение
+        stmt = keyset.apply(stmt, cursor=cursor, limit=limit, offset=offset)
 
-        rows = await self.session.execute(stmt)
-        entities = [
-            self.entity.model_validate(dict(row)) for row in rows.mappings().all()
-        ]
+        result = await self.session.execute(stmt)
+        rows, next_cursor = keyset.page(result.mappings().all(), limit=limit)
+        entities = [self.entity.model_validate(dict(row)) for row in rows]
 
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar() or 0
+        total: int | None = None
+        if with_total:
+            total = await count_rows(
+                self.session,
+                count_stmt,
+                mode=count_mode,
+                table=None if conditions else self.table,
+            )
 
-        return entities, total
+        return entities, total, next_cursor
+
+    def _build_photo_url(self, path: str) -> str:
+        return storage_backend.url(path)
+
+    async def _get_groups_by_price(
+        self, price_ids: Sequence[UUID]
+    ) -> dict[UUID, list[PriceGroupSimpleDto]]:
+        """Группы всех цен одним запросом."""
+        stmt = (
+            select(
+                price_groups_relations.c.price_id,
+                price_groups.c.id,
+                price_groups.c.name,
+            )
+            .join(price_groups, price_groups.c.id == price_groups_relations.c.group_id)
+            .where(price_groups_relations.c.price_id.in_(price_ids))
+            .distinct()
+        )
+        rows = await self.session.execute(stmt)
+        groups_by_price: dict[UUID, list[PriceGroupSimpleDto]] = {}
+        for row in rows.mappings().all():
+            groups_by_price.setdefault(row["price_id"], []).append(
+                PriceGroupSimpleDto(id=row["id"], name=row["name"])
+            )
+        return groups_by_price
+
+    async def _get_photos_by_price(
+        self, price_ids: Sequence[UUID]
+    ) -> dict[UUID, list[PhotoOutShortDto]]:
+        """Фотографии всех цен одним запросом: сначала главная, затем по id."""
+        stmt = (
+            select(
+                price_photos.c.price_id,
+                price_photos.c.photo_id,
+                price_photos.c.is_main,
+                photos.c.path,
+            )
+            .join(photos, photos.c.id == price_photos.c.photo_id)
+            .where(price_photos.c.price_id.in_(price_ids))
+            .order_by(price_photos.c.is_main.desc(), price_photos.c.photo_id)
+        )
+        rows = await self.session.execute(stmt)
+        photos_by_price: dict[UUID, list[PhotoOutShortDto]] = {}
+        for row in rows.mappings().all():
+            photos_by_price.setdefault(row["price_id"], []).append(
+                PhotoOutShortDto(
+                    id=row["photo_id"],
+                    is_main=row["is_main"],
+                    url=self._build_photo_url(row["path"]),
+                    srcset=build_srcset(row["path"], self._build_photo_url),
+                )
+            )
+        return photos_by_price
+
+    async def get_with_relations(
+        self,
+        prices: Sequence[Price],
+        *,
+        include_page_data: bool = False,
+        include_tables: bool = False,
+    ) -> list[PriceOutDto | PriceOutWithPageDataDto | PriceOutWithTablesDto]:
+        """Собрать DTO цен с группами и фотографиями (два запроса на любой список)."""
+        if not prices:
+            return []
+        price_ids = [price.id for price in prices]
+        groups_by_price = await self._get_groups_by_price(price_ids)
+        photos_by_price = await self._get_photos_by_price(price_ids)
+
+        result: list[PriceOutDto | PriceOutWithPageDataDto | PriceOutWithTablesDto] = []
+        for price in prices:
+            base_data: dict[str, Any] = {
+                "id": price.id,
+                "name": price.name,
+                "slug": price.slug,
+                "description": price.description,
+                "photos": photos_by_price.get(price.id, []),
+                "groups": groups_by_price.get(price.id, []),
+                "created_at": price.created_at,
+                "updated_at": price.updated_at,
+            }
+            if include_tables:
+                result.append(
+                    PriceOutWithTablesDto(
+                        **base_data,
+                        page_data=price.page_data or "<div></div>",
+                        price_tables=price.price_tables or [],
+                    )
+                )
+            elif include_page_data:
+                result.append(
+                    PriceOutWithPageDataDto(
+                        **base_data,
+                        page_data=price.page_data or "<div></div>",
+                    )
+                )
+            else:
+                result.append(PriceOutDto(**base_data))
+        return result
 
     async def get_price_groups(self, price_id: UUID) -> list[PriceGroupsRelation]:
         """Получить связи цены с группами."""
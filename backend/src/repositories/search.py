@@ -0,0 +1,29 @@
+from sqlalchemy.sql.elements import ColumnElement
+
+_LIKE_ESCAPE = "\\"
+
+
+def escape_like(value: str) -> str:
+    """Экранировать спецсимволы LIKE, чтобы строка искалась буквально."""
+    return (
+        value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", f"{_LIKE_ESCAPE}%")
+        .replace("_", f"{_LIKE_ESCAPE}_")
+    )
+
+
+def contains(column: ColumnElement, value: str) -> ColumnElement[bool]:
+    """Поиск подстроки без учёта регистра.
+
+    Условие ILIKE '%value%' обслуживается GIN-индексом gin_trgm_ops на колонке
+    (для строк от трёх символов), поэтому не требует последовательного чтения таблицы.
+    """
+    return column.ilike(f"%{escape_like(value)}%", escape=_LIKE_ESCAPE)
+
+
+def starts_with(column: ColumnElement, value: str) -> ColumnElement[bool]:
+    """Поиск по префиксу с учётом регистра (LIKE 'value%').
+
+    Как и contains, обслуживается GIN-индексом gin_trgm_ops на колонке.
+    """
+    return column.like(f"{escape_like(value)}%", escape=_LIKE_ESCAPE)
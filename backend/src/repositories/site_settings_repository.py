@@ -1,17 +1,26 @@
 from typing import Literal
 
 from sqlalchemy import Table, func, or_, select
+from sqlalchemy.sql.elements import ColumnElement
 
+from core.entities.base import CountMode
 from core.entities.site_settings import SiteSetting
 from models.site_settings import site_settings
 
 from .abstract_repository import AbstractRepository
+from .counting import count_rows
+from .search import contains
 
 
 class SiteSettingsRepository(AbstractRepository[SiteSetting]):
     table: Table = site_settings
     entity = SiteSetting
 
+    async def get_all_ordered_by_key(self) -> list[SiteSetting]:
+        """Все настройки, упорядоченные по ключу."""
+        rows = await self.session.execute(select(self.table).order_by(self.table.c.key))
+        return [self.entity.model_validate(dict(row)) for row in rows.mappings().all()]
+
     async def get_filtered(
         self,
         *,
@@ -39,20 +48,21 @@ class SiteSettingsRepository(AbstractRepository[SiteSetting]):
         ) = None,
         limit: int | None = None,
         offset: int | None = None,
+        count_mode: CountMode = CountMode.EXACT,
     ) -> tuple[list[SiteSetting], int]:
         """Получить отфильтрованный список с подсчётом общего количества."""
         stmt = select(self.table)
         count_stmt = select(func.count()).select_from(self.table)
 
-        conditions = []
+        conditions: list[ColumnElement[bool]] = []
         if key:
             conditions.append(self.table.c.key.in_(key))
         if name:
-            conditions.append(self.table.c.name.ilike(f"%{name}%"))
+            conditions.append(contains(self.table.c.name, name))
         if value:
-            conditions.append(self.table.c.value.ilike(f"%{value}%"))
+            conditions.append(contains(self.table.c.value, value))
         if description:
-            conditions.append(self.table.c.description.ilike(f"%{description}%"))
+            conditions.append(contains(self.table.c.description, description))
         if type:
             conditions.append(self.table.c.type.in_(type))
 
@@ -82,8 +92,12 @@ class SiteSettingsRepository(AbstractRepository[SiteSetting]):
             self.entity.model_validate(dict(row)) for row in rows.mappings().all()
         ]
 
-        total_result = await self.session.execute(count_stmt)
-        total = total_result.scalar() or 0
+        total = await count_rows(
+            self.session,
+            count_stmt,
+            mode=count_mode,
+            table=None if conditions else self.table,
+        )
 
         return entities, total
 
@@ -4,6 +4,7 @@ from sqlalchemy import Table, select
 
 from core.entities.user import User, UserScope
 from models.users import user_scopes, user_scopes_relations, users
+from utils.table_events import SessionCallback, after_commit
 
 from .abstract_repository import AbstractRepository
 
@@ -32,3 +33,6 @@ class UserRepository(AbstractRepository[User]):
         )
         rows = await self.session.execute(stmt)
         return [UserScope.model_validate(dict(row)) for row in rows.mappings().all()]
+
+    def after_commit(self, callback: SessionCallback) -> None:
+        after_commit(self.session, callback)
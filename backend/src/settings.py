@@ -1,3 +1,6 @@
+from pathlib import Path
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,6 +14,10 @@ class Settings(BaseSettings):
 
     secret_key: str = Field(default="your-secret-key", alias="SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
+    # Без Redis (REPOSITORY_CACHE_ENABLED и REDIS_URL) при WORKERS>1 не используется.
+    current_user_cache_ttl_seconds: float = Field(
+        default=60, alias="CURRENT_USER_CACHE_TTL_SECONDS"
+    )
     access_token_expires_in_minutes: int = Field(
         default=15, alias="ACCESS_TOKEN_EXPIRES_IN_MINUTES"
     )
@@ -30,6 +37,107 @@ class Settings(BaseSettings):
     db_name: str = Field(default="nexoradev", alias="POSTGRES_DB")
     db_port: int = Field(default=5432, alias="POSTGRES_PORT")
 
+    # Пул соединений: по умолчанию размер считается из DB_MAX_CONNECTIONS и WORKERS.
+    db_null_pool: bool | None = Field(default=None, alias="DB_NULL_POOL")
+    db_max_connections: int = Field(default=20, alias="DB_MAX_CONNECTIONS")
+    db_pool_size: int | None = Field(default=None, alias="DB_POOL_SIZE")
+    db_max_overflow: int | None = Field(default=None, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30, alias="DB_POOL_TIMEOUT")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    db_pool_recycle: int = Field(default=1800, alias="DB_POOL_RECYCLE")
+    db_statement_cache_size: int = Field(default=100, alias="DB_STATEMENT_CACHE_SIZE")
+    db_prepared_statement_cache_size: int = Field(
+        default=100, alias="DB_PREPARED_STATEMENT_CACHE_SIZE"
+    )
+    # Реплики для чтения: URL через запятую в формате database_url.
+    database_replica_urls: str = Field(default="", alias="DATABASE_REPLICA_URLS")
+    replica_primary_window_seconds: int = Field(
+        default=10, alias="REPLICA_PRIMARY_WINDOW_SECONDS"
+    )
+    sync_db_pool_size: int = Field(default=1, alias="SYNC_DB_POOL_SIZE")
+    sync_db_max_overflow: int = Field(default=2, alias="SYNC_DB_MAX_OVERFLOW")
+
+    pedigree_index_enabled: bool = Field(default=True, alias="PEDIGREE_INDEX_ENABLED")
+    pedigree_index_ttl_seconds: float = Field(
+        default=300, alias="PEDIGREE_INDEX_TTL_SECONDS"
+    )
+
+    fast_json_responses: bool = Field(default=False, alias="FAST_JSON_RESPONSES")
+
+    count_cache_ttl_seconds: float = Field(default=30, alias="COUNT_CACHE_TTL_SECONDS")
+
+    site_settings_snapshot_ttl_seconds: float = Field(
+        default=60, alias="SITE_SETTINGS_SNAPSHOT_TTL_SECONDS"
+    )
+
+    repository_cache_enabled: bool = Field(
+        default=False, alias="REPOSITORY_CACHE_ENABLED"
+    )
+    redis_url: str | None = Field(default=None, alias="REDIS_URL")
+    repository_cache_ttl_seconds: float = Field(
+        default=60, alias="REPOSITORY_CACHE_TTL_SECONDS"
+    )
+    repository_cache_max_entries: int = Field(
+        default=2048, alias="REPOSITORY_CACHE_MAX_ENTRIES"
+    )
+
+    # Кэш анонимных ответов живёт в памяти воркера. Изменения из других воркеров
+    # он видит только по общим версиям таблиц в Redis (REPOSITORY_CACHE_ENABLED и
+    # REDIS_URL), поэтому без Redis включается лишь при WORKERS=1.
+    response_cache_enabled: bool = Field(default=False, alias="RESPONSE_CACHE_ENABLED")
+    response_cache_ttl_seconds: float = Field(
+        default=30, alias="RESPONSE_CACHE_TTL_SECONDS"
+    )
+    response_cache_max_entries: int = Field(
+        default=512, alias="RESPONSE_CACHE_MAX_ENTRIES"
+    )
+
+    upload_max_bytes: int = Field(default=256 * 1024 * 1024, alias="UPLOAD_MAX_BYTES")
+    upload_chunk_size: int = Field(default=1024 * 1024, alias="UPLOAD_CHUNK_SIZE")
+    photo_import_max_files: int = Field(default=200, alias="PHOTO_IMPORT_MAX_FILES")
+    photo_import_concurrency: int = Field(default=4, alias="PHOTO_IMPORT_CONCURRENCY")
+
+    storage_backend: Literal["local", "s3"] = Field(
+        default="local", alias="STORAGE_BACKEND"
+    )
+    media_root: str | None = Field(default=None, alias="MEDIA_ROOT")
+    # Временные файлы и незавершённые прямые загрузки; не должен лежать внутри
+    # MEDIA_ROOT, который раздаётся публично. По умолчанию — <MEDIA_ROOT>-staging.
+    media_staging_root: str | None = Field(default=None, alias="MEDIA_STAGING_ROOT")
+    staged_upload_ttl_seconds: float = Field(
+        default=24 * 3600, alias="STAGED_UPLOAD_TTL_SECONDS"
+    )
+    staged_upload_cleanup_interval_seconds: float = Field(
+        default=3600, alias="STAGED_UPLOAD_CLEANUP_INTERVAL_SECONDS"
+    )
+    s3_endpoint_url: str = Field(
+        default="https://s3.amazonaws.com", alias="S3_ENDPOINT_URL"
+    )
+    s3_region: str = Field(default="us-east-1", alias="S3_REGION")
+    s3_bucket: str = Field(default="media", alias="S3_BUCKET")
+    s3_access_key_id: str = Field(default="", alias="S3_ACCESS_KEY_ID")
+    s3_secret_access_key: str = Field(default="", alias="S3_SECRET_ACCESS_KEY")
+    s3_public_url: str | None = Field(default=None, alias="S3_PUBLIC_URL")
+    s3_max_connections: int = Field(default=20, alias="S3_MAX_CONNECTIONS")
+    s3_multipart_chunk_size: int = Field(
+        default=8 * 1024 * 1024, alias="S3_MULTIPART_CHUNK_SIZE"
+    )
+    presigned_url_ttl_seconds: int = Field(
+        default=3600, alias="PRESIGNED_URL_TTL_SECONDS"
+    )
+
+    photo_derivatives_enabled: bool = Field(
+        default=True, alias="PHOTO_DERIVATIVES_ENABLED"
+    )
+    photo_derivative_width_list: str = Field(
+        default="320,640,1280", alias="PHOTO_DERIVATIVE_WIDTHS"
+    )
+    photo_derivative_format_list: str = Field(
+        default="webp", alias="PHOTO_DERIVATIVE_FORMATS"
+    )
+    photo_derivative_quality: int = Field(default=80, alias="PHOTO_DERIVATIVE_QUALITY")
+    photo_derivative_workers: int = Field(default=2, alias="PHOTO_DERIVATIVE_WORKERS")
+
     model_config = SettingsConfigDict(populate_by_name=True)
 
     @property
@@ -39,6 +147,61 @@ class Settings(BaseSettings):
             f"@{self.db_host}:{self.db_port}/{self.db_name}"
         )
 
+    @property
+    def replica_database_urls(self) -> list[str]:
+        urls = (url.strip() for url in self.database_replica_urls.split(","))
+        return [url for url in urls if url]
+
+    @property
+    def media_dir(self) -> Path:
+        if self.media_root:
+            return Path(self.media_root)
+        return Path(__file__).parent / "media"
+
+    @property
+    def media_staging_dir(self) -> Path:
+        if self.media_staging_root:
+            return Path(self.media_staging_root)
+        return self.media_dir.with_name(f"{self.media_dir.name}-staging")
+
+    @property
+    def photo_derivative_widths(self) -> list[int]:
+        return sorted(
+            {
+                int(width)
+                for width in self.photo_derivative_width_list.split(",")
+                if width
+            }
+        )
+
+    @property
+    def photo_derivative_formats(self) -> list[str]:
+        return [
+            fmt.strip().lower()
+            for fmt in self.photo_derivative_format_list.split(",")
+            if fmt
+        ]
+
+    @property
+    def db_use_null_pool(self) -> bool:
+        return self.debug if self.db_null_pool is None else self.db_null_pool
+
+    @property
+    def db_connections_per_worker(self) -> int:
+        return max(1, self.db_max_connections // max(1, self.workers))
+
+    @property
+    def db_pool_size_per_worker(self) -> int:
+        if self.db_pool_size is not None:
+            return self.db_pool_size
+        return max(1, self.db_connections_per_worker // 2)
+
+    @property
+    def db_max_overflow_per_worker(self) -> int:
+        if self.db_max_overflow is not None:
+            return self.db_max_overflow
+        return max(0, self.db_connections_per_worker - self.db_pool_size_per_worker)
+
     @property
     def sync_database_url(self) -> str:
         return (
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, MetaData, func
+from sqlalchemy import Column, DateTime, Index, MetaData, func
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 metadata = MetaData()
@@ -27,3 +27,16 @@ def timestamp_columns() -> tuple[Column, Column]:
         ),
         Column("updated_at", DateTime(timezone=True), onupdate=func.now()),
     )
+
+
+def trigram_indexes(table_name: str, *columns: str) -> tuple[Index, ...]:
+    """GIN pg_trgm indexes for substring (ILIKE '%...%') search."""
+    return tuple(
+        Index(
+            f"ix_{table_name}_{column}_trgm",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+        for column in columns
+    )
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.protocols.cache import CacheBackendProtocol
+from settings import settings
+from utils.table_events import on_tables_committed
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCacheBackend:
+    """Кэш в памяти воркера: LRU с TTL и счётчиками версий таблиц.
+
+    Версии не разделяются между воркерами, поэтому при WORKERS>1 изменения из
+    другого воркера становятся видны не раньше истечения TTL записи.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, *, ttl_seconds: float) -> None:
+        self._entries[key] = (value, time.monotonic() + ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_versions(self, tables: Sequence[str]) -> list[int] | None:
+        return [self._versions.get(table, 0) for table in tables]
+
+    async def bump_versions(self, tables: Iterable[str]) -> None:
+        for table in tables:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+
+class RedisCacheBackend:
+    """Общий для всех воркеров кэш в Redis.
+
+    Записи не удаляются при инвалидации: увеличение версии таблицы меняет ключи,
+    а старые записи истекают по TTL. Ошибки Redis не роняют запрос — чтение
+    считается промахом, запись пропускается.
+    """
+
+    def __init__(self, client: Redis, *, prefix: str = "eqcache") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def _version_key(self, table: str) -> str:
+        return f"{self.prefix}:version:{table}"
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            value: bytes | None = await self.client.get(f"{self.prefix}:{key}")
+            return value
+        except RedisError:
+            logger.warning("Redis недоступен: чтение из кэша пропущено", exc_info=True)
+            return None
+
+    async def set(self, key: str, value: bytes, *, ttl_seconds: float) -> None:
+        try:
+            await self.client.set(
+                f"{self.prefix}:{key}", value, px=max(1, int(ttl_seconds * 1000))
+            )
+        except RedisError:
+            logger.warning("Redis недоступен: запись в кэш пропущена", exc_info=True)
+
+    async def get_versions(self, tables: Sequence[str]) -> list[int] | None:
+        try:
+            values = await self.client.mget(
+                [self._version_key(table) for table in tables]
+            )
+        except RedisError:
+            logger.warning("Redis недоступен: версии таблиц не получены", exc_info=True)
+            return None
+        return [int(value or 0) for value in values]
+
+    async def bump_versions(self, tables: Iterable[str]) -> None:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for table in tables:
+                    pipe.incr(self._version_key(table))
+                await pipe.execute()
+        except RedisError:
+            logger.warning(
+                "Redis недоступен: версии таблиц не увеличены", exc_info=True
+            )
+
+
+def create_cache_backend() -> CacheBackendProtocol | None:
+    """Redis, если задан REDIS_URL, иначе LRU в памяти воркера."""
+    if not settings.repository_cache_enabled:
+        return None
+    if settings.redis_url:
+        return RedisCacheBackend(
+            Redis.from_url(settings.redis_url, decode_responses=False)
+        )
+    return LRUCacheBackend(max_entries=settings.repository_cache_max_entries)
+
+
+cache_backend = create_cache_backend()
+
+
+def has_shared_versions() -> bool:
+    """Версии таблиц общие для всех воркеров (кэш в Redis)."""
+    return isinstance(cache_backend, RedisCacheBackend)
+
+
+async def shared_versions(tables: Sequence[str]) -> list[int] | None:
+    """Общие для всех воркеров версии таблиц из Redis (None, если их нет)."""
+    if not isinstance(cache_backend, RedisCacheBackend):
+        return None
+    return await cache_backend.get_versions(tables)
+
+
+_watched_tables: set[str] = set()
+_pending_bumps: set[asyncio.Task] = set()
+
+
+def _bump_after_commit(tables: frozenset[str]) -> None:
+    if cache_backend is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Синхронная сессия (скрипты, миграции): событийного цикла нет.
+        return
+    task = loop.create_task(cache_backend.bump_versions(tables))
+    _pending_bumps.add(task)
+    task.add_done_callback(_pending_bumps.discard)
+
+
+def watch_tables(tables: Iterable[str]) -> None:
+    """Увеличивать версии таблиц после коммита любой транзакции, изменившей их."""
+    unwatched = set(tables) - _watched_tables
+    if unwatched:
+        on_tables_committed(unwatched, _bump_after_commit)
+        _watched_tables.update(unwatched)
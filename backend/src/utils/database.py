@@ -1,64 +1,220 @@
-import logging
-from contextlib import asynccontextmanager
-from typing import AsyncIterator
-
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import sessionmaker as sync_sessionmaker
-from sqlalchemy.pool import NullPool
-
-from settings import settings
-
-async_engine = create_async_engine(
-    settings.database_url,
-    future=True,
-    poolclass=NullPool if settings.debug else None,
-)
-
-AsyncSessionLocal = async_sessionmaker(
-    async_engine,
-    expire_on_commit=False,
-    autoflush=False,
-)
-
-
-sync_engine = create_engine(
-    settings.sync_database_url,
-    pool_size=5,
-    max_overflow=10,
-)
-
-SyncSession = sync_sessionmaker(
-    sync_engine,
-    autocommit=False,
-    autoflush=False,
-)
-
-
-def make_async_engine(url: str, *, use_null_pool: bool = True):
-    return create_async_engine(
-        url,
-        future=True,
-        poolclass=NullPool if use_null_pool else None,
-    )
-
-
-def make_async_session_factory(engine) -> async_sessionmaker[AsyncSession]:
-    return async_sessionmaker(
-        engine,
-        expire_on_commit=False,
-        autoflush=False,
-    )
-
-
-@asynccontextmanager
-async def get_db() -> AsyncIterator[AsyncSession]:
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import sessionmaker as sync_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, NullPool
+
+from settings import settings
+from utils.table_events import mark_replica_session, run_session_callbacks
+
+
+class PoolMetrics:
+    """Время ожидания соединения из пула и число таймаутов ожидания."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, *, timed_out: bool = False) -> None:
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, замеряющий ожидание свободного соединения.
+
+    Метрики у каждого пула свои, чтобы ожидание на репликах не смешивалось
+    с ожиданием на основной БД.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return entry
+
+
+def _async_engine_options(*, use_null_pool: bool) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "future": True,
+        "connect_args": {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        },
+    }
+    if use_null_pool:
+        options["poolclass"] = NullPool
+        return options
+    return options | {
+        "poolclass": MeteredAsyncQueuePool,
+        "pool_size": settings.db_pool_size_per_worker,
+        "max_overflow": settings.db_max_overflow_per_worker,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+async_engine = create_async_engine(
+    settings.database_url,
+    **_async_engine_options(use_null_pool=settings.db_use_null_pool),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+
+class ReplicaRouter:
+    """Выбор реплики для чтения по кругу; без реплик чтение идёт в основную БД."""
+
+    def __init__(self, engines: Sequence[AsyncEngine]) -> None:
+        self.engines = list(engines)
+        self._cycle = itertools.cycle(self.engines)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def next_engine(self) -> AsyncEngine | None:
+        return next(self._cycle) if self.engines else None
+
+
+replica_router = ReplicaRouter(
+    [
+        create_async_engine(
+            url, **_async_engine_options(use_null_pool=settings.db_use_null_pool)
+        )
+        for url in settings.replica_database_urls
+    ]
+)
+
+
+_autocommit_engines: dict[AsyncEngine, AsyncEngine] = {}
+
+
+def _autocommit_engine(engine: AsyncEngine) -> AsyncEngine:
+    # Движок с другими execution_options использует тот же пул соединений.
+    if engine not in _autocommit_engines:
+        _autocommit_engines[engine] = engine.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+    return _autocommit_engines[engine]
+
+
+def open_session(*, replica: bool = False, autocommit: bool = False) -> AsyncSession:
+    """Новая сессия на реплике (если replica и реплики заданы) или на основной БД.
+
+    autocommit — запросы выполняются вне транзакции: без BEGIN и COMMIT, но и без
+    общего снимка данных для всех запросов сессии. Только для чтения.
+    """
+    replica_engine = replica_router.next_engine() if replica else None
+    engine = replica_engine or async_engine
+    if autocommit:
+        engine = _autocommit_engine(engine)
+    session = AsyncSessionLocal(bind=engine)
+    if replica_engine is not None:
+        mark_replica_session(session)
+    return session
+
+
+# Синхронный движок нужен только скриптам, поэтому пул у него минимальный.
+sync_engine = create_engine(
+    settings.sync_database_url,
+    pool_size=settings.sync_db_pool_size,
+    max_overflow=settings.sync_db_max_overflow,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    pool_recycle=settings.db_pool_recycle,
+)
+
+SyncSession = sync_sessionmaker(
+    sync_engine,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+def make_async_engine(url: str, *, use_null_pool: bool = True):
+    return create_async_engine(
+        url, **_async_engine_options(use_null_pool=use_null_pool)
+    )
+
+
+def get_engine_pool_stats(engine: AsyncEngine) -> dict[str, int | float]:
+    """Заполненность пула движка и статистика ожидания его соединений."""
+    pool = engine.pool
+    if not isinstance(pool, MeteredAsyncQueuePool):
+        # NullPool: соединения не переиспользуются, считать нечего.
+        return {}
+    metrics = pool.metrics
+    return {
+        "checkouts": metrics.checkouts,
+        "timeouts": metrics.timeouts,
+        "wait_seconds_total": metrics.wait_seconds_total,
+        "wait_seconds_avg": (
+            metrics.wait_seconds_total / metrics.checkouts if metrics.checkouts else 0.0
+        ),
+        "wait_seconds_max": metrics.wait_seconds_max,
+        "pool_size": pool.size(),
+        "max_overflow": settings.db_max_overflow_per_worker,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+
+def get_pool_stats() -> dict[str, dict[str, int | float]]:
+    """Статистика пулов основной БД и каждой реплики по отдельности."""
+    stats = {"primary": get_engine_pool_stats(async_engine)}
+    for index, engine in enumerate(replica_router.engines, start=1):
+        stats[f"replica_{index}"] = get_engine_pool_stats(engine)
+    return stats
+
+
+def make_async_session_factory(engine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        engine,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
+@asynccontextmanager
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+            await run_session_callbacks(session)
+        except Exception:
+            await session.rollback()
+            await run_session_callbacks(session)
+            raise
+        finally:
+            await session.close()
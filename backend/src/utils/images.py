@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from core.protocols.storage import StorageBackendProtocol
+from settings import settings
+from utils.storage import storage_backend
+
+Image: Any
+features: Any
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow не установлен: производные копии не создаются.
+    Image = None
+    features = None
+
+logger = logging.getLogger(__name__)
+
+# Растровые форматы, которые Pillow открывает без дополнительных плагинов.
+_DERIVABLE_EXTENSIONS = frozenset(
+    {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tiff", ".tif"}
+)
+_MIME_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+# <оригинал>.<ширина>w.<формат>, например 1c/0f/1c0f….jpg.640w.webp
+_DERIVATIVE_NAME = re.compile(r"^(?P<source>.+)\.(?P<width>\d+)w\.(?P<format>\w+)$")
+
+
+def _supported_formats() -> tuple[str, ...]:
+    if Image is None:
+        return ()
+    return tuple(
+        fmt
+        for fmt in settings.photo_derivative_formats
+        if fmt in _MIME_TYPES and features.check(fmt)
+    )
+
+
+DERIVATIVE_FORMATS = _supported_formats()
+
+
+def has_derivatives(filename: str) -> bool:
+    return (
+        bool(DERIVATIVE_FORMATS)
+        and Path(filename).suffix.lower() in _DERIVABLE_EXTENSIONS
+        and _DERIVATIVE_NAME.match(filename) is None
+    )
+
+
+def derivative_name(filename: str, *, width: int, fmt: str) -> str:
+    return f"{filename}.{width}w.{fmt}"
+
+
+def derivative_names(filename: str) -> list[str]:
+    """Имена всех производных копий файла по текущим пресетам."""
+    if not settings.photo_derivatives_enabled or not has_derivatives(filename):
+        return []
+    return [
+        derivative_name(filename, width=width, fmt=fmt)
+        for fmt in DERIVATIVE_FORMATS
+        for width in settings.photo_derivative_widths
+    ]
+
+
+def build_srcset(filename: str, url_for: Callable[[str], str]) -> dict[str, str]:
+    """Значения srcset по MIME-типам: {"image/webp": "url 320w, url 640w"}."""
+    if not settings.photo_derivatives_enabled or not has_derivatives(filename):
+        return {}
+    return {
+        _MIME_TYPES[fmt]: ", ".join(
+            f"{url_for(derivative_name(filename, width=width, fmt=fmt))} {width}w"
+            for width in settings.photo_derivative_widths
+        )
+        for fmt in DERIVATIVE_FORMATS
+    }
+
+
+def _render(source: str, targets: list[tuple[str, int, str]], quality: int) -> None:
+    """Создать производные копии одного файла (выполняется в дочернем процессе)."""
+    with Image.open(source) as image:
+        image.seek(0)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for target, width, fmt in targets:
+            copy = image.copy()
+            if copy.width > width:
+                height = max(1, round(copy.height * width / copy.width))
+                copy = copy.resize((width, height), Image.Resampling.LANCZOS)
+            copy.save(target, format=fmt.upper(), quality=quality)
+
+
+class DerivativeRenderer:
+    """Создаёт производные копии фотографий в пуле процессов.
+
+    Ресайз и кодирование WebP/AVIF занимают процессор на сотни миллисекунд,
+    поэтому выполняются вне событийного цикла и вне пула потоков. Копии
+    пишутся во временный каталог и переносятся в хранилище через storage;
+    если оригинал не лежит на диске (S3), он сначала скачивается. Повторные
+    запросы одного и того же файла ждут уже запущенную задачу.
+    """
+
+    def __init__(self, *, storage: StorageBackendProtocol, workers: int) -> None:
+        self.storage = storage
+        self.workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._background: set[asyncio.Task] = set()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def render(self, filename: str) -> None:
+        """Создать недостающие производные копии файла из хранилища."""
+        missing = [
+            name
+            for name in derivative_names(filename)
+            if not await self.storage.exists(name)
+        ]
+        if not missing:
+            return
+
+        future = self._in_flight.get(filename)
+        if future is None:
+            future = asyncio.ensure_future(self._render_missing(filename, missing))
+            self._in_flight[filename] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(filename, None))
+        await asyncio.shield(future)
+
+    async def _render_missing(self, filename: str, names: list[str]) -> None:
+        loop = asyncio.get_running_loop()
+        temp_dir = Path(
+            await loop.run_in_executor(
+                None,
+                lambda: tempfile.mkdtemp(
+                    prefix=".render-", dir=self.storage.staging_dir
+                ),
+            )
+        )
+        try:
+            source = self.storage.local_path(filename)
+            if source is None:
+                source = temp_dir / "source"
+                await self.storage.download(filename, source)
+            elif not await loop.run_in_executor(None, source.exists):
+                return
+
+            targets: dict[str, tuple[str, int, str]] = {}
+            for index, name in enumerate(names):
+                match = _DERIVATIVE_NAME.match(name)
+                assert match is not None, name
+                target_path = temp_dir / f"{index}.{match['format']}"
+                targets[name] = (
+                    str(target_path),
+                    int(match["width"]),
+                    match["format"],
+                )
+            await loop.run_in_executor(
+                self._get_executor(),
+                _render,
+                str(source),
+                list(targets.values()),
+                settings.photo_derivative_quality,
+            )
+            for name, (target, _, _) in targets.items():
+                await self.storage.save(name, Path(target))
+        finally:
+            await loop.run_in_executor(None, shutil.rmtree, temp_dir, True)
+
+    def schedule(self, filename: str) -> None:
+        """Запустить создание копий в фоне, не задерживая ответ."""
+        task = asyncio.get_running_loop().create_task(self.render_safely(filename))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def render_safely(self, filename: str) -> None:
+        """render, которая только логирует ошибки (например, битый файл)."""
+        try:
+            await self.render(filename)
+        except Exception:
+            logger.warning(
+                "Не удалось создать копии изображения %s", filename, exc_info=True
+            )
+
+    async def delete(self, filename: str) -> None:
+        """Удалить производные копии файла, в том числе по прежним пресетам."""
+        for key in await self.storage.list_keys(f"{filename}."):
+            match = _DERIVATIVE_NAME.match(key)
+            if match is not None and match["source"] == filename:
+                await self.storage.delete(key)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+derivative_renderer = DerivativeRenderer(
+    storage=storage_backend, workers=settings.photo_derivative_workers
+)
+
+
+class DerivativeStaticFiles(StaticFiles):
+    """StaticFiles, создающие производную копию при первом обращении к ней.
+
+    Создаются только копии по настроенным пресетам, произвольные размеры
+    из URL не принимаются.
+    """
+
+    def __init__(self, *, renderer: DerivativeRenderer, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.renderer = renderer
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as error:
+            match = _DERIVATIVE_NAME.match(path)
+            if (
+                error.status_code != 404
+                or match is None
+                or path not in derivative_names(match["source"])
+            ):
+                raise
+        await self.renderer.render_safely(match["source"])
+        return await super().get_response(path, scope)
@@ -0,0 +1,273 @@
+import time
+from collections import OrderedDict
+from typing import Iterable, Sequence
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from settings import settings
+from utils.cache import has_shared_versions, shared_versions
+from utils.responses import etag_matches
+from utils.table_events import committed_recently, on_tables_committed
+
+RESPONSE_CACHE_TAGS_KEY = "response_cache_tags"
+RESPONSE_CACHE_VERSIONS_KEY = "response_cache_versions"
+REPLICA_READ_KEY = "replica_read"
+
+
+def set_response_cache_tags(
+    request: Request,
+    tables: Sequence[str],
+    *,
+    versions: Sequence[int] | None = None,
+) -> None:
+    """Отметить ответ как кэшируемый и указать таблицы, от которых он зависит.
+
+    versions — общие версии tables из Redis, полученные до чтения данных;
+    без них при общем кэше версий ответ не сохраняется.
+    """
+    setattr(request.state, RESPONSE_CACHE_TAGS_KEY, frozenset(tables))
+    if versions is not None:
+        setattr(request.state, RESPONSE_CACHE_VERSIONS_KEY, dict(zip(tables, versions)))
+
+
+def mark_replica_read(request: Request) -> None:
+    """Отметить ответ, собранный по данным реплики."""
+    setattr(request.state, REPLICA_READ_KEY, True)
+
+
+def _response_tags(scope: Scope) -> frozenset[str] | None:
+    return scope.get("state", {}).get(RESPONSE_CACHE_TAGS_KEY)
+
+
+def _response_versions(scope: Scope) -> dict[str, int] | None:
+    return scope.get("state", {}).get(RESPONSE_CACHE_VERSIONS_KEY)
+
+
+class CachedResponse:
+    def __init__(
+        self,
+        *,
+        headers: list[tuple[bytes, bytes]],
+        body: bytes,
+        tags: frozenset[str],
+        versions: dict[str, int] | None,
+        expires_at: float,
+    ) -> None:
+        self.headers = headers
+        self.body = body
+        self.tags = tags
+        self.versions = versions
+        self.expires_at = expires_at
+        self.etag = Headers(raw=headers).get("etag")
+
+
+class ResponseCache:
+    """Кэш готовых ответов GET для анонимных запросов.
+
+    Каждая запись помечена таблицами, из которых собран ответ, и удаляется
+    после коммита транзакции, изменившей любую из них. Ответ, вычисленный
+    параллельно с такой транзакцией, не сохраняется: generation увеличивается
+    при каждой инвалидации.
+
+    Сброс по коммиту виден только своему воркеру. Изменения из других воркеров
+    отслеживаются по общим версиям таблиц в Redis (utils.cache): запись хранит
+    версии на момент чтения данных и отдаётся, только пока они не изменились.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.purged = 0
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._keys_by_tag: dict[str, set[str]] = {}
+        self._watched_tables: set[str] = set()
+
+    async def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            entry = None
+        if entry is not None and entry.versions is not None:
+            tables = list(entry.versions)
+            if await shared_versions(tables) != list(entry.versions.values()):
+                # Таблицу изменил другой воркер (или Redis недоступен).
+                self._remove(key)
+                entry = None
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(
+        self,
+        key: str,
+        *,
+        headers: list[tuple[bytes, bytes]],
+        body: bytes,
+        tags: frozenset[str],
+        versions: dict[str, int] | None = None,
+        generation: int,
+    ) -> None:
+        if generation != self.generation:
+            return
+        unwatched = tags - self._watched_tables
+        if unwatched:
+            on_tables_committed(unwatched, self.purge)
+            self._watched_tables.update(unwatched)
+
+        self._remove(key)
+        self._entries[key] = CachedResponse(
+            headers=headers,
+            body=body,
+            tags=tags,
+            versions=versions,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        self.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def purge(self, tables: Iterable[str]) -> None:
+        self.generation += 1
+        for table in tables:
+            for key in self._keys_by_tag.pop(table, set()):
+                if self._remove(key):
+                    self.purged += 1
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "purged": self.purged,
+        }
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+        return True
+
+
+response_cache = ResponseCache(
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    max_entries=settings.response_cache_max_entries,
+)
+
+
+class ResponseCacheMiddleware:
+    """ASGI-middleware, отдающая анонимным GET-запросам ответы из response_cache.
+
+    Кэшируются только ответы 200 эндпоинтов, вызвавших set_response_cache_tags;
+    запросы с cookie access_token всегда проходят в приложение.
+    """
+
+    def __init__(self, app: ASGIApp, *, cache: ResponseCache = response_cache) -> None:
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        if "access_token" in request.cookies:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{scope['path']}?{scope['query_string'].decode('latin-1')}"
+        entry = await self.cache.get(key)
+        if entry is not None:
+            await self._send_cached(request, entry, send)
+            return
+
+        generation = self.cache.generation
+        start: Message | None = None
+        body = bytearray()
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal start
+            # Теги выставляет зависимость эндпоинта до начала ответа.
+            if message["type"] == "http.response.start" and _response_tags(scope):
+                start = message
+                message["headers"] = [*message["headers"], (b"x-cache", b"MISS")]
+            elif message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
+
+        if start is None:
+            return
+        self.cache.misses += 1
+        if start["status"] != 200:
+            return
+        headers = [
+            (name, value) for name, value in start["headers"] if name != b"x-cache"
+        ]
+        tags = _response_tags(scope)
+        if tags is None or any(name == b"set-cookie" for name, _ in headers):
+            return
+        versions = _response_versions(scope)
+        if versions is None and has_shared_versions():
+            # Версии не получены (Redis недоступен): запись не проверить.
+            return
+        # Реплика могла ещё не получить недавний коммит этих таблиц.
+        if scope.get("state", {}).get(REPLICA_READ_KEY) and committed_recently(tags):
+            return
+        self.cache.set(
+            key,
+            headers=headers,
+            body=bytes(body),
+            tags=tags,
+            versions=versions,
+            generation=generation,
+        )
+
+    async def _send_cached(
+        self, request: Request, entry: CachedResponse, send: Send
+    ) -> None:
+        if_none_match = request.headers.get("if-none-match")
+        if (
+            entry.etag is not None
+            and if_none_match is not None
+            and etag_matches(if_none_match, entry.etag)
+        ):
+            headers = [
+                (name, value)
+                for name, value in entry.headers
+                if name not in (b"content-length", b"content-type")
+            ]
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [*headers, (b"x-cache", b"HIT")],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [*entry.headers, (b"x-cache", b"HIT")],
+            }
+        )
+        await send({"type": "http.response.body", "body": entry.body})
@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Слабое сравнение ETag с заголовком If-None-Match (префикс W/ не учитывается)."""
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+class PreSerializedJSONResponse(JSONResponse):
+    """JSON-ответ, тело которого уже сериализовано в байты.
+
+    Возврат Response из эндпоинта отключает повторную валидацию по response_model,
+    поэтому данные один раз сериализуются через заранее созданный TypeAdapter.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
+
+    @classmethod
+    def from_adapter(
+        cls, adapter: TypeAdapter[Any], content: Any, **kwargs: Any
+    ) -> "PreSerializedJSONResponse":
+        return cls(adapter.dump_json(content, by_alias=True), **kwargs)
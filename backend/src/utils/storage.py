@@ -0,0 +1,647 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Literal
+from urllib.parse import quote, urlsplit
+from xml.etree import ElementTree
+
+import httpx
+
+from core.exceptions.base import ClientError
+from core.protocols.storage import StorageBackendProtocol
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Ключи файлов прямой загрузки, ещё не ставших фотографиями.
+UPLOADS_PREFIX = "uploads/"
+# Временные файлы приёма загрузок и рендера производных в staging_dir.
+_STAGING_TEMP_PREFIXES = (".upload-", ".render-")
+_UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+_S3_NAMESPACE = {"s3": "http://s3.amazonaws.com/doc/2006-03-01/"}
+# S3 принимает части multipart-загрузки не меньше 5 МБ (кроме последней).
+_MIN_MULTIPART_CHUNK_SIZE = 5 * 1024 * 1024
+
+
+def _backend_url(path: str) -> str:
+    protocol = "https" if not settings.debug else "http"
+    return f"{protocol}://{settings.cms_backend_domain}{path}"
+
+
+def _move_file(source: Path, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(source, destination)
+    except OSError:
+        # Временный каталог на другом разделе: копируем рядом и переименовываем,
+        # чтобы файл появился в хранилище целиком.
+        temp = destination.with_name(f".{destination.name}.part")
+        shutil.copyfile(source, temp)
+        os.replace(temp, destination)
+        source.unlink()
+
+
+def _file_digest(path: Path) -> str:
+    with path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def _read_head(path: Path, length: int) -> bytes:
+    with path.open("rb") as file:
+        return file.read(length)
+
+
+def _delete_files_before(paths: Iterable[Path], older_than: float) -> int:
+    deleted = 0
+    for path in paths:
+        try:
+            if path.stat().st_mtime < older_than:
+                path.unlink()
+                deleted += 1
+        except FileNotFoundError:
+            pass
+    return deleted
+
+
+def _delete_staging_temp_files(directory: Path, older_than: float) -> int:
+    # Временные файлы прерванных загрузок и рендеров, которые не успели удалить.
+    if not directory.is_dir():
+        return 0
+    return _delete_files_before(
+        (
+            path
+            for path in directory.iterdir()
+            if path.name.startswith(_STAGING_TEMP_PREFIXES) and path.is_file()
+        ),
+        older_than,
+    )
+
+
+class LocalStorageBackend:
+    """Файлы в каталоге на диске, раздаются по /media (StaticFiles или nginx).
+
+    Ссылки на загрузку (presigned_url с method="PUT") ведут на upload_url и
+    подписываются HMAC с ключом secret_key; проверяет их verify_upload.
+
+    Временные файлы и ключи UPLOADS_PREFIX (незавершённые прямые загрузки)
+    лежат в staging_dir вне раздаваемого каталога root; по умолчанию это
+    соседний с root каталог, чтобы перенос в root был переименованием.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        base_url: str,
+        staging_dir: Path | None = None,
+        upload_url: str | None = None,
+        secret_key: str = "",
+    ) -> None:
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.upload_url = upload_url.rstrip("/") if upload_url else None
+        self.secret_key = secret_key
+        self.staging_dir = staging_dir or root.with_name(f"{root.name}-staging")
+        if self.staging_dir.resolve().is_relative_to(self.root.resolve()):
+            raise ValueError("Каталог staging_dir не должен лежать внутри root")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+
+    def _base(self, key: str) -> Path:
+        return self.staging_dir if key.startswith(UPLOADS_PREFIX) else self.root
+
+    def _path(self, key: str) -> Path:
+        base = self._base(key)
+        path = base / key
+        if not path.resolve().is_relative_to(base.resolve()):
+            raise ClientError(f"Недопустимый путь файла: {key}")
+        return path
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def local_path(self, key: str) -> Path | None:
+        return self._path(key)
+
+    async def exists(self, key: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._path(key).exists)
+
+    async def get_size(self, key: str) -> int | None:
+        loop = asyncio.get_running_loop()
+        try:
+            return (await loop.run_in_executor(None, self._path(key).stat)).st_size
+        except FileNotFoundError:
+            return None
+
+    async def read_head(self, key: str, length: int) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _read_head, self._path(key), length)
+
+    async def content_digest(self, key: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _file_digest, self._path(key))
+
+    async def save(self, key: str, source: Path) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _move_file, source, self._path(key))
+
+    async def move(self, source_key: str, key: str) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, _move_file, self._path(source_key), self._path(key)
+        )
+
+    async def download(self, key: str, destination: Path) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, shutil.copyfile, self._path(key), destination)
+
+    async def delete(self, key: str) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, lambda: self._path(key).unlink(missing_ok=True)
+        )
+
+    def _list_paths(self, prefix: str) -> list[Path]:
+        directory_key, _, name_prefix = prefix.rpartition("/")
+        directory = self._base(prefix) / directory_key
+        # Обходятся только записи каталога префикса, подходящие под его
+        # последнюю часть: остальное дерево хранилища не читается.
+        if not directory.is_dir():
+            return []
+        paths: list[Path] = []
+        for entry in directory.iterdir():
+            if not entry.name.startswith(name_prefix):
+                continue
+            if entry.is_dir():
+                paths.extend(path for path in entry.rglob("*") if path.is_file())
+            elif entry.is_file():
+                paths.append(entry)
+        return paths
+
+    async def list_keys(self, prefix: str) -> list[str]:
+        self._path(prefix)
+        base = self._base(prefix)
+
+        def list_directory() -> list[str]:
+            return sorted(
+                path.relative_to(base).as_posix() for path in self._list_paths(prefix)
+            )
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, list_directory)
+
+    async def delete_expired(self, prefix: str, *, older_than: float) -> int:
+        self._path(prefix)
+
+        def delete_files() -> int:
+            return _delete_files_before(
+                self._list_paths(prefix), older_than
+            ) + _delete_staging_temp_files(self.staging_dir, older_than)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, delete_files)
+
+    async def presigned_url(
+        self, key: str, *, method: Literal["GET", "PUT"] = "GET", expires_in: int
+    ) -> str:
+        if method == "GET":
+            return self.url(key)
+        if self.upload_url is None:
+            raise ClientError("Локальное хранилище не принимает загрузку по ссылке")
+        self._path(key)
+        expires = int(time.time()) + expires_in
+        signature = self._upload_signature(key, expires)
+        return (
+            f"{self.upload_url}/{quote(key, safe='/~')}"
+            f"?expires={expires}&signature={signature}"
+        )
+
+    def _upload_signature(self, key: str, expires: int) -> str:
+        message = f"PUT\n{key}\n{expires}".encode()
+        return hmac.new(self.secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+    def verify_upload(self, key: str, *, expires: int, signature: str) -> bool:
+        """Проверить подпись и срок действия ссылки на загрузку key."""
+        if self.upload_url is None or expires < time.time():
+            return False
+        return hmac.compare_digest(self._upload_signature(key, expires), signature)
+
+    async def close(self) -> None:
+        pass
+
+
+class S3StorageBackend:
+    """S3-совместимое хранилище (AWS S3, MinIO, Yandex Object Storage).
+
+    Запросы подписываются AWS Signature V4 и идут через общий пул соединений
+    httpx. Объекты адресуются в path-style: <endpoint>/<bucket>/<key>.
+    Файлы крупнее multipart_chunk_size загружаются по частям, так что в памяти
+    одновременно находится не больше одной части.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        endpoint_url: str,
+        region: str,
+        bucket: str,
+        access_key_id: str,
+        secret_access_key: str,
+        public_url: str | None = None,
+        multipart_chunk_size: int = 8 * 1024 * 1024,
+    ) -> None:
+        self.client = client
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.host = urlsplit(self.endpoint_url).netloc
+        self.region = region
+        self.bucket = bucket
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.public_url = (public_url or f"{self.endpoint_url}/{bucket}").rstrip("/")
+        self.multipart_chunk_size = max(multipart_chunk_size, _MIN_MULTIPART_CHUNK_SIZE)
+        self.staging_dir = Path(tempfile.gettempdir())
+
+    def _canonical_uri(self, key: str) -> str:
+        return quote(f"/{self.bucket}/{key}" if key else f"/{self.bucket}", safe="/~")
+
+    @staticmethod
+    def _canonical_query(query: dict[str, str]) -> str:
+        return "&".join(
+            f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+            for name, value in sorted(query.items())
+        )
+
+    def _signature(
+        self,
+        *,
+        method: str,
+        canonical_uri: str,
+        canonical_query: str,
+        headers: dict[str, str],
+        payload_hash: str,
+        timestamp: datetime,
+    ) -> tuple[str, str, str]:
+        """Подпись SigV4: (signature, signed_headers, credential_scope)."""
+        date = timestamp.strftime("%Y%m%d")
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        signed_headers = ";".join(sorted(headers))
+        canonical_headers = "".join(
+            f"{name}:{headers[name].strip()}\n" for name in sorted(headers)
+        )
+        canonical_request = "\n".join(
+            [
+                method,
+                canonical_uri,
+                canonical_query,
+                canonical_headers,
+                signed_headers,
+                payload_hash,
+            ]
+        )
+        string_to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                timestamp.strftime("%Y%m%dT%H%M%SZ"),
+                scope,
+                hashlib.sha256(canonical_request.encode()).hexdigest(),
+            ]
+        )
+        key = f"AWS4{self.secret_access_key}".encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        return signature, signed_headers, scope
+
+    def _build_request(
+        self,
+        method: str,
+        key: str,
+        *,
+        query: dict[str, str] | None = None,
+        content: bytes = b"",
+        headers: dict[str, str] | None = None,
+        payload_hash: str | None = None,
+    ) -> httpx.Request:
+        timestamp = datetime.now(timezone.utc)
+        canonical_uri = self._canonical_uri(key)
+        canonical_query = self._canonical_query(query or {})
+        if payload_hash is None:
+            payload_hash = hashlib.sha256(content).hexdigest()
+        # Заголовки x-amz-* (например, x-amz-copy-source) обязаны входить
+        # в подпись.
+        signed = {
+            **{
+                name: value
+                for name, value in (headers or {}).items()
+                if name.startswith("x-amz-")
+            },
+            "host": self.host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": timestamp.strftime("%Y%m%dT%H%M%SZ"),
+        }
+        signature, signed_headers, scope = self._signature(
+            method=method,
+            canonical_uri=canonical_uri,
+            canonical_query=canonical_query,
+            headers=signed,
+            payload_hash=payload_hash,
+            timestamp=timestamp,
+        )
+        authorization = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        url = f"{self.endpoint_url}{canonical_uri}"
+        if canonical_query:
+            url = f"{url}?{canonical_query}"
+        return self.client.build_request(
+            method,
+            url,
+            content=content,
+            headers={
+                **(headers or {}),
+                **signed,
+                "authorization": authorization,
+            },
+        )
+
+    async def _request(self, method: str, key: str, **kwargs) -> httpx.Response:
+        return await self.client.send(self._build_request(method, key, **kwargs))
+
+    @staticmethod
+    def _raise_for_error(response: httpx.Response) -> None:
+        response.raise_for_status()
+        # CompleteMultipartUpload может вернуть ошибку в теле ответа 200.
+        if b"<Error>" in response.content[:512]:
+            raise httpx.HTTPStatusError(
+                f"S3 error: {response.text}",
+                request=response.request,
+                response=response,
+            )
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{quote(key, safe='/~')}"
+
+    def local_path(self, key: str) -> Path | None:
+        return None
+
+    async def exists(self, key: str) -> bool:
+        response = await self._request("HEAD", key)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def get_size(self, key: str) -> int | None:
+        response = await self._request("HEAD", key)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return int(response.headers["content-length"])
+
+    async def read_head(self, key: str, length: int) -> bytes:
+        response = await self._request(
+            "GET", key, headers={"range": f"bytes=0-{length - 1}"}
+        )
+        # 416 Range Not Satisfiable: объект пустой, читать нечего.
+        if response.status_code == 416:
+            return b""
+        response.raise_for_status()
+        return response.content[:length]
+
+    async def content_digest(self, key: str) -> str:
+        hasher = hashlib.sha256()
+        response = await self.client.send(self._build_request("GET", key), stream=True)
+        try:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(self.multipart_chunk_size):
+                hasher.update(chunk)
+        finally:
+            await response.aclose()
+        return hasher.hexdigest()
+
+    async def move(self, source_key: str, key: str) -> None:
+        # CopyObject выполняется на стороне S3, байты через приложение не идут.
+        response = await self._request(
+            "PUT",
+            key,
+            headers={
+                "x-amz-copy-source": quote(f"/{self.bucket}/{source_key}", safe="/~"),
+                "x-amz-metadata-directive": "REPLACE",
+                "content-type": (
+                    mimetypes.guess_type(key)[0] or "application/octet-stream"
+                ),
+            },
+        )
+        self._raise_for_error(response)
+        await self.delete(source_key)
+
+    async def save(self, key: str, source: Path) -> None:
+        content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+        loop = asyncio.get_running_loop()
+        size = (await loop.run_in_executor(None, source.stat)).st_size
+        with await loop.run_in_executor(None, source.open, "rb") as file:
+            if size <= self.multipart_chunk_size:
+                content = await loop.run_in_executor(None, file.read)
+                response = await self._request(
+                    "PUT",
+                    key,
+                    content=content,
+                    headers={"content-type": content_type},
+                    payload_hash=_UNSIGNED_PAYLOAD,
+                )
+                self._raise_for_error(response)
+            else:
+                await self._multipart_upload(key, file, content_type=content_type)
+        await loop.run_in_executor(None, source.unlink)
+
+    async def _multipart_upload(self, key: str, file, *, content_type: str) -> None:
+        response = await self._request(
+            "POST", key, query={"uploads": ""}, headers={"content-type": content_type}
+        )
+        self._raise_for_error(response)
+        upload_id = ElementTree.fromstring(response.content).findtext(
+            "s3:UploadId", namespaces=_S3_NAMESPACE
+        )
+        loop = asyncio.get_running_loop()
+        parts: list[tuple[int, str]] = []
+        try:
+            while chunk := await loop.run_in_executor(
+                None, file.read, self.multipart_chunk_size
+            ):
+                part_number = len(parts) + 1
+                response = await self._request(
+                    "PUT",
+                    key,
+                    query={"partNumber": str(part_number), "uploadId": upload_id},
+                    content=chunk,
+                    payload_hash=_UNSIGNED_PAYLOAD,
+                )
+                self._raise_for_error(response)
+                parts.append((part_number, response.headers["etag"]))
+
+            body = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for number, etag in parts
+            )
+            response = await self._request(
+                "POST",
+                key,
+                query={"uploadId": upload_id},
+                content=(
+                    f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>"
+                ).encode(),
+            )
+            self._raise_for_error(response)
+        except BaseException:
+            await self._request("DELETE", key, query={"uploadId": upload_id})
+            raise
+
+    async def download(self, key: str, destination: Path) -> None:
+        response = await self.client.send(self._build_request("GET", key), stream=True)
+        loop = asyncio.get_running_loop()
+        try:
+            response.raise_for_status()
+            with await loop.run_in_executor(None, destination.open, "wb") as file:
+                async for chunk in response.aiter_bytes(self.multipart_chunk_size):
+                    await loop.run_in_executor(None, file.write, chunk)
+        finally:
+            await response.aclose()
+
+    async def delete(self, key: str) -> None:
+        response = await self._request("DELETE", key)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    async def list_keys(self, prefix: str) -> list[str]:
+        keys: list[str] = []
+        query = {"list-type": "2", "prefix": prefix}
+        while True:
+            response = await self._request("GET", "", query=query)
+            self._raise_for_error(response)
+            root = ElementTree.fromstring(response.content)
+            keys.extend(
+                element.text
+                for element in root.findall("s3:Contents/s3:Key", _S3_NAMESPACE)
+                if element.text
+            )
+            token = root.findtext("s3:NextContinuationToken", namespaces=_S3_NAMESPACE)
+            if not token:
+                return keys
+            query = {**query, "continuation-token": token}
+
+    async def delete_expired(self, prefix: str, *, older_than: float) -> int:
+        expired: list[str] = []
+        query = {"list-type": "2", "prefix": prefix}
+        while True:
+            response = await self._request("GET", "", query=query)
+            self._raise_for_error(response)
+            root = ElementTree.fromstring(response.content)
+            for element in root.findall("s3:Contents", _S3_NAMESPACE):
+                key = element.findtext("s3:Key", namespaces=_S3_NAMESPACE)
+                modified = element.findtext("s3:LastModified", namespaces=_S3_NAMESPACE)
+                if (
+                    key
+                    and modified
+                    and datetime.fromisoformat(modified).timestamp() < older_than
+                ):
+                    expired.append(key)
+            token = root.findtext("s3:NextContinuationToken", namespaces=_S3_NAMESPACE)
+            if not token:
+                break
+            query = {**query, "continuation-token": token}
+        for key in expired:
+            await self.delete(key)
+        loop = asyncio.get_running_loop()
+        return len(expired) + await loop.run_in_executor(
+            None, _delete_staging_temp_files, self.staging_dir, older_than
+        )
+
+    async def presigned_url(
+        self, key: str, *, method: Literal["GET", "PUT"] = "GET", expires_in: int
+    ) -> str:
+        timestamp = datetime.now(timezone.utc)
+        canonical_uri = self._canonical_uri(key)
+        date = timestamp.strftime("%Y%m%d")
+        query = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": (
+                f"{self.access_key_id}/{date}/{self.region}/s3/aws4_request"
+            ),
+            "X-Amz-Date": timestamp.strftime("%Y%m%dT%H%M%SZ"),
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": "host",
+        }
+        canonical_query = self._canonical_query(query)
+        signature, _, _ = self._signature(
+            method=method,
+            canonical_uri=canonical_uri,
+            canonical_query=canonical_query,
+            headers={"host": self.host},
+            payload_hash=_UNSIGNED_PAYLOAD,
+            timestamp=timestamp,
+        )
+        return (
+            f"{self.endpoint_url}{canonical_uri}?{canonical_query}"
+            f"&X-Amz-Signature={signature}"
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_storage_backend() -> StorageBackendProtocol:
+    """Локальный каталог media или S3-совместимое хранилище (STORAGE_BACKEND)."""
+    if settings.storage_backend == "s3":
+        return S3StorageBackend(
+            httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=settings.s3_max_connections),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            ),
+            endpoint_url=settings.s3_endpoint_url,
+            region=settings.s3_region,
+            bucket=settings.s3_bucket,
+            access_key_id=settings.s3_access_key_id,
+            secret_access_key=settings.s3_secret_access_key,
+            public_url=settings.s3_public_url,
+            multipart_chunk_size=settings.s3_multipart_chunk_size,
+        )
+    return LocalStorageBackend(
+        settings.media_dir,
+        base_url=_backend_url("/media"),
+        staging_dir=settings.media_staging_dir,
+        upload_url=_backend_url("/api/storage"),
+        secret_key=settings.secret_key,
+    )
+
+
+storage_backend = create_storage_backend()
+
+
+async def expire_uploads(
+    storage: StorageBackendProtocol, *, ttl_seconds: float, interval_seconds: float
+) -> None:
+    """Раз в interval_seconds удалять незавершённые загрузки старше ttl_seconds.
+
+    Запускается задачей в lifespan приложения и работает до её отмены.
+    """
+    while True:
+        try:
+            deleted = await storage.delete_expired(
+                UPLOADS_PREFIX, older_than=time.time() - ttl_seconds
+            )
+            if deleted:
+                logger.info("Удалено незавершённых загрузок: %s", deleted)
+        except Exception:
+            logger.exception("Не удалось удалить незавершённые загрузки")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Iterable
+
+from sqlalchemy import Table, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+_WRITTEN_TABLES_KEY = "written_tables"
+_REPLICA_KEY = "replica"
+_AFTER_COMMIT_KEY = "after_commit"
+_AFTER_ROLLBACK_KEY = "after_rollback"
+_READY_CALLBACKS_KEY = "ready_callbacks"
+
+type TablesCommittedCallback = Callable[[frozenset[str]], None]
+type SessionCallback = Callable[[], Awaitable[None]]
+
+_callbacks: list[tuple[frozenset[str], TablesCommittedCallback]] = []
+_versions: dict[str, int] = {}
+_committed_at: dict[str, float] = {}
+
+
+def on_tables_committed(
+    tables: Iterable[str], callback: TablesCommittedCallback
+) -> None:
+    """Вызывать callback после коммита транзакции, изменившей одну из таблиц."""
+    _callbacks.append((frozenset(tables), callback))
+
+
+def written_tables(session: Session | AsyncSession) -> frozenset[str]:
+    """Таблицы, изменённые в текущей (ещё не завершённой) транзакции сессии."""
+    return frozenset(session.info.get(_WRITTEN_TABLES_KEY, ()))
+
+
+def after_commit(session: Session | AsyncSession, callback: SessionCallback) -> None:
+    """Выполнить callback после коммита текущей транзакции сессии.
+
+    При откате callback отбрасывается. Вызовы выполняет run_session_callbacks
+    (для запросов — depends.utils.get_session), в той же сессии, уже в новой
+    транзакции.
+    """
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+def after_rollback(session: Session | AsyncSession, callback: SessionCallback) -> None:
+    """Выполнить callback после отката текущей транзакции сессии (компенсация).
+
+    При коммите callback отбрасывается.
+    """
+    session.info.setdefault(_AFTER_ROLLBACK_KEY, []).append(callback)
+
+
+async def run_session_callbacks(session: AsyncSession) -> None:
+    """Выполнить callback'и завершённых транзакций сессии и закоммитить их работу.
+
+    Ошибка callback'а только логируется: основная транзакция уже завершена.
+    """
+    while callbacks := session.info.pop(_READY_CALLBACKS_KEY, None):
+        for callback in callbacks:
+            try:
+                await callback()
+                if session.in_transaction():
+                    await session.commit()
+            except Exception:
+                logger.warning(
+                    "Не удалось выполнить действие после транзакции", exc_info=True
+                )
+                if session.in_transaction():
+                    await session.rollback()
+
+
+def mark_replica_session(session: Session | AsyncSession) -> None:
+    """Отметить сессию, которая читает с реплики."""
+    session.info[_REPLICA_KEY] = True
+
+
+def committed_recently(tables: Iterable[str]) -> bool:
+    """Менялась ли одна из таблиц в этом процессе в пределах окна отставания реплик."""
+    since = time.monotonic() - settings.replica_primary_window_seconds
+    return any(_committed_at.get(table, float("-inf")) > since for table in tables)
+
+
+def may_be_stale(session: Session | AsyncSession, tables: Iterable[str]) -> bool:
+    """Прочитанное сессией может не содержать недавних коммитов таблиц.
+
+    Так бывает, когда сессия читает с реплики, которая ещё не догнала основную
+    БД. Такие данные не кладутся в общие кэши: иначе запрос с реплики сразу после
+    сброса заполнил бы их старыми данными до конца TTL.
+    """
+    return bool(session.info.get(_REPLICA_KEY)) and committed_recently(tables)
+
+
+def table_versions(tables: Iterable[str]) -> list[int]:
+    """Счётчики коммитов, изменивших таблицы, в этом процессе (с нуля при запуске)."""
+    return [_versions.get(table, 0) for table in tables]
+
+
+def notify_tables_committed(tables: Iterable[str]) -> None:
+    """Оповестить подписчиков об изменении таблиц вне сессии (скрипты, миграции)."""
+    committed = frozenset(tables)
+    now = time.monotonic()
+    for table in committed:
+        _committed_at[table] = now
+    _dispatch(committed)
+    if settings.replica_database_urls:
+        _dispatch_again_after_replica_lag(committed)
+
+
+def _dispatch(committed: frozenset[str]) -> None:
+    for table in committed:
+        _versions[table] = _versions.get(table, 0) + 1
+    for watched, callback in _callbacks:
+        changed = watched & committed
+        if changed:
+            callback(changed)
+
+
+def _dispatch_again_after_replica_lag(committed: frozenset[str]) -> None:
+    # Повторный сброс после окна отставания убирает записи, которые успели
+    # положить в кэши по данным реплики (в том числе другие воркеры через Redis).
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Синхронная сессия (скрипты, миграции): событийного цикла нет.
+        return
+    loop.call_later(settings.replica_primary_window_seconds, _dispatch, committed)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_written_tables(orm_execute_state: ORMExecuteState) -> None:
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if isinstance(table, Table):
+        orm_execute_state.session.info.setdefault(_WRITTEN_TABLES_KEY, set()).add(
+            table.name
+        )
+
+
+def _queue_callbacks(session: Session, *, ready: str, dropped: str) -> None:
+    session.info.pop(dropped, None)
+    callbacks = session.info.pop(ready, None)
+    if callbacks:
+        session.info.setdefault(_READY_CALLBACKS_KEY, []).extend(callbacks)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed_tables(session: Session) -> None:
+    _queue_callbacks(session, ready=_AFTER_COMMIT_KEY, dropped=_AFTER_ROLLBACK_KEY)
+    tables = session.info.pop(_WRITTEN_TABLES_KEY, None)
+    if tables:
+        notify_tables_committed(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written_tables(session: Session) -> None:
+    _queue_callbacks(session, ready=_AFTER_ROLLBACK_KEY, dropped=_AFTER_COMMIT_KEY)
+    session.info.pop(_WRITTEN_TABLES_KEY, None)
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Any, AsyncIterator
+
+from fastapi import UploadFile
+
+from core.exceptions.base import ClientError
+
+# Форматы, которые отличаются сигнатурой в начале файла.
+_PREFIX_SIGNATURES: tuple[tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"\x00\x00\x01\x00", "ico"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"\x30\x26\xb2\x75\x8e\x66\xcf\x11", "asf"),
+    (b"FLV", "flv"),
+    (b"\x1a\x45\xdf\xa3", "matroska"),
+    (b"OggS", "ogg"),
+    (b"\x00\x00\x01\xba", "mpeg"),
+    (b"\x00\x00\x01\xb3", "mpeg"),
+)
+# Сколько первых байтов файла достаточно для sniff_media_format.
+MEDIA_HEAD_BYTES = 4096
+# Атомы, с которых может начинаться QuickTime-файл без ftyp.
+_QUICKTIME_ATOMS = frozenset({b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip"})
+
+
+def sniff_media_format(head: bytes) -> str | None:
+    """Формат файла по первым байтам или None, если он не распознан."""
+    for signature, media_format in _PREFIX_SIGNATURES:
+        if head.startswith(signature):
+            return media_format
+    if head[:4] == b"RIFF":
+        return {b"WEBP": "webp", b"AVI ": "avi"}.get(head[8:12])
+    if head[4:8] in _QUICKTIME_ATOMS:
+        # MP4, MOV, M4V, 3GP и HEIC/HEIF — контейнеры ISO BMFF.
+        return "isobmff"
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in text):
+        return "svg"
+    return None
+
+
+def content_path(digest: str, extension: str) -> str:
+    """Путь файла в хранилище по его хэшу: ab/cd/abcd….jpg."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+
+def size_limit_error(max_bytes: int) -> ClientError:
+    return ClientError(f"Размер файла превышает {max_bytes / (1024 * 1024):g} МБ")
+
+
+class ReceivedUpload:
+    """Принятый и проверенный файл во временном файле.
+
+    Файл переносится в хранилище через StorageBackendProtocol.save, если
+    это не нужно (такой файл уже есть), его удаляет discard.
+    """
+
+    def __init__(
+        self, *, temp_path: Path, size: int, digest: str, media_format: str | None
+    ) -> None:
+        self.temp_path = temp_path
+        self.size = size
+        self.digest = digest
+        self.media_format = media_format
+
+    async def discard(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _unlink_quietly, str(self.temp_path))
+
+
+def _unlink_quietly(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _write_chunk(temp: IO[bytes], hasher: Any, chunk: bytes) -> None:
+    hasher.update(chunk)
+    temp.write(chunk)
+
+
+async def receive_stream(
+    chunks: AsyncIterator[bytes],
+    *,
+    directory: Path,
+    max_bytes: int,
+    expected_format: str | None = None,
+) -> ReceivedUpload:
+    """Записать поток байтов во временный файл в directory.
+
+    Попутно считается SHA-256 и проверяется размер. Если задан
+    expected_format, формат определяется по сигнатуре первой части потока и
+    должен с ним совпадать. При ошибке временный файл удаляется, так что в
+    хранилище не остаётся недописанных файлов.
+    """
+    loop = asyncio.get_running_loop()
+    temp = await loop.run_in_executor(
+        None,
+        lambda: tempfile.NamedTemporaryFile(
+            dir=directory, prefix=".upload-", suffix=".part", delete=False
+        ),
+    )
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            if (
+                size == 0
+                and expected_format is not None
+                and sniff_media_format(chunk) != expected_format
+            ):
+                raise ClientError("Содержимое файла не соответствует его расширению")
+            size += len(chunk)
+            if size > max_bytes:
+                raise size_limit_error(max_bytes)
+            await loop.run_in_executor(None, _write_chunk, temp, hasher, chunk)
+        if size == 0 and expected_format is not None:
+            raise ClientError("Файл пуст")
+    except BaseException:
+        await loop.run_in_executor(None, temp.close)
+        await loop.run_in_executor(None, _unlink_quietly, temp.name)
+        raise
+    await loop.run_in_executor(None, temp.close)
+    return ReceivedUpload(
+        temp_path=Path(temp.name),
+        size=size,
+        digest=hasher.hexdigest(),
+        media_format=expected_format,
+    )
+
+
+async def _read_chunks(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    await file.seek(0)
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+
+async def receive_upload(
+    file: UploadFile,
+    *,
+    directory: Path,
+    expected_format: str,
+    max_bytes: int,
+    chunk_size: int,
+) -> ReceivedUpload:
+    """Скопировать загруженный файл во временный файл частями по chunk_size байт."""
+    if file.size is not None and file.size > max_bytes:
+        raise size_limit_error(max_bytes)
+    return await receive_stream(
+        _read_chunks(file, chunk_size),
+        directory=directory,
+        max_bytes=max_bytes,
+        expected_format=expected_format,
+    )
@@ -0,0 +1,64 @@
+from repositories.counting import _plan_rows
+
+
+def test_plan_rows_under_plain_aggregate():
+    plan = {
+        "Node Type": "Aggregate",
+        "Partial Mode": "Simple",
+        "Plan Rows": 1,
+        "Plans": [{"Node Type": "Seq Scan", "Plan Rows": 1502749}],
+    }
+
+    assert _plan_rows(plan) == 1502749
+
+
+def test_plan_rows_under_parallel_aggregate():
+    # Finalize Aggregate → Gather → Partial Aggregate → Parallel Seq Scan:
+    # у Gather в Plan Rows число воркеров, у скана — строки на один процесс.
+    plan = {
+        "Node Type": "Aggregate",
+        "Partial Mode": "Finalize",
+        "Plan Rows": 1,
+        "Plans": [
+            {
+                "Node Type": "Gather",
+                "Workers Planned": 2,
+                "Plan Rows": 2,
+                "Plans": [
+                    {
+                        "Node Type": "Aggregate",
+                        "Partial Mode": "Partial",
+                        "Plan Rows": 1,
+                        "Plans": [
+                            {
+                                "Node Type": "Seq Scan",
+                                "Parallel Aware": True,
+                                "Plan Rows": 623607,
+                            }
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+    # Два воркера и ведущий процесс: делитель 2 + (1 - 0.3 * 2) = 2.4.
+    assert _plan_rows(plan) == 1496657
+
+
+def test_plan_rows_under_gather_merge():
+    plan = {
+        "Node Type": "Aggregate",
+        "Plan Rows": 1,
+        "Plans": [
+            {
+                "Node Type": "Gather Merge",
+                "Workers Planned": 4,
+                "Plan Rows": 4,
+                "Plans": [{"Node Type": "Parallel Index Only Scan", "Plan Rows": 1000}],
+            }
+        ],
+    }
+
+    # При четырёх воркерах ведущий процесс строк не берёт.
+    assert _plan_rows(plan) == 4000